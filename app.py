@@ -7,6 +7,9 @@ from db import init_db, SessionLocal, get_db
 from models import Food as FoodModel, Meal as MealModel, MealFood as MealFoodModel, DailyPlan, User
 from foods import Food as FoodService
 from meals import Meal as MealService
+from plan_items import (apply_food_delta, backfill_plan_items, food_macros, remove_food_from_plans,
+                        replace_plan_items)
+from catalog import get_catalog, bump_catalog_version, MACROS
 from openai import OpenAI
 from openai import OpenAIError
 from datetime import date
@@ -33,40 +36,38 @@ def export_foods_to_excel(path: str = 'foods_log.xlsx'):
     df.to_excel(path, index=False)
 
 def export_meals_to_excel(path: str = 'meals_log.xlsx'):
-    # Reconstruct each meal → one row per food + Total row
+    # Reconstruct each meal → one row per food + Total row. The catalog snapshot already
+    # holds every meal's items and totals, so this is no extra queries on a warm cache.
     rows = []
-    with get_db() as db:
-        meals = db.query(MealModel).all()
-        for m in meals:
-            # each food in the meal
-            for mf in m.meal_food_items:
-                f = mf.food
-                rows.append({
-                    'Meal_Name':  m.name,
-                    'Food_Name':  f"{mf.multiplier}x {f.name}",
-                    'Label':      f.label,
-                    'Measurement': f"{mf.multiplier}x {f.measurement}",
-                    'Calories':   f.calories * mf.multiplier,
-                    'Protein':    f.protein  * mf.multiplier,
-                    'Carbs':      f.carbs    * mf.multiplier,
-                    'Fat_Saturated': f.fat_saturated * mf.multiplier,
-                    'Fat_Regular':   f.fat_regular   * mf.multiplier,
-                    'Sodium':     f.sodium   * mf.multiplier
-                })
-            # add a total row
-            total = MealService(m.name).get_meal_macros(m.name)
+    for m in get_catalog().meals_by_name.values():
+        # each food in the meal
+        for i in m.items:
+            f = i.food
             rows.append({
-                'Meal_Name':   m.name,
-                'Food_Name':   'Total',
-                'Label':       '',
-                'Measurement': '',
-                'Calories':    total['calories'],
-                'Protein':     total['protein'],
-                'Carbs':       total['carbs'],
-                'Fat_Saturated': total['fat_saturated'],
-                'Fat_Regular':   total['fat_regular'],
-                'Sodium':      total['sodium']
+                'Meal_Name':  m.name,
+                'Food_Name':  f"{i.multiplier}x {f.name}",
+                'Label':      f.label,
+                'Measurement': f"{i.multiplier}x {f.measurement}",
+                'Calories':   f.calories * i.multiplier,
+                'Protein':    f.protein  * i.multiplier,
+                'Carbs':      f.carbs    * i.multiplier,
+                'Fat_Saturated': f.fat_saturated * i.multiplier,
+                'Fat_Regular':   f.fat_regular   * i.multiplier,
+                'Sodium':     f.sodium   * i.multiplier
             })
+        # add a total row
+        rows.append({
+            'Meal_Name':   m.name,
+            'Food_Name':   'Total',
+            'Label':       '',
+            'Measurement': '',
+            'Calories':    m.calories,
+            'Protein':     m.protein,
+            'Carbs':       m.carbs,
+            'Fat_Saturated': m.fat_saturated,
+            'Fat_Regular':   m.fat_regular,
+            'Sodium':      m.sodium
+        })
     df = pd.DataFrame(rows)
     df.to_excel(path, index=False)
 
@@ -655,63 +656,24 @@ def format_detailed_plan_item(item_type: str, item_name: str, multiplier: float,
     return f"• {multiplier}x {item_name}"
 
 
-def update_daily_plans_for_food(food_name: str):
+def update_daily_plans_for_food(db, food_id: int, old_macros: dict, new_macros: dict) -> int:
     """
-    Recalculate all DailyPlan totals for plans whose 'meals' string mentions this food.
+    Shift the totals of every DailyPlan containing this food by the change in its macros.
+    One set-based UPDATE over the plan-item index; the caller commits with the food edit.
     """
-    from db import get_db
-    with get_db() as db:
-        plans = db.query(DailyPlan) \
-                  .filter(DailyPlan.meals.ilike(f"%{food_name}%")) \
-                  .all()
-
-        for plan in plans:
-            items = [item.strip() for item in plan.meals.split(";")]
-            totals = {
-                'calories': 0.0,
-                'protein': 0.0,
-                'carbs': 0.0,
-                'fat_regular': 0.0,
-                'fat_saturated': 0.0,
-                'sodium': 0.0
-            }
-            for item in items:
-                if " x" in item:
-                    # it's a food entry like "Chicken x2.0"
-                    name_part, mult_part = item.rsplit(" x", 1)
-                    try:
-                        mult = float(mult_part)
-                        f = db.query(FoodModel).filter(FoodModel.name == name_part).first()
-                        if f:
-                            totals['calories']      += f.calories * mult
-                            totals['protein']       += f.protein  * mult
-                            totals['carbs']         += f.carbs    * mult
-                            totals['fat_regular']   += f.fat_regular   * mult
-                            totals['fat_saturated'] += f.fat_saturated * mult
-                            totals['sodium']        += f.sodium   * mult
-                    except:
-                        continue
-                else:
-                    # it's a meal name
-                    m = db.query(MealModel).filter(MealModel.name == item).first()
-                    if m:
-                        macros = MealService(m.name).get_meal_macros(m.name)
-                        totals['calories']      += macros.get('calories', 0)
-                        totals['protein']       += macros.get('protein',  0)
-                        totals['carbs']         += macros.get('carbs',    0)
-                        totals['fat_regular']   += macros.get('fat_regular',   0)
-                        totals['fat_saturated'] += macros.get('fat_saturated', 0)
-                        totals['sodium']        += macros.get('sodium',   0)
-
-            # write back to plan
-            plan.calories      = totals['calories']
-            plan.protein       = totals['protein']
-            plan.carbs         = totals['carbs']
-            plan.fat_regular   = totals['fat_regular']
-            plan.fat_saturated = totals['fat_saturated']
-            plan.sodium        = totals['sodium']
+    return apply_food_delta(db, food_id, old_macros, new_macros)
 
+
+@st.cache_resource(show_spinner=False)
+def backfill_saved_plan_items() -> int:
+    """
+    One-time parse of plans saved before daily_plan_items existed into their item rows
+    (once per server process; plans that already have items are skipped).
+    """
+    with get_db() as db:
+        filled = backfill_plan_items(db)
         db.commit()
+    return filled
 
 
 # Load OpenAI key from env
@@ -724,6 +686,7 @@ st.set_page_config(layout='wide')
 def main():
     # ─── Initialize DB ───────────────────────────────────────────────
     init_db()
+    backfill_saved_plan_items()
     st.title("🚀 Fitness Tracker & Planner")
 
     # ─── Tabs ────────────────────────────────────────────────────────
@@ -748,50 +711,15 @@ def main():
      tab_chat) = tabs
 
     # ─── Utils ───────────────────────────────────────────────────────
+    # Reads come from the versioned catalog snapshot: a rerun that follows no write costs
+    # no queries. Write paths below call bump_catalog_version() after committing. The frames
+    # are shared across sessions: derive new ones (copy/assign), never modify them in place.
     def load_logged_foods() -> pd.DataFrame:
-        from db import get_db
-        with get_db() as db:
-            foods = db.query(FoodModel).all()
-            return pd.DataFrame([{
-                'Name': f.name,
-                'Label': f.label,
-                'Measurement': f.measurement,
-                'Calories': f.calories,
-                'Protein': f.protein,
-                'Carbs': f.carbs,
-                'Fat_Regular': f.fat_regular,
-                'Fat_Saturated': f.fat_saturated,
-                'Sodium': f.sodium
-            } for f in foods])
+        return get_catalog().foods
 
 
     def load_logged_meals() -> pd.DataFrame:
-        from db import get_db
-        with get_db() as db:
-            meals = (
-                db.query(MealModel)
-                .options(
-                    joinedload(MealModel.meal_food_items)
-                        .joinedload(MealFoodModel.food)
-                )
-                .all()
-            )
-            rows = []
-            for m in meals:
-                svc = MealService(m.name)
-                macros = svc.get_meal_macros(m.name)
-                foods_list = [f"{mf.multiplier}x {mf.food.name}" for mf in m.meal_food_items]
-                rows.append({
-                    'Meal Name': m.name,
-                    'Food Names': "\n".join(foods_list),
-                    'Calories': macros.get('calories', 0),
-                    'Protein':  macros.get('protein',  0),
-                    'Carbs':    macros.get('carbs',    0),
-                    'Fat_Regular':   macros.get('fat_regular',   0),
-                    'Fat_Saturated': macros.get('fat_saturated', 0),
-                    'Sodium':   macros.get('sodium',   0),
-                })
-            return pd.DataFrame(rows)
+        return get_catalog().meals
 
 
     # ─── Tab 1: Calculator ────────────────────────────────────────────
@@ -936,6 +864,7 @@ def main():
                     user.weight_change_amount = float(weight_change) if weight_change else None
                     user.target_calories= float(avg_target) if avg_target else None
                     db.commit()
+                bump_catalog_version()
                 st.success(f"Profile for {name} saved.")
 
     # ─── Tab 2: Manage Users ─────────────────────────────────────────────
@@ -943,8 +872,7 @@ def main():
         st.header("👥 Manage Users")
         
         # Load all users
-        with get_db() as db:
-            users_list = db.query(User).all()
+        users_list = get_catalog().users
         
         if not users_list:
             st.info("No users found. Create a user in the Calculator tab first.")
@@ -1044,6 +972,7 @@ def main():
                                 user_to_update.weight_change_amount = float(edit_weight_change)
                                 user_to_update.target_calories = float(target_calories)
                                 db.commit()
+                        bump_catalog_version()
                         
                         st.success(f"User '{edit_name}' updated successfully!")
                         st.rerun()
@@ -1059,6 +988,7 @@ def main():
                             if user_to_delete:
                                 db.delete(user_to_delete)
                                 db.commit()
+                        bump_catalog_version()
                         
                         st.success(f"User '{selected_user.name}' deleted successfully!")
                         st.rerun()
@@ -1071,8 +1001,7 @@ def main():
         st.header("➕ Log • ✏️ Edit • ❌ Delete Food")
 
         # 1️⃣ Fetch existing foods
-        with get_db() as db:
-            foods_list = db.query(FoodModel).all()
+        foods_list = list(get_catalog().foods_by_key.values())
 
         options = ["-- New Food --"] + [f"{f.name} ({f.label})" for f in foods_list]
         choice  = st.selectbox("Select food to edit/delete, or choose New:", options)
@@ -1117,6 +1046,8 @@ def main():
                     calories, protein, carbs,
                     fat_sat, fat_reg, sodium
                 ).log_food()
+                if "logged" in msg:
+                    bump_catalog_version()
                 st.success(msg) if "logged" in msg else st.error(msg)
 
         if update_btn:
@@ -1126,6 +1057,7 @@ def main():
                     FoodModel.label == label0
                 ).first()
                 if f_db:
+                    old_macros          = food_macros(f_db)
                     f_db.name           = name
                     f_db.label          = label
                     f_db.measurement    = measurement
@@ -1135,8 +1067,9 @@ def main():
                     f_db.fat_saturated  = float(fat_sat)
                     f_db.fat_regular    = float(fat_reg)
                     f_db.sodium         = float(sodium)
+                    update_daily_plans_for_food(db, f_db.id, old_macros, food_macros(f_db))
                     db.commit()
-                    update_daily_plans_for_food(name0)
+                    bump_catalog_version()
                     st.success(f"Updated '{name0} ({label0})'.")
                 else:
                     st.error("Original food not found.")
@@ -1155,6 +1088,8 @@ def main():
                           .filter(MealFoodModel.food_id == f_db.id)
                           .all()
                     )
+                    # Their whole contribution leaves the plans, not just this food's share
+                    remove_food_from_plans(db, f_db, [m.id for m in meals_with])
                     for m in meals_with:
                         db.delete(m)
                     db.delete(f_db)
@@ -1171,8 +1106,8 @@ def main():
                     for m in empties:
                         db.delete(m)
                     db.commit()
+                    bump_catalog_version()
 
-                    update_daily_plans_for_food(name0)
                     st.success(f"Deleted '{name0} ({label0})' and related meals.")
                 else:
                     st.error("Food not found.")
@@ -1325,6 +1260,8 @@ def main():
                 st.error("Meal name cannot be empty.")
             else:
                 err = MealService(meal_name).create_meal(meal_data)
+                if err is None:
+                    bump_catalog_version()
                 st.success(f"Meal '{meal_name}' created!") if err is None else st.error(err)
                 time.sleep(2)
                 st.rerun()
@@ -1332,16 +1269,8 @@ def main():
     with tab_manage_meals:
         st.header("✏️ Manage Meals")
 
-        # 1️⃣ Load all meals with their food associations eagerly
-        with get_db() as db:
-            meals = (
-                db.query(MealModel)
-                .options(
-                    joinedload(MealModel.meal_food_items)
-                        .joinedload(MealFoodModel.food)
-                )
-                .all()
-            )
+        # 1️⃣ All meals with their foods, from the catalog snapshot
+        meals = list(get_catalog().meals_by_name.values())
 
         meal_names = [m.name for m in meals]
         options     = ["-- New Meal --"] + meal_names
@@ -1353,8 +1282,8 @@ def main():
             m0            = choice
             meal_instance = next(m for m in meals if m.name == m0)
             foods0        = [
-                (mf.food.name, mf.food.label, mf.multiplier)
-                for mf in meal_instance.meal_food_items
+                (item.food.name, item.food.label, item.multiplier)
+                for item in meal_instance.items
             ]
         else:
             m0     = ""
@@ -1418,6 +1347,7 @@ def main():
             if err:
                 st.error(err)
             else:
+                bump_catalog_version()
                 st.success(f"Meal '{new_name}' created!")
                 time.sleep(2)
                 st.rerun()
@@ -1447,6 +1377,7 @@ def main():
                     # rename if changed
                     m_db.name = new_name
                     db.commit()
+                    bump_catalog_version()
                     st.success(f"Meal '{m0}' updated to '{new_name}'.")
                     time.sleep(2)
                     st.rerun()
@@ -1460,6 +1391,7 @@ def main():
                 if m_db:
                     db.delete(m_db)
                     db.commit()
+                    bump_catalog_version()
                     st.success(f"Meal '{m0}' deleted.")
                     time.sleep(2)
                     st.rerun()
@@ -1473,7 +1405,7 @@ def main():
         if df_meals.empty:
             st.write("No meals found.")
         else:
-            df_meals['Food Names'] = df_meals['Food Names'].str.replace("\n", "<br>")
+            df_meals = df_meals.assign(**{'Food Names': df_meals['Food Names'].str.replace("\n", "<br>")})
             st.markdown(df_meals.to_html(escape=False, index=False), unsafe_allow_html=True)
 
         if st.button("Export Meals to meals_log.xlsx", key="export_meals"):
@@ -1482,8 +1414,7 @@ def main():
 
     # ─── Tab 6: Daily Planner ─────────────────────────────────────────
     with tab_planner:
-        with get_db() as db:
-            users = db.query(User).all()
+        users = get_catalog().users
         user_opts = ["-- None --"] + [u.name for u in users]
         chosen_user = st.selectbox("Select User (optional)", user_opts)
         if chosen_user != "-- None --":
@@ -1529,17 +1460,8 @@ def main():
                 sel = st.selectbox("Select meal", df_meals['Meal Name'].unique(), key=f"meal_{i}")
                 
                 if sel:
-                    # Get meal details with ingredients
-                    with get_db() as db:
-                        meal_obj = (
-                            db.query(MealModel)
-                            .options(
-                                joinedload(MealModel.meal_food_items)
-                                    .joinedload(MealFoodModel.food)
-                            )
-                            .filter(MealModel.name == sel)
-                            .first()
-                        )
+                    # Meal details with ingredients, from the catalog snapshot
+                    meal_obj = get_catalog().meals_by_name.get(sel)
                     
                     if meal_obj:
                         # Option to customize ingredients or use default
@@ -1554,7 +1476,7 @@ def main():
                             mult_meal = st.number_input("Meal multiplier", min_value=0.1, step=0.1, key=f"mmult_{i}", value=1.0)
                             
                             # Calculate macros using default meal composition
-                            macros = MealService(sel).get_meal_macros(sel)
+                            macros = {k: getattr(meal_obj, k) for k in MACROS}
                             totals['Calories']     += macros['calories']     * mult_meal
                             totals['Protein']      += macros['protein']      * mult_meal
                             totals['Carbs']        += macros['carbs']        * mult_meal
@@ -1574,7 +1496,7 @@ def main():
                                 'fat_regular': 0, 'fat_saturated': 0, 'sodium': 0
                             }
                             
-                            for j, mf in enumerate(meal_obj.meal_food_items):
+                            for j, mf in enumerate(meal_obj.items):
                                 food = mf.food
                                 default_mult = mf.multiplier
                                 
@@ -1671,6 +1593,7 @@ def main():
                     fat_saturated=float(totals['Fat_Saturated']),
                     sodium=float(totals['Sodium'])
                 )
+                replace_plan_items(db, new_plan, plan_items)
                 db.add(new_plan)
                 db.commit()
             st.success("Saved today's meal plan!")
@@ -1681,8 +1604,7 @@ def main():
         st.header("👤 User Daily Plans")
         
         # User selection
-        with get_db() as db:
-            users = db.query(User).all()
+        users = get_catalog().users
         
         if not users:
             st.info("No users found. Create a user in the Calculator tab first.")
@@ -2213,6 +2135,7 @@ def main():
                                                 plan_to_update.fat_regular = float(new_totals['Fat_Regular'])
                                                 plan_to_update.fat_saturated = float(new_totals['Fat_Saturated'])
                                                 plan_to_update.sodium = float(new_totals['Sodium'])
+                                                replace_plan_items(db, plan_to_update, edit_state['items'])
                                                 db.commit()
                                         
                                         # Clear the edit state
@@ -2257,8 +2180,7 @@ def main():
         st.header("📅 Weekly Meal Plan Builder")
 
         # 1) User selection
-        with get_db() as db:
-            users = db.query(User).all()
+        users = get_catalog().users
         
         if not users:
             st.info("No users found. Create a user in the Calculator tab first.")
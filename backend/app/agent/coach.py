@@ -1,13 +1,24 @@
 """Assemble the coach agent: Gemini model + coach tools via create_agent."""
+import threading
+from collections import OrderedDict
+from functools import cache
 from langchain.agents import create_agent
+from langchain.agents.middleware import SummarizationMiddleware
 from langgraph.checkpoint.memory import InMemorySaver
 from sqlalchemy.orm import Session
-from app.agent.tools import build_tools
+from app.config import settings
+from app.agent.memory import checkpointer_for
+from app.agent.tools import COACH_TOOLS, CoachContext
 from app.agent.model import make_chat_model
 
-# Shared in-process checkpointer so a per-user thread keeps conversation history
-# across requests (resets on server restart — a persistent store is a later upgrade).
-_CHECKPOINTER = InMemorySaver()
+# coach_memory="memory": process-local history (lost on restart, not shared by workers)
+_MEMORY_CHECKPOINTER = InMemorySaver()
+
+# compiled graphs for the default model, one per checkpointer (i.e. per engine), least
+# recently used first. A graph holds its checkpointer, so the map is bounded, not weak-keyed.
+_MAX_GRAPHS = 8
+_GRAPHS: OrderedDict = OrderedDict()
+_GRAPHS_LOCK = threading.Lock()
 
 SYSTEM_PROMPT = (
     "You are a concise, practical fitness and nutrition coach. Ground every answer in the user's real "
@@ -19,18 +30,77 @@ SYSTEM_PROMPT = (
     "dairy) so the plan reaches the calorie and fat targets, not just protein. Honor stated preferences "
     "and dislikes. Call plan_day; it returns a scorecard. You may refine and call plan_day ONCE more if "
     "calories or a macro are well off target, then present the plan and scorecard and briefly explain it. "
+    "For a whole week, call plan_week once with a few options per slot instead of plan_day seven times. "
     "Do not chase perfect micronutrients (e.g. vitamin D is hard from food) — just note which are low. "
     "Use save_meal to store a reusable meal and log_food to record eating. Keep replies short; never "
     "fabricate numbers."
 )
 
 
-def build_coach_agent(session: Session, user_id: int, model=None, nutrition_provider=None,
-                      checkpointer=_CHECKPOINTER):
-    tools = build_tools(session, user_id, nutrition_provider=nutrition_provider)
+def default_checkpointer(session: Session):
+    """Conversation store per settings.coach_memory: "sql" (app DB, default) | "memory"."""
+    if settings.coach_memory == "memory":
+        return _MEMORY_CHECKPOINTER
+    if settings.coach_memory == "sql":
+        return checkpointer_for(session.get_bind())
+    raise ValueError(f"unsupported coach_memory: {settings.coach_memory!r}")
+
+
+@cache
+def default_chat_model():
+    """The configured chat model, created once per process (it owns the HTTP client)."""
+    return make_chat_model()
+
+
+def compile_coach_graph(model, checkpointer):
+    """Compile the agent graph. It holds no per-user state, so it can be shared freely."""
+    # Old turns are folded into a summary so each thread's state (and prompt) stays bounded.
+    history = SummarizationMiddleware(
+        model=model,
+        trigger=("messages", settings.coach_history_max_messages),
+        keep=("messages", settings.coach_history_keep_messages),
+    )
     return create_agent(
-        model=model or make_chat_model(),
-        tools=tools,
+        model=model,
+        tools=COACH_TOOLS,
         system_prompt=SYSTEM_PROMPT,
+        middleware=[history],
+        context_schema=CoachContext,
         checkpointer=checkpointer,
     )
+
+
+def coach_graph(checkpointer):
+    """The process-wide compiled graph for the default model and this checkpointer."""
+    with _GRAPHS_LOCK:
+        graph = _GRAPHS.get(checkpointer)
+        if graph is None:
+            graph = _GRAPHS[checkpointer] = compile_coach_graph(default_chat_model(), checkpointer)
+            while len(_GRAPHS) > _MAX_GRAPHS:
+                _GRAPHS.popitem(last=False)
+        _GRAPHS.move_to_end(checkpointer)
+        return graph
+
+
+class CoachAgent:
+    """A shared compiled graph bound to one request's CoachContext."""
+
+    def __init__(self, graph, context: CoachContext):
+        self.graph = graph
+        self.context = context
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.graph.invoke(input, config, context=self.context, **kwargs)
+
+    def stream(self, input, config=None, **kwargs):
+        return self.graph.stream(input, config, context=self.context, **kwargs)
+
+
+def build_coach_agent(session: Session, user_id: int, model=None, nutrition_provider=None,
+                      checkpointer=None) -> CoachAgent:
+    """Bind the coach to a request. With the default model the compiled graph is reused across
+    requests; passing `model` compiles a private graph (tests, one-off scripts)."""
+    checkpointer = checkpointer or default_checkpointer(session)
+    graph = (coach_graph(checkpointer) if model is None
+             else compile_coach_graph(model, checkpointer))
+    return CoachAgent(graph, CoachContext(session, user_id, nutrition_provider))
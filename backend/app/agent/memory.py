@@ -0,0 +1,316 @@
+"""Coach conversation memory: a LangGraph checkpointer on the app database.
+
+Only the latest checkpoint of each thread is kept (the coach never time-travels), so
+storage per thread is one row plus that step's pending writes. An in-process LRU tier
+serves repeat reads; a cheap checkpoint-id probe keeps it correct when several workers
+share the DB. History length itself is bounded by SummarizationMiddleware in coach.py.
+"""
+import asyncio
+import contextlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP, BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata,
+    CheckpointTuple, copy_checkpoint, get_checkpoint_id, get_checkpoint_metadata, writes_sort_key,
+)
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+from app.models import AgentCheckpoint, AgentCheckpointWrite
+
+
+@dataclass
+class CheckpointerStats:
+    reads: int = 0
+    writes: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    read_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "reads": self.reads, "writes": self.writes,
+            "cache_hits": self.cache_hits, "cache_misses": self.cache_misses,
+            "read_ms_avg": round(1e3 * self.read_seconds / self.reads, 3) if self.reads else 0.0,
+            "write_ms_avg": round(1e3 * self.write_seconds / self.writes, 3) if self.writes else 0.0,
+        }
+
+
+@dataclass
+class _Entry:
+    """A thread's latest checkpoint as cached: writes keyed (task_id, idx) -> (path, channel, value).
+    The checkpoint is private: the pregel loop mutates the versions of the one it holds, so
+    copies go in (put) and out (as_tuple)."""
+    config: RunnableConfig
+    checkpoint: Checkpoint
+    metadata: CheckpointMetadata
+    parent_config: Optional[RunnableConfig]
+    writes: dict
+
+    def as_tuple(self) -> CheckpointTuple:
+        keys = sorted(self.writes, key=lambda k: writes_sort_key(self.writes[k][0], *k))
+        return CheckpointTuple(
+            config=self.config, checkpoint=copy_checkpoint(self.checkpoint), metadata=self.metadata,
+            parent_config=self.parent_config,
+            pending_writes=[(k[0], self.writes[k][1], self.writes[k][2]) for k in keys],
+        )
+
+
+def _ids(config: RunnableConfig) -> tuple[str, str]:
+    c = config["configurable"]
+    return c["thread_id"], c.get("checkpoint_ns", "")
+
+
+class SqlCheckpointer(BaseCheckpointSaver[str]):
+    """Latest-checkpoint-per-thread saver backed by the app DB plus an LRU read cache."""
+
+    def __init__(self, engine: Engine, *, cache_size: int = 256, serde=None):
+        super().__init__(serde=serde)
+        self._engine = engine
+        self._cache: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        # A StaticPool engine (in-memory SQLite) hands every thread the same connection, and
+        # the pregel loop calls put/put_writes from its executor threads: take turns on it.
+        self._db_lock = (threading.RLock() if isinstance(engine.pool, StaticPool)
+                         else contextlib.nullcontext())
+        self.stats = CheckpointerStats()
+
+    # --- cache ---
+
+    def _cache_get(self, key: tuple[str, str]) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _cache_put(self, key: tuple[str, str], entry: Optional[_Entry]) -> None:
+        with self._lock:
+            if entry is None:
+                self._cache.pop(key, None)
+                return
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    # --- reads ---
+
+    def _load(self, thread_id: str, ns: str) -> Optional[_Entry]:
+        key = (thread_id, ns)
+        with self._db_lock, self._engine.connect() as conn:
+            cached = self._cache_get(key)
+            if cached is not None:
+                # another worker may have moved the thread on; the id probe is tiny
+                latest = conn.scalar(select(AgentCheckpoint.checkpoint_id).where(
+                    AgentCheckpoint.thread_id == thread_id, AgentCheckpoint.checkpoint_ns == ns))
+                if latest == get_checkpoint_id(cached.config):
+                    self.stats.cache_hits += 1
+                    return cached
+            self.stats.cache_misses += 1
+            row = conn.execute(select(AgentCheckpoint).where(
+                AgentCheckpoint.thread_id == thread_id, AgentCheckpoint.checkpoint_ns == ns)).first()
+            if row is None:
+                self._cache_put(key, None)
+                return None
+            writes = conn.execute(select(AgentCheckpointWrite).where(
+                AgentCheckpointWrite.thread_id == thread_id,
+                AgentCheckpointWrite.checkpoint_ns == ns,
+                AgentCheckpointWrite.checkpoint_id == row.checkpoint_id)).all()
+        entry = _Entry(
+            config=self._config(thread_id, ns, row.checkpoint_id),
+            checkpoint=self.serde.loads_typed((row.type, row.checkpoint)),
+            metadata=self.serde.loads_typed((row.meta_type, row.meta)),
+            parent_config=self._config(thread_id, ns, row.parent_id) if row.parent_id else None,
+            writes={(w.task_id, w.idx): (w.task_path, w.channel, self.serde.loads_typed((w.type, w.value)))
+                    for w in writes},
+        )
+        self._cache_put(key, entry)
+        return entry
+
+    @staticmethod
+    def _config(thread_id: str, ns: str, checkpoint_id: str) -> RunnableConfig:
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns,
+                                 "checkpoint_id": checkpoint_id}}
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        t0 = time.perf_counter()
+        try:
+            entry = self._load(*_ids(config))
+            wanted = get_checkpoint_id(config)
+            if entry is None or (wanted and wanted != get_checkpoint_id(entry.config)):
+                return None  # only the latest checkpoint is retained
+            return entry.as_tuple()
+        finally:
+            self.stats.reads += 1
+            self.stats.read_seconds += time.perf_counter() - t0
+
+    def list(self, config: RunnableConfig | None, *, filter: dict[str, Any] | None = None,
+             before: RunnableConfig | None = None, limit: int | None = None) -> Iterator[CheckpointTuple]:
+        if config is None:
+            with self._db_lock, self._engine.connect() as conn:
+                keys = conn.execute(select(AgentCheckpoint.thread_id, AgentCheckpoint.checkpoint_ns)).all()
+        else:
+            keys = [_ids(config)]
+        count = 0
+        for thread_id, ns in keys:
+            if limit is not None and count >= limit:
+                return
+            tup = self.get_tuple(self._config(thread_id, ns, "") if config is None else config)
+            if tup is None:
+                continue
+            if before and (b := get_checkpoint_id(before)) and get_checkpoint_id(tup.config) >= b:
+                continue
+            if filter and any(tup.metadata.get(k) != v for k, v in filter.items()):
+                continue
+            count += 1
+            yield tup
+
+    # --- writes ---
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        t0 = time.perf_counter()
+        thread_id, ns = _ids(config)
+        parent_id = config["configurable"].get("checkpoint_id")
+        meta = get_checkpoint_metadata(config, metadata)
+        ctype, cblob = self.serde.dumps_typed(checkpoint)
+        mtype, mblob = self.serde.dumps_typed(meta)
+        where = (AgentCheckpoint.thread_id == thread_id, AgentCheckpoint.checkpoint_ns == ns)
+        with self._db_lock, self._engine.begin() as conn:
+            conn.execute(delete(AgentCheckpoint).where(*where))
+            conn.execute(delete(AgentCheckpointWrite).where(
+                AgentCheckpointWrite.thread_id == thread_id, AgentCheckpointWrite.checkpoint_ns == ns))
+            conn.execute(insert(AgentCheckpoint).values(
+                thread_id=thread_id, checkpoint_ns=ns, checkpoint_id=checkpoint["id"],
+                parent_id=parent_id, type=ctype, checkpoint=cblob, meta_type=mtype, meta=mblob))
+        new_config = self._config(thread_id, ns, checkpoint["id"])
+        self._cache_put((thread_id, ns), _Entry(
+            config=new_config, checkpoint=copy_checkpoint(checkpoint), metadata=meta,
+            parent_config=self._config(thread_id, ns, parent_id) if parent_id else None,
+            writes={}))
+        self.stats.writes += 1
+        self.stats.write_seconds += time.perf_counter() - t0
+        return new_config
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        t0 = time.perf_counter()
+        thread_id, ns = _ids(config)
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows, values = [], {}
+        for i, (channel, value) in enumerate(writes):
+            vtype, vblob = self.serde.dumps_typed(value)
+            idx = WRITES_IDX_MAP.get(channel, i)
+            values[idx] = value
+            rows.append({"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id,
+                         "task_id": task_id, "idx": idx,
+                         "channel": channel, "type": vtype, "value": vblob, "task_path": task_path})
+        if not rows:
+            return
+        with self._db_lock, self._engine.begin() as conn:
+            key = (AgentCheckpointWrite.thread_id == thread_id,
+                   AgentCheckpointWrite.checkpoint_ns == ns,
+                   AgentCheckpointWrite.checkpoint_id == checkpoint_id,
+                   AgentCheckpointWrite.task_id == task_id)
+            existing = set(conn.scalars(select(AgentCheckpointWrite.idx).where(*key)))
+            # special (negative-idx) channels overwrite; regular writes are first-wins
+            fresh = [r for r in rows if r["idx"] < 0 or r["idx"] not in existing]
+            overwrite = [r["idx"] for r in fresh if r["idx"] in existing]
+            if overwrite:
+                conn.execute(delete(AgentCheckpointWrite).where(
+                    *key, AgentCheckpointWrite.idx.in_(overwrite)))
+            if fresh:
+                conn.execute(insert(AgentCheckpointWrite), fresh)
+        entry = self._cache_get((thread_id, ns))
+        if entry is not None and get_checkpoint_id(entry.config) == checkpoint_id:
+            with self._lock:
+                for r in fresh:
+                    entry.writes[(task_id, r["idx"])] = (task_path, r["channel"], values[r["idx"]])
+        self.stats.writes += 1
+        self.stats.write_seconds += time.perf_counter() - t0
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._db_lock, self._engine.begin() as conn:
+            conn.execute(delete(AgentCheckpoint).where(AgentCheckpoint.thread_id == thread_id))
+            conn.execute(delete(AgentCheckpointWrite).where(AgentCheckpointWrite.thread_id == thread_id))
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == thread_id]:
+                del self._cache[key]
+
+    # --- async: the sync engine calls (and any wait on _db_lock) run off the event loop ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: RunnableConfig | None, *, filter: dict[str, Any] | None = None,
+                    before: RunnableConfig | None = None,
+                    limit: int | None = None) -> AsyncIterator[CheckpointTuple]:
+        tuples = await asyncio.to_thread(
+            list, self.list(config, filter=filter, before=before, limit=limit))
+        for tup in tuples:
+            yield tup
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint,
+                   metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]],
+                          task_id: str, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # --- metrics ---
+
+    def stored_bytes(self, limit: int = 50) -> dict[str, int]:
+        """Bytes stored per thread (checkpoint + pending writes), largest first."""
+        size = func.length(AgentCheckpoint.checkpoint) + func.length(AgentCheckpoint.meta)
+        with self._db_lock, self._engine.connect() as conn:
+            rows = conn.execute(
+                select(AgentCheckpoint.thread_id, func.sum(size).label("bytes"))
+                .group_by(AgentCheckpoint.thread_id)
+            ).all()
+            write_rows = conn.execute(
+                select(AgentCheckpointWrite.thread_id,
+                       func.sum(func.length(AgentCheckpointWrite.value)).label("bytes"))
+                .group_by(AgentCheckpointWrite.thread_id)
+            ).all()
+        totals: dict[str, int] = {}
+        for thread_id, n in [*rows, *write_rows]:
+            totals[thread_id] = totals.get(thread_id, 0) + int(n or 0)
+        return dict(sorted(totals.items(), key=lambda kv: -kv[1])[:limit])
+
+    def metrics(self) -> dict:
+        per_thread = self.stored_bytes()
+        return {**self.stats.as_dict(), "cached_threads": len(self._cache),
+                "stored_bytes_per_thread": per_thread}
+
+
+# One saver per engine, least recently used first. A saver holds its engine, so a weak-keyed
+# map would never drop an entry; a small LRU bounds it instead (the app has a single engine).
+_MAX_CHECKPOINTERS = 8
+_CHECKPOINTERS: "OrderedDict[Engine, SqlCheckpointer]" = OrderedDict()
+_CHECKPOINTERS_LOCK = threading.Lock()
+
+
+def checkpointer_for(engine: Engine) -> SqlCheckpointer:
+    """The process-wide checkpointer for an engine (one LRU tier per database)."""
+    with _CHECKPOINTERS_LOCK:
+        saver = _CHECKPOINTERS.get(engine)
+        if saver is None:
+            saver = _CHECKPOINTERS[engine] = SqlCheckpointer(engine)
+            while len(_CHECKPOINTERS) > _MAX_CHECKPOINTERS:
+                _CHECKPOINTERS.popitem(last=False)
+        _CHECKPOINTERS.move_to_end(engine)
+        return saver
@@ -1,9 +1,12 @@
+import json
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from app.db import get_session
-from app.agent.coach import build_coach_agent
 
+# The agent stack (LangChain, LangGraph, SciPy via the planner tools) is imported on first
+# use, so workers that never serve the coach don't pay for it at startup.
 router = APIRouter(tags=["coach"])
 
 
@@ -13,21 +16,88 @@ class CoachRequest(BaseModel):
 
 def get_coach_agent_builder():
     """Dependency returning the agent builder (overridable in tests)."""
+    from app.agent.coach import build_coach_agent
     return build_coach_agent
 
 
+def _run_config(user_id: int) -> dict:
+    return {"recursion_limit": 30, "configurable": {"thread_id": f"user-{user_id}"}}
+
+
+def _text(content) -> str:
+    if isinstance(content, list):  # Gemini returns content as text/thought blocks
+        return "\n".join(
+            p.get("text", "") for p in content
+            if isinstance(p, dict) and p.get("type") == "text"
+        )
+    return content or ""
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _coach_events(agent, payload: dict, config: dict):
+    """LangGraph stream -> SSE frames: `token` (model text as it is generated), `tool_start` /
+    `tool_end` (tool calls and their output, e.g. the plan_day scorecard), then `done` with the
+    final reply — or `error` if the run fails part-way."""
+    from langchain_core.messages import AIMessage, ToolMessage
+    reply: list[str] = []
+    try:
+        for mode, chunk in agent.stream(payload, config=config, stream_mode=["messages", "updates"]):
+            if mode == "messages":
+                msg, meta = chunk
+                # only the agent's own model node — not summarization calls or tool messages
+                if meta.get("langgraph_node") == "model" and isinstance(msg, AIMessage):
+                    text = _text(msg.content)
+                    if text:
+                        reply.append(text)
+                        yield _sse("token", {"text": text})
+                continue
+            for node, update in chunk.items():
+                if not isinstance(update, dict):
+                    continue
+                for msg in update.get("messages", []):
+                    if node == "model" and isinstance(msg, AIMessage):
+                        for call in msg.tool_calls:
+                            yield _sse("tool_start", {"id": call["id"], "name": call["name"],
+                                                      "args": call["args"]})
+                        if msg.tool_calls:
+                            reply = []  # text before a tool call is not the final answer
+                    elif node == "tools" and isinstance(msg, ToolMessage):
+                        yield _sse("tool_end", {"id": msg.tool_call_id, "name": msg.name,
+                                                "output": _text(msg.content)})
+    except Exception as e:  # headers are already sent; report the failure in-band
+        yield _sse("error", {"detail": str(e)})
+        return
+    yield _sse("done", {"reply": "".join(reply).strip()})
+
+
 @router.post("/users/{user_id}/coach")
 def coach(user_id: int, req: CoachRequest, db: Session = Depends(get_session),
           builder=Depends(get_coach_agent_builder)) -> dict:
     agent = builder(db, user_id)
     result = agent.invoke(
         {"messages": [{"role": "user", "content": req.message}]},
-        config={"recursion_limit": 30, "configurable": {"thread_id": f"user-{user_id}"}},
+        config=_run_config(user_id),
     )
     content = result["messages"][-1].content
-    if isinstance(content, list):  # Gemini returns content as text/thought blocks
-        content = "\n".join(
-            p.get("text", "") for p in content
-            if isinstance(p, dict) and p.get("type") == "text"
-        ).strip()
-    return {"reply": content}
+    return {"reply": _text(content).strip() if isinstance(content, list) else content}
+
+
+@router.post("/users/{user_id}/coach/stream")
+def coach_stream(user_id: int, req: CoachRequest, db: Session = Depends(get_session),
+                 builder=Depends(get_coach_agent_builder)) -> StreamingResponse:
+    """Same conversation as POST /coach, streamed as Server-Sent Events."""
+    agent = builder(db, user_id)
+    events = _coach_events(agent, {"messages": [{"role": "user", "content": req.message}]},
+                           _run_config(user_id))
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/coach/memory/stats")
+def coach_memory_stats(db: Session = Depends(get_session)) -> dict:
+    """Checkpointer read/write latency, cache hit rate and stored bytes per thread."""
+    from app.agent.memory import checkpointer_for
+    return checkpointer_for(db.get_bind()).metrics()
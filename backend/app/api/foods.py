@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.db import get_session
+import codecs
+import csv
+import json
+import re
+from collections import deque
+from typing import AsyncIterator, Literal
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_session
 from app.models import Food
-from app.repositories import FoodRepository
+from app.repositories import AsyncFoodRepository
 
 router = APIRouter(prefix="/foods", tags=["foods"])
 
@@ -44,17 +52,337 @@ def _to_out(f: Food) -> FoodOut:
     )
 
 
+# FoodOut field -> column, so a listing selects only what it returns (no entities)
+_OUT_COLUMNS = {
+    "id": Food.id, "name": Food.name, "brand": Food.brand,
+    "serving_description": Food.serving_description, "calories": Food.calories,
+    "protein": Food.protein, "carbs": Food.carbs,
+    "fat_total": (Food.fat_saturated + Food.fat_unsaturated).label("fat_total"),
+    "sodium": Food.sodium,
+}
+PAGE_MAX = 1000
+STREAM_BATCH = 500  # rows per server-side fetch and per response chunk
+_MEDIA = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+def _dumps(obj: dict) -> str:
+    return json.dumps(obj, separators=(",", ":"))  # compact, like JSONResponse
+
+
+def _fields(fields: str | None) -> list[str]:
+    if not fields:
+        return list(_OUT_COLUMNS)
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in _OUT_COLUMNS]
+    if unknown or not wanted:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(unknown)}"
+                            if unknown else "no fields requested")
+    return wanted
+
+
+def _cursor(after: str | None) -> tuple[str, int] | None:
+    if after is None:
+        return None
+    name, sep, food_id = after.rpartition(",")
+    if not sep or not food_id.isdigit():
+        raise HTTPException(status_code=400, detail="after must be '<name>,<id>'")
+    return name, int(food_id)
+
+
 @router.get("", response_model=list[FoodOut])
-def list_foods(db: Session = Depends(get_session)) -> list[FoodOut]:
-    return [_to_out(f) for f in FoodRepository(db).list_all()]
+async def list_foods(after: str | None = None, limit: int | None = Query(None, ge=1, le=PAGE_MAX),
+                     fields: str | None = None, format: Literal["json", "ndjson"] = "json",
+                     db: AsyncSession = Depends(get_async_session)):
+    """Foods ordered by (name, id).
+
+    `limit` returns one page; when more remain, the X-Next-Cursor header (URL-encoded) is
+    the `after` for the next one. `fields` is a comma-separated subset of FoodOut. Without
+    `limit` the whole catalog is streamed from a server-side cursor, so memory stays flat
+    at any size: a JSON array, or one object per line with format=ndjson.
+    """
+    names = _fields(fields)
+    columns = [_OUT_COLUMNS[f] for f in names]
+    repo = AsyncFoodRepository(db)
+    start = _cursor(after)
+
+    def objects(rows) -> list[dict]:
+        return [dict(zip(names, r[2:])) for r in rows]
+
+    if limit is not None:
+        rows = await repo.list_page(columns, start, limit + 1)
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = quote(f"{rows[-1][0]},{rows[-1][1]}", safe=",")
+        page = objects(rows)
+        if format == "json":
+            return JSONResponse(page, headers=headers)
+        body = "".join(_dumps(o) + "\n" for o in page)
+        return Response(body, media_type=_MEDIA[format], headers=headers)
+
+    async def chunks():
+        first = True
+        if format == "json":
+            yield "["
+        async for rows in repo.iter_listing(columns, start, STREAM_BATCH):
+            if format == "ndjson":
+                yield "".join(_dumps(o) + "\n" for o in objects(rows))
+                continue
+            body = ",".join(_dumps(o) for o in objects(rows))
+            yield body if first else "," + body
+            first = False
+        if format == "json":
+            yield "]"
+
+    return StreamingResponse(chunks(), media_type=_MEDIA[format])
 
 
 @router.post("", status_code=201, response_model=FoodOut)
-def create_food(payload: FoodCreate, db: Session = Depends(get_session)) -> FoodOut:
-    repo = FoodRepository(db)
-    if repo.find_by_name_brand(payload.name, payload.brand):
+async def create_food(payload: FoodCreate, db: AsyncSession = Depends(get_async_session)) -> FoodOut:
+    repo = AsyncFoodRepository(db)
+    if await repo.find_by_name_brand(payload.name, payload.brand):
         raise HTTPException(status_code=409, detail="food with that name+brand exists")
     food = repo.add(Food(**payload.model_dump()))
-    db.commit()
-    db.refresh(food)
+    await db.commit()
+    await db.refresh(food)
     return _to_out(food)
+
+
+# --- bulk import: JSON array, NDJSON or CSV; deduped in memory, written in batches ---
+
+BULK_BATCH = 500  # rows per INSERT / UPDATE
+_BULK_TYPES = {"application/json": "json", "application/x-ndjson": "ndjson",
+               "application/ndjson": "ndjson", "text/csv": "csv"}
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+
+
+class BulkRow(BaseModel):
+    row: int                  # 1-based position in the upload (CSV: excluding the header)
+    status: Literal["created", "updated", "skipped", "duplicate", "invalid"]
+    id: int | None = None
+    error: str | None = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    duplicate: int
+    invalid: int
+    rows: list[BulkRow]
+
+
+def _key(name: str, brand: str) -> tuple[str, str]:
+    # same match as find_by_name_brand: case-insensitive, stripped input
+    return name.strip().lower(), (brand or "").strip().lower()
+
+
+async def _text(request: Request) -> AsyncIterator[str]:
+    """The request body as text, decoded as it streams in."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in request.stream():
+        if text := decoder.decode(chunk):
+            yield text
+    if text := decoder.decode(b"", final=True):
+        yield text
+
+
+async def _lines(request: Request) -> AsyncIterator[str]:
+    """The request body as lines, each keeping its "\n" (csv needs it inside quoted fields)."""
+    buf = ""
+    async for text in _text(request):
+        *lines, buf = (buf + text).split("\n")
+        for line in lines:
+            yield line + "\n"
+    if buf:
+        yield buf
+
+
+async def _json_array(request: Request) -> AsyncIterator[object]:
+    """The elements of a top-level JSON array body, decoded one at a time as it streams in.
+    Raises ValueError (json.JSONDecodeError for bad syntax) on a malformed body."""
+    decoder = json.JSONDecoder()
+    chunks = aiter(_text(request))
+    buf, pos = "", 0
+
+    async def fill() -> bool:
+        nonlocal buf, pos
+        chunk = await anext(chunks, None)
+        if chunk is None:
+            return False
+        buf, pos = buf[pos:] + chunk, 0
+        return True
+
+    async def peek() -> str:
+        """The next non-whitespace character, "" at the end of the body."""
+        nonlocal pos
+        while True:
+            pos = _JSON_WS.match(buf, pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if not await fill():
+                return ""
+
+    if await peek() != "[":
+        raise ValueError("expected a JSON array of foods")
+    pos += 1
+    if await peek() == "]":
+        pos += 1
+    else:
+        while True:
+            await peek()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not await fill():
+                        raise
+                    continue
+                # a number may continue in the next chunk: decode again once more arrived
+                if end < len(buf) or not await fill():
+                    break
+            yield item
+            pos = end
+            c = await peek()
+            pos += 1
+            if c == "]":
+                break
+            if c != ",":
+                raise ValueError("expected ',' or ']' after an array element")
+    if await peek():
+        raise ValueError("unexpected data after the array")
+
+
+class _Feed:
+    """An iterator csv.reader can keep pulling from as lines arrive: __next__ hands out
+    queued lines and stops when the queue is empty, without ending the iterator."""
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def _records(request: Request, kind: str) -> AsyncIterator[dict | str]:
+    """Upload -> one item per row: the raw record, or an error message for a row that
+    doesn't parse. Blank lines are ignored."""
+    if kind == "json":
+        try:
+            async for item in _json_array(request):
+                yield item if isinstance(item, dict) else "expected an object"
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"invalid JSON: {e}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return
+    if kind == "ndjson":
+        async for line in _lines(request):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield f"invalid JSON: {e}"
+                continue
+            yield item if isinstance(item, dict) else "expected an object"
+        return
+    # One reader over the whole body. Lines are queued until the quotes seen are balanced
+    # (so a quoted field may span lines), then every queued record is read.
+    feed = _Feed()
+    reader = csv.reader(feed)
+    header, quotes, eof = None, 0, False
+    lines = aiter(_lines(request))
+    while not eof:
+        line = await anext(lines, None)
+        if line is None:
+            eof = True  # a stray quote left unbalanced: read what is queued anyway
+        else:
+            feed.lines.append(line)
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+        quotes = 0
+        while feed.lines:
+            values = next(reader, [])
+            if len(values) <= 1 and not "".join(values).strip():
+                continue
+            if header is None:
+                header = [h.strip() for h in values]
+            else:
+                yield {k: v for k, v in zip(header, values) if v != ""}  # empty cell = not given
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_import(request: Request, on_conflict: Literal["update", "skip"] = "update",
+                      db: AsyncSession = Depends(get_async_session)):
+    """Create or update many foods in one transaction.
+
+    The body is a JSON array, NDJSON (application/x-ndjson) or CSV with a FoodCreate header
+    (text/csv). Rows match existing foods on name+brand like POST /foods; matches are
+    updated with the fields the row gives (or skipped with on_conflict=skip), repeats
+    within the upload are reported as duplicates. Every format is parsed from the request
+    stream one row at a time, so the body is never held in memory whole. Existing keys are
+    loaded once and rows are written in batched multi-row statements, so the cost is per
+    batch, not per row.
+    """
+    kind = _BULK_TYPES.get(request.headers.get("content-type", "application/json")
+                           .split(";")[0].strip().lower())
+    if kind is None:
+        raise HTTPException(status_code=415, detail="send JSON, NDJSON or CSV")
+    repo = AsyncFoodRepository(db)
+    existing = await repo.name_brand_keys()
+    seen: set[tuple[str, str]] = set()
+    results: list[dict] = []
+    pending: list[tuple[int, FoodCreate, int | None]] = []
+
+    async def flush() -> None:
+        new = [(n, food) for n, food, fid in pending if fid is None]
+        ids = await repo.insert_many([food.model_dump() for _, food in new])
+        results.extend({"row": n, "status": "created", "id": fid} for (n, _), fid in zip(new, ids))
+        matched = [(n, food, fid) for n, food, fid in pending if fid is not None]
+        if on_conflict == "update":
+            # the match keeps its own name/brand spelling; given fields overwrite the rest
+            await repo.update_many([{**food.model_dump(exclude_unset=True, exclude={"name", "brand"}),
+                                     "id": fid} for _, food, fid in matched])
+        status = "updated" if on_conflict == "update" else "skipped"
+        results.extend({"row": n, "status": status, "id": fid} for n, _, fid in matched)
+        pending.clear()
+
+    n = 0
+    async for record in _records(request, kind):
+        n += 1
+        if isinstance(record, str):
+            results.append({"row": n, "status": "invalid", "error": record})
+            continue
+        try:
+            food = FoodCreate.model_validate(record)
+        except ValidationError as e:
+            err = e.errors()[0]
+            results.append({"row": n, "status": "invalid",
+                            "error": f"{'.'.join(map(str, err['loc']))}: {err['msg']}"})
+            continue
+        if not food.name.strip():
+            results.append({"row": n, "status": "invalid", "error": "name: must not be blank"})
+            continue
+        key = _key(food.name, food.brand)
+        if key in seen:
+            results.append({"row": n, "status": "duplicate"})
+            continue
+        seen.add(key)
+        pending.append((n, food, existing.get(key)))
+        if len(pending) >= BULK_BATCH:
+            await flush()
+    await flush()
+    await db.commit()
+
+    results.sort(key=lambda r: r["row"])
+    counts = dict.fromkeys(("created", "updated", "skipped", "duplicate", "invalid"), 0)
+    for r in results:
+        counts[r["status"]] += 1
+    return {**counts, "rows": results}
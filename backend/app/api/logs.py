@@ -1,10 +1,14 @@
 import datetime
-from fastapi import APIRouter, Depends
+from enum import IntEnum
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.db import get_session
-from app.repositories import LogRepository
-from app.core.macros import scale_food, sum_macros
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_session
+from app.repositories import AsyncLogRepository, AsyncUserRepository
+from app.core.macros import NUTRIENTS, MacroMatrix, to_macros
+from app.core.targets import compute_targets
+from app.core.trends import summarize
 
 router = APIRouter(tags=["logs"])
 
@@ -28,25 +32,84 @@ class DaySummary(BaseModel):
     totals: dict
 
 
+class PeriodTotals(BaseModel):
+    period: str
+    entries: int
+    totals: dict
+
+
+class TrendWindow(IntEnum):  # days; an enum so "?window=7" validates as a choice
+    week = 7
+    month = 30
+    quarter = 90
+
+
+class TrendsOut(BaseModel):
+    window: int
+    start: datetime.date
+    end: datetime.date
+    days_logged: int
+    averages: dict        # per logged day
+    targets: dict
+    adherence: dict       # average as % of target
+    days_on_target: int   # calories within CALORIE_TOLERANCE of target
+    streaks: dict         # {"logging"|"on_target": {"current", "longest"}}
+
+
 @router.post("/users/{user_id}/log", status_code=201)
-def log_food(user_id: int, req: LogRequest, db: Session = Depends(get_session)) -> dict:
-    entry = LogRepository(db).add(user_id=user_id, food_id=req.food_id,
-                                  servings=req.servings, source=req.source)
-    db.commit()
+async def log_food(user_id: int, req: LogRequest,
+                   db: AsyncSession = Depends(get_async_session)) -> dict:
+    entry = AsyncLogRepository(db).add(user_id=user_id, food_id=req.food_id,
+                                       servings=req.servings, source=req.source)
+    await db.commit()
     return {"id": entry.id}
 
 
 @router.get("/users/{user_id}/log/today", response_model=DaySummary)
-def day_summary(user_id: int, db: Session = Depends(get_session)) -> DaySummary:
+async def day_summary(user_id: int, db: AsyncSession = Depends(get_async_session)) -> DaySummary:
     today = datetime.date.today()
-    entries = LogRepository(db).for_day(user_id, today)
-    items, macros = [], []
-    for e in entries:
-        m = scale_food(e.food, e.servings)
-        macros.append(m)
-        items.append(LogItemOut(food_id=e.food_id, name=e.food.name,
-                                servings=e.servings, calories=round(m.calories, 1)))
-    t = sum_macros(macros)
+    entries = await AsyncLogRepository(db).for_day(user_id, today)
+    matrix = MacroMatrix(e.food for e in entries)
+    ids = [e.food_id for e in entries]
+    servings = [e.servings for e in entries]
+    calories = matrix.scale(ids, servings)[:, 0]
+    items = [LogItemOut(food_id=e.food_id, name=e.food.name, servings=e.servings,
+                        calories=round(float(c), 1)) for e, c in zip(entries, calories)]
+    t = to_macros(matrix.scale_and_sum(ids, servings))
     totals = {"calories": round(t.calories, 1), "protein": round(t.protein, 1),
               "carbs": round(t.carbs, 1), "fat_total": round(t.fat_total, 1)}
     return DaySummary(day=today, entries=items, totals=totals)
+
+
+@router.get("/users/{user_id}/log/summary", response_model=list[PeriodTotals])
+async def log_summary(user_id: int, start: datetime.date = Query(..., alias="from"),
+                      end: datetime.date = Query(..., alias="to"),
+                      group_by: Literal["day", "month", "year"] = "day",
+                      db: AsyncSession = Depends(get_async_session)) -> list[PeriodTotals]:
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' is before 'from'")
+    rows = await AsyncLogRepository(db).totals_for_range(user_id, start, end, group_by=group_by)
+    out = []
+    for r in rows:
+        totals = {n: round(r[n] or 0, 1) for n in NUTRIENTS}
+        totals["fat_total"] = round(totals["fat_saturated"] + totals["fat_unsaturated"], 1)
+        out.append(PeriodTotals(period=r["period"], entries=r["entries"], totals=totals))
+    return out
+
+
+@router.get("/users/{user_id}/trends", response_model=TrendsOut)
+async def intake_trends(user_id: int, window: TrendWindow = TrendWindow.month,
+                        db: AsyncSession = Depends(get_async_session)) -> TrendsOut:
+    user = await AsyncUserRepository(db).get(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="not found")
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=window - 1)
+    # one daily_intake row per logged day: O(days), not O(log entries)
+    rows = await AsyncLogRepository(db).daily_intake(user_id, start, end)
+    targets = compute_targets(sex=user.sex, weight_kg=user.weight_kg, height_cm=user.height_cm,
+                              age=user.age, activity_level=user.activity_level,
+                              goal_type=user.goal_type, goal_period=user.goal_period,
+                              amount_kg=user.amount_kg)
+    return TrendsOut(window=int(window), start=start, end=end, targets=targets.__dict__,
+                     **summarize(rows, targets, start, end))
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_session
+from app.repositories import AsyncMealRepository
+from app.core.macros import NUTRIENTS, FoodVector
+
+router = APIRouter(prefix="/meals", tags=["meals"])
+
+
+class MealOut(BaseModel):
+    id: int
+    name: str
+    totals: dict  # NUTRIENTS for the whole recipe
+
+
+def _to_out(v: FoodVector) -> MealOut:
+    return MealOut(id=v.id, name=v.name, totals={n: getattr(v, n) for n in NUTRIENTS})
+
+
+@router.get("", response_model=list[MealOut])
+async def list_meals(db: AsyncSession = Depends(get_async_session)) -> list[MealOut]:
+    # one meal_totals row per meal; no items or foods are loaded
+    return [_to_out(v) for v in await AsyncMealRepository(db).list_vectors()]
+
+
+@router.get("/{meal_id}", response_model=MealOut)
+async def get_meal(meal_id: int, db: AsyncSession = Depends(get_async_session)) -> MealOut:
+    v = (await AsyncMealRepository(db).get_vectors([meal_id])).get(meal_id)
+    if v is None:
+        raise HTTPException(status_code=404, detail="not found")
+    return _to_out(v)
@@ -1,18 +1,27 @@
 from fastapi import APIRouter, Depends, Query
 from app.integrations.nutrition import NutritionResult, NutritionProvider
-from app.integrations.openfoodfacts import OpenFoodFactsProvider
+from app.integrations.aggregate import default_provider
+from app.integrations.cache import CachedNutritionProvider
 
 router = APIRouter(prefix="/nutrition", tags=["nutrition"])
 
 
 def get_nutrition_provider() -> NutritionProvider:
-    return OpenFoodFactsProvider()
+    # process-wide, cached OFF + USDA fan-out over the shared client pools
+    return default_provider()
 
 
 @router.get("/search", response_model=list[NutritionResult])
-def search(
+async def search(
     q: str = Query(..., min_length=1),
     limit: int = Query(5, ge=1, le=25),
     provider: NutritionProvider = Depends(get_nutrition_provider),
 ) -> list[NutritionResult]:
-    return provider.search(q, limit=limit)
+    return await provider.asearch(q, limit=limit)
+
+
+@router.get("/cache/stats")
+def cache_stats(provider: NutritionProvider = Depends(get_nutrition_provider)) -> dict:
+    """Per-provider lookup-cache hits, misses, stale serves and evictions."""
+    providers = getattr(provider, "providers", [provider])
+    return {p.name: p.metrics() for p in providers if isinstance(p, CachedNutritionProvider)}
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db import get_session
-from app.repositories import FoodRepository, PlanRepository
-from app.core.planner import build_day_plan
-from app.core.macros import scale_food, sum_macros
+from app.db import get_async_session, get_session
+from app.repositories import AsyncFoodRepository, AsyncPlanRepository, AsyncUserRepository
+from app.core.planner import WeekSlot, build_day_plan, fit_week, food_spec, week_drafts
+from app.core.targets import compute_targets
+from app.batch.plans import generate_batch
+from app.core.macros import MacroMatrix, to_macros
 
 router = APIRouter(tags=["plans"])
 
@@ -15,6 +19,23 @@ class GenerateRequest(BaseModel):
     foods_per_meal: int = 2
 
 
+class BatchRequest(BaseModel):
+    user_ids: list[int] | None = None
+    meals: int = 3
+    foods_per_meal: int = 2
+
+
+class WeekSlotIn(BaseModel):
+    name: str
+    food_ids: list[int]
+
+
+class GenerateWeekRequest(BaseModel):
+    slots: list[WeekSlotIn]
+    max_repeats: int = Field(4, ge=1, le=7)
+    max_servings: float = Field(4.0, gt=0)
+
+
 class ItemOut(BaseModel):
     food_id: int
     name: str
@@ -35,37 +56,86 @@ class PlanOut(BaseModel):
 
 
 def _plan_out(plan) -> PlanOut:
-    entries, all_macros = [], []
+    all_items = [it for entry in plan.entries for it in entry.items]
+    matrix = MacroMatrix(it.food for it in all_items)
+    ids = [it.food_id for it in all_items]
+    servings = [it.servings for it in all_items]
+    calories = iter(matrix.scale(ids, servings)[:, 0])
+    entries = []
     for entry in plan.entries:
-        items = []
-        for it in entry.items:
-            m = scale_food(it.food, it.servings)
-            all_macros.append(m)
-            items.append(ItemOut(food_id=it.food_id, name=it.food.name,
-                                 servings=round(it.servings, 3), calories=round(m.calories, 1)))
+        items = [ItemOut(food_id=it.food_id, name=it.food.name, servings=round(it.servings, 3),
+                         calories=round(float(next(calories)), 1)) for it in entry.items]
         entries.append(EntryOut(name=entry.name, items=items))
-    t = sum_macros(all_macros)
+    t = to_macros(matrix.scale_and_sum(ids, servings))
     totals = {"calories": round(t.calories, 1), "protein": round(t.protein, 1),
               "carbs": round(t.carbs, 1), "fat_total": round(t.fat_total, 1)}
     return PlanOut(id=plan.id, name=plan.name, entries=entries, totals=totals)
 
 
 @router.post("/users/{user_id}/plans/generate", status_code=201, response_model=PlanOut)
-def generate_plan(user_id: int, req: GenerateRequest, db: Session = Depends(get_session)) -> PlanOut:
-    candidates = FoodRepository(db).list_all()
+async def generate_plan(user_id: int, req: GenerateRequest,
+                        db: AsyncSession = Depends(get_async_session)) -> PlanOut:
+    candidates = await AsyncFoodRepository(db).list_vectors()
     try:
         draft = build_day_plan(req.target_calories, candidates, req.meals, req.foods_per_meal)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    plan = PlanRepository(db).save_draft(user_id=user_id, name="Generated plan", draft=draft)
+    repo = AsyncPlanRepository(db)
+    plan = repo.save_draft(user_id=user_id, name="Generated plan", draft=draft)
+    await db.flush()
+    plan_id = plan.id
+    await db.commit()
+    return _plan_out(await repo.get(plan_id))
+
+
+@router.post("/users/{user_id}/plans/generate-week", status_code=201, response_model=list[PlanOut])
+async def generate_week(user_id: int, req: GenerateWeekRequest,
+                        db: AsyncSession = Depends(get_async_session)) -> list[PlanOut]:
+    user = await AsyncUserRepository(db).get(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="user not found")
+    targets = compute_targets(sex=user.sex, weight_kg=user.weight_kg, height_cm=user.height_cm,
+                              age=user.age, activity_level=user.activity_level,
+                              goal_type=user.goal_type, goal_period=user.goal_period,
+                              amount_kg=user.amount_kg)
+    foods = await AsyncFoodRepository(db).get_vectors(
+        list({fid for slot in req.slots for fid in slot.food_ids}))
+    slots = []
+    for slot in req.slots:
+        specs = []
+        for food_id in slot.food_ids:
+            food = foods.get(food_id)
+            if not food:
+                raise HTTPException(status_code=400, detail=f"unknown food {food_id}")
+            specs.append(food_spec(food, max_servings=req.max_servings))
+        if specs:
+            slots.append(WeekSlot(name=slot.name, specs=specs))
+    if not slots:
+        raise HTTPException(status_code=400, detail="no candidate foods")
+    # the solver is CPU-bound: keep it off the event loop
+    week = await run_in_threadpool(fit_week, slots, targets, max_repeats=req.max_repeats)
+    repo = AsyncPlanRepository(db)
+    plans = [repo.save_draft(user_id=user_id, name=f"Week plan — day {d}", draft=draft)
+             for d, draft in enumerate(week_drafts(slots, week), start=1)]
+    await db.flush()
+    plan_ids = [p.id for p in plans]
+    await db.commit()
+    return [_plan_out(p) for p in await repo.get_many(plan_ids)]
+
+
+# Stays sync: generate_batch works on a sync Session, so it belongs on the threadpool
+# rather than the event loop.
+@router.post("/plans/generate-batch", status_code=201)
+def generate_plans_batch(req: BatchRequest, db: Session = Depends(get_session)) -> dict:
+    report = generate_batch(db, user_ids=req.user_ids, meals=req.meals,
+                            foods_per_meal=req.foods_per_meal)
     db.commit()
-    db.refresh(plan)
-    return _plan_out(plan)
+    return report
 
 
 @router.get("/plans/{plan_id}", response_model=PlanOut)
-def get_plan(plan_id: int, db: Session = Depends(get_session)) -> PlanOut:
-    plan = PlanRepository(db).get(plan_id)
+async def get_plan(plan_id: int, db: AsyncSession = Depends(get_async_session)) -> PlanOut:
+    plan = await AsyncPlanRepository(db).get(plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="not found")
     return _plan_out(plan)
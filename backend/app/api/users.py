@@ -1,9 +1,9 @@
 from typing import Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.db import get_session
-from app.repositories import UserRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_session
+from app.repositories import AsyncUserRepository
 from app.core.profile import compute_metrics
 from app.core.targets import compute_targets
 
@@ -38,24 +38,24 @@ def _to_out(user) -> "UserOut":
 
 
 @router.post("", status_code=201, response_model=UserOut)
-def create_user(payload: UserInput, db: Session = Depends(get_session)) -> UserOut:
-    repo = UserRepository(db)
-    if repo.find_by_name(payload.name):
+async def create_user(payload: UserInput, db: AsyncSession = Depends(get_async_session)) -> UserOut:
+    repo = AsyncUserRepository(db)
+    if await repo.find_by_name(payload.name):
         raise HTTPException(status_code=409, detail="user with that name exists")
     user = repo.create(**payload.model_dump())
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return _to_out(user)
 
 
 @router.get("", response_model=list[UserOut])
-def list_users(db: Session = Depends(get_session)) -> list[UserOut]:
-    return [_to_out(u) for u in UserRepository(db).list_all()]
+async def list_users(db: AsyncSession = Depends(get_async_session)) -> list[UserOut]:
+    return [_to_out(u) for u in await AsyncUserRepository(db).list_all()]
 
 
 @router.get("/{user_id}", response_model=UserOut)
-def get_user(user_id: int, db: Session = Depends(get_session)) -> UserOut:
-    user = UserRepository(db).get(user_id)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_session)) -> UserOut:
+    user = await AsyncUserRepository(db).get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="not found")
     return _to_out(user)
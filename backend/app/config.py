@@ -10,6 +10,27 @@ class Settings(BaseSettings):
     # LLM: "google" (Gemini via LangChain) | "openai"
     llm_provider: str = "google"
     llm_model: str = "gemini-2.5-flash"
+    # Coach conversation store: "sql" (app DB, survives restarts, shared by workers) | "memory"
+    coach_memory: str = "sql"
+    # Summarize a thread's older turns once it reaches max messages, keeping the latest few
+    coach_history_max_messages: int = 40
+    coach_history_keep_messages: int = 12
+    # Nutrition lookups: providers fanned out by /nutrition/search and the coach, in priority
+    # order; the shared deadline (seconds) for one fan-out; max in-flight requests per provider
+    nutrition_providers: str = "openfoodfacts,usda"
+    nutrition_deadline_s: float = 4.0
+    off_max_concurrency: int = 4
+    usda_max_concurrency: int = 4
+    # Provider lookup cache: answers are fresh for ttl (empty ones for the shorter negative
+    # ttl), then served stale for up to stale_s more while a refresh runs in the background
+    nutrition_cache_ttl_s: float = 24 * 3600
+    nutrition_cache_negative_ttl_s: float = 3600
+    nutrition_cache_stale_s: float = 6 * 24 * 3600
+    nutrition_cache_memory_size: int = 512
+    nutrition_cache_max_rows: int = 20_000
+    # USDA lookups: "api" (live FoodData Central) | "local" (the usda_foods mirror loaded
+    # by scripts/import_usda.py — no network)
+    usda_mode: str = "api"
 
 
 settings = Settings()
@@ -1,6 +1,13 @@
 """Pure macro arithmetic. No DB, no frameworks."""
-from dataclasses import dataclass, fields
-from typing import Iterable, Optional, Protocol
+from dataclasses import dataclass
+from typing import Iterable, NamedTuple, Optional, Protocol, Sequence
+
+import numpy as np
+
+MACRO_FIELDS = ("calories", "protein", "carbs", "fat_saturated", "fat_unsaturated",
+                "fiber", "sodium")
+MICRO_FIELDS = ("iron_mg", "calcium_mg", "potassium_mg", "vitamin_c_mg", "vitamin_d_ug")
+NUTRIENTS = MACRO_FIELDS + MICRO_FIELDS
 
 
 @dataclass
@@ -18,8 +25,7 @@ class Macros:
         return self.fat_saturated + self.fat_unsaturated
 
     def __add__(self, other: "Macros") -> "Macros":
-        return Macros(**{f.name: getattr(self, f.name) + getattr(other, f.name)
-                         for f in fields(self)})
+        return Macros(*(getattr(self, n) + getattr(other, n) for n in MACRO_FIELDS))
 
 
 class FoodLike(Protocol):
@@ -33,19 +39,104 @@ class FoodLike(Protocol):
 
 
 def scale_food(food: FoodLike, servings: float) -> Macros:
-    return Macros(
-        calories=(food.calories or 0) * servings,
-        protein=(food.protein or 0) * servings,
-        carbs=(food.carbs or 0) * servings,
-        fat_saturated=(food.fat_saturated or 0) * servings,
-        fat_unsaturated=(food.fat_unsaturated or 0) * servings,
-        fiber=(food.fiber or 0) * servings,
-        sodium=(food.sodium or 0) * servings,
-    )
+    return Macros(*((getattr(food, n) or 0) * servings for n in MACRO_FIELDS))
 
 
 def sum_macros(items: Iterable[Macros]) -> Macros:
-    total = Macros()
+    # one pass, no intermediate Macros per item
+    totals = [0.0] * len(MACRO_FIELDS)
     for m in items:
-        total = total + m
-    return total
+        for i, n in enumerate(MACRO_FIELDS):
+            totals[i] += getattr(m, n)
+    return Macros(*totals)
+
+
+class FoodVector(NamedTuple):
+    """Immutable planning view of a food: id, name and the NUTRIENTS floats (None -> 0).
+
+    A plain tuple (no __dict__, no ORM state), so planners and scorers can hold 100k of
+    them cheaply. Repositories build them straight from column rows (list_vectors)."""
+    id: Optional[int]
+    name: str
+    calories: float = 0.0
+    protein: float = 0.0
+    carbs: float = 0.0
+    fat_saturated: float = 0.0
+    fat_unsaturated: float = 0.0
+    fiber: float = 0.0
+    sodium: float = 0.0
+    iron_mg: float = 0.0
+    calcium_mg: float = 0.0
+    potassium_mg: float = 0.0
+    vitamin_c_mg: float = 0.0
+    vitamin_d_ug: float = 0.0
+
+    @property
+    def fat_total(self) -> float:
+        return self.fat_saturated + self.fat_unsaturated
+
+    @classmethod
+    def of(cls, food) -> "FoodVector":
+        """Any food-like object (e.g. an ORM Food) -> FoodVector; vectors pass through."""
+        if isinstance(food, cls):
+            return food
+        return cls(getattr(food, "id", None), getattr(food, "name", ""),
+                   *(float(getattr(food, n, None) or 0.0) for n in NUTRIENTS))
+
+
+_VECTOR_NUTRIENTS = slice(2, 2 + len(NUTRIENTS))  # FoodVector fields in NUTRIENTS order
+
+
+def nutrient_matrix(foods: Iterable) -> np.ndarray:
+    """Foods -> (len(foods), len(NUTRIENTS)) float array; missing/None values are 0."""
+    rows = [f[_VECTOR_NUTRIENTS] if isinstance(f, FoodVector)
+            else [getattr(f, n, None) or 0.0 for n in NUTRIENTS] for f in foods]
+    return np.array(rows, dtype=float).reshape(len(rows), len(NUTRIENTS))
+
+
+def to_macros(totals: np.ndarray) -> Macros:
+    """A NUTRIENTS-ordered totals vector -> Macros (micros dropped)."""
+    return Macros(*(float(v) for v in totals[:len(MACRO_FIELDS)]))
+
+
+def to_micros(totals: np.ndarray) -> dict[str, float]:
+    return {n: float(v) for n, v in zip(MICRO_FIELDS, totals[len(MACRO_FIELDS):])}
+
+
+class MacroMatrix:
+    """Foods × nutrients table (macros + the five micros) for batch rollups.
+
+    Build it once from the foods a rollup touches, then total any number of
+    (food_id, servings) pairs with a single matrix-vector product.
+    """
+
+    def __init__(self, foods: Iterable):
+        unique: dict[int, object] = {}
+        for f in foods:
+            unique.setdefault(f.id, f)
+        self._row = {food_id: i for i, food_id in enumerate(unique)}
+        self.values = nutrient_matrix(unique.values())
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __contains__(self, food_id: int) -> bool:
+        return food_id in self._row
+
+    def rows(self, food_ids: Sequence[int]) -> np.ndarray:
+        return np.fromiter((self._row[i] for i in food_ids), dtype=np.intp, count=len(food_ids))
+
+    def column(self, nutrient: str) -> np.ndarray:
+        return self.values[:, NUTRIENTS.index(nutrient)]
+
+    def scale(self, food_ids: Sequence[int], servings: Sequence[float]) -> np.ndarray:
+        """Per-item scaled nutrients, shape (len(food_ids), len(NUTRIENTS))."""
+        q = np.asarray(servings, dtype=float)
+        return self.values[self.rows(food_ids)] * q[:, None]
+
+    def scale_and_sum(self, food_ids: Sequence[int], servings: Sequence[float]) -> np.ndarray:
+        """Totals over all items, NUTRIENTS-ordered. Repeated foods are folded into
+        one per-food servings vector first, so the cost is one (foods,) @ (foods, nutrients)."""
+        q = np.bincount(self.rows(food_ids), weights=np.asarray(servings, dtype=float),
+                        minlength=len(self._row))
+        return q @ self.values
@@ -3,9 +3,9 @@ from dataclasses import dataclass
 from typing import Protocol
 
 import numpy as np
-from scipy.optimize import lsq_linear
 
-from app.core.macros import scale_food, sum_macros
+from app.core.macros import MICRO_FIELDS, NUTRIENTS, FoodVector, nutrient_matrix, to_macros, to_micros
+from app.core.solver import default_solver
 
 
 class FoodLike(Protocol):
@@ -59,13 +59,13 @@ def build_day_plan(target_calories: float, candidates: list, meals: int = 3,
 
 @dataclass
 class ItemSpec:
-    food: object       # FoodLike: .protein/.carbs/.fat_saturated/.fat_unsaturated/.calories/.name/.id
+    food: FoodVector
     lo: float          # min servings
     hi: float          # max servings
 
 
 def food_spec(food, max_servings: float = 4.0) -> ItemSpec:
-    return ItemSpec(food=food, lo=0.0, hi=max_servings)
+    return ItemSpec(food=FoodVector.of(food), lo=0.0, hi=max_servings)
 
 
 def meal_ingredient_specs(meal, flex: float = 0.3) -> list[ItemSpec]:
@@ -73,27 +73,137 @@ def meal_ingredient_specs(meal, flex: float = 0.3) -> list[ItemSpec]:
     out = []
     for it in meal.items:
         r = it.servings
-        out.append(ItemSpec(food=it.food, lo=r * (1 - flex), hi=r * (1 + flex)))
+        out.append(ItemSpec(food=FoodVector.of(it.food), lo=r * (1 - flex), hi=r * (1 + flex)))
     return out
 
 
 def fit_servings(specs: list[ItemSpec], protein_g: float, carb_g: float, fat_g: float,
                  protein_weight: float = 1.5) -> list[float]:
-    """Servings per item that best hit the macro targets within each item's bounds."""
-    if not specs:
-        return []
-    P = np.array([s.food.protein or 0 for s in specs], dtype=float)
-    C = np.array([s.food.carbs or 0 for s in specs], dtype=float)
-    Ft = np.array([(s.food.fat_saturated or 0) + (s.food.fat_unsaturated or 0) for s in specs], dtype=float)
-    A = np.vstack([protein_weight * P, C, Ft])
-    b = np.array([protein_weight * protein_g, carb_g, fat_g], dtype=float)
-    lb = np.array([s.lo for s in specs], dtype=float)
-    ub = np.array([max(s.hi, s.lo) for s in specs], dtype=float)
-    res = lsq_linear(A, b, bounds=(lb, ub))
-    return [float(x) for x in res.x]
+    """Servings per item that best hit the macro targets within each item's bounds
+    (memoized and warm-started, see app.core.solver).
 
+    The answer depends on call history. A memo hit returns the plan solved for targets
+    within TARGET_TOLERANCE_G of these. With more items than macros the optimum is rarely
+    unique: a warm start returns the optimal servings nearest the previous plan, which can
+    differ from a cold solve's equally optimal servings for the same inputs."""
+    return default_solver.fit(specs, protein_g, carb_g, fat_g, protein_weight)
 
-_MICROS = ("iron_mg", "calcium_mg", "potassium_mg", "vitamin_c_mg", "vitamin_d_ug")
+
+# --- weekly planner: every day × slot × candidate sized in one sparse solve ---
+
+
+@dataclass
+class WeekSlot:
+    name: str
+    specs: list[ItemSpec]   # candidates for this slot, offered on every day
+
+
+def _col(nutrient: str) -> int:
+    return NUTRIENTS.index(nutrient)
+
+
+def fit_week(slots: list[WeekSlot], targets, days: int = 7, max_repeats: int | None = None,
+             protein_weight: float = 1.5, micro_weight: float = 0.5, cap_weight: float = 10.0,
+             min_serving: float = 0.05) -> list[list[list[float]]]:
+    """Servings for every (day, slot, candidate), solved jointly as one bounded least squares.
+
+    Rows, each relative to its target: per-day protein/carb/fat; weekly-average floors for
+    the five key micros; per-day sodium and saturated-fat caps. Floors and caps carry a
+    non-negative slack column, so beating a floor or staying under a cap costs nothing.
+    A food may be used on at most `max_repeats` days: over-used foods are dropped from
+    their smallest days (rotating ties so days differ) and the week is re-solved.
+
+    Returns servings[day][slot][item], aligned with each slot's specs.
+    """
+    from scipy import sparse
+    from scipy.optimize import lsq_linear
+    specs = [s for slot in slots for s in slot.specs]
+    m = len(specs)
+    if not m or days <= 0:
+        return [[[] for _ in slots] for _ in range(days)]
+    N = nutrient_matrix(s.food for s in specs)
+    fat = N[:, _col("fat_saturated")] + N[:, _col("fat_unsaturated")]
+
+    # (coefficients per candidate, day or None for the whole week, target, weight, slack sign)
+    spec_rows = []
+    for d in range(days):
+        spec_rows += [(N[:, _col("protein")], d, targets.protein_g, protein_weight, 0),
+                      (N[:, _col("carbs")], d, targets.carb_g, 1.0, 0),
+                      (fat, d, targets.fat_g, 1.0, 0),
+                      (N[:, _col("sodium")], d, targets.sodium_mg_max, cap_weight, 1),
+                      (N[:, _col("fat_saturated")], d, targets.sat_fat_g_max, cap_weight, 1)]
+    spec_rows += [(N[:, _col(micro)], None, days * getattr(targets, micro, 0), micro_weight, -1)
+                  for micro in MICRO_FIELDS]
+    spec_rows = [r for r in spec_rows if r[2]]  # no target -> no row
+
+    n_food = days * m
+    n_slack = sum(1 for r in spec_rows if r[4])
+    rows, cols, vals, b = [], [], [], []
+    slack_col = n_food
+    for r, (coef, day, target, weight, slack) in enumerate(spec_rows):
+        nz = np.nonzero(coef)[0]
+        for d in (range(days) if day is None else (day,)):
+            rows += [r] * len(nz)
+            cols += list(d * m + nz)
+            vals += list(coef[nz] * weight / target)
+        if slack:
+            rows.append(r)
+            cols.append(slack_col)
+            vals.append(slack * weight)
+            slack_col += 1
+        b.append(weight)
+
+    n_var = n_food + n_slack
+    A = sparse.csc_matrix((vals, (rows, cols)), shape=(len(b), n_var))
+    b = np.asarray(b, dtype=float)
+    lo = np.concatenate([np.tile([s.lo for s in specs], days), np.zeros(n_slack)]).astype(float)
+    hi = np.concatenate([np.tile([max(s.hi, s.lo + 1e-9) for s in specs], days),
+                         np.full(n_slack, np.inf)]).astype(float)
+
+    # candidates sharing a food count as one food for the repeat cap
+    keys = [getattr(s.food, "id", None) or id(s.food) for s in specs]
+    food_items: dict = {}
+    for k, key in enumerate(keys):
+        food_items.setdefault(key, []).append(k)
+
+    active = np.ones(n_var, dtype=bool)
+    x = np.zeros(n_var)
+    for _ in range(len(food_items) + 1):
+        idx = np.nonzero(active)[0]
+        x = np.zeros(n_var)
+        x[idx] = lsq_linear(A[:, idx], b, bounds=(lo[idx], hi[idx])).x
+        if max_repeats is None:
+            break
+        pruned = False
+        for rot, items in enumerate(food_items.values()):
+            amount = [sum(x[d * m + k] for k in items) for d in range(days)]
+            used = [d for d in range(days) if amount[d] > min_serving]
+            if len(used) <= max_repeats:
+                continue
+            used.sort(key=lambda d: (-round(amount[d], 2), (d - rot) % days))
+            for d in used[max_repeats:]:
+                active[[d * m + k for k in items]] = False
+            pruned = True
+        if not pruned:
+            break
+
+    out = []
+    for d in range(days):
+        day, k = [], d * m
+        for slot in slots:
+            day.append([float(v) for v in x[k:k + len(slot.specs)]])
+            k += len(slot.specs)
+        out.append(day)
+    return out
+
+
+def week_drafts(slots: list[WeekSlot], week: list[list[list[float]]],
+                min_serving: float = 0.05) -> list[list[dict]]:
+    """fit_week output -> one save_draft-style plan per day, dropping unused candidates."""
+    return [[{"name": slot.name,
+              "items": [(s.food, round(q, 2)) for s, q in zip(slot.specs, qs) if q >= min_serving]}
+             for slot, qs in zip(slots, day)]
+            for day in week]
 
 
 @dataclass
@@ -122,11 +232,9 @@ class PlanScore:
 
 
 def score_plan(specs: list[ItemSpec], servings: list[float], targets) -> PlanScore:
-    macros = sum_macros([scale_food(s.food, q) for s, q in zip(specs, servings)])
-    micros = {}
-    for m in _MICROS:
-        got = sum((getattr(s.food, m, None) or 0) * q for s, q in zip(specs, servings))
-        micros[m] = (round(got, 1), getattr(targets, m))
+    totals = np.asarray(servings, dtype=float) @ nutrient_matrix(s.food for s in specs)
+    macros = to_macros(totals)
+    micros = {m: (round(got, 1), getattr(targets, m)) for m, got in to_micros(totals).items()}
     return PlanScore(
         calories=round(macros.calories, 0), protein_g=round(macros.protein, 1),
         carb_g=round(macros.carbs, 1), fat_g=round(macros.fat_total, 1),
@@ -0,0 +1,123 @@
+"""Servings solver behind planner.fit_servings. Pure numpy; SciPy only as the fallback.
+
+The problem is min ||A x - b|| subject to lo <= x <= hi, where A has three rows (weighted
+protein, carbs, fat) and one column per item. Any unconstrained minimizer that already
+lies inside the bounds is optimal, so before calling lsq_linear the solver tries two
+closed-form candidates built from the pseudo-inverse:
+
+- the minimizer nearest the lower bounds (no bound active: the common small-plan case);
+- the minimizer nearest a recent solution whose items differ by at most one (a warm
+  start: refining a plan keeps the servings it already had).
+
+Solutions are memoized by the items (food id + macros, bounds) and the targets rounded
+to TARGET_TOLERANCE_G, so the coach re-fitting the same plan costs a dict lookup.
+"""
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+TARGET_TOLERANCE_G = 0.5   # targets closer than this share a memoized solution
+_BOUND_SLACK = 1e-9
+
+
+@dataclass
+class SolverStats:
+    memo_hits: int = 0
+    closed_form: int = 0
+    warm_starts: int = 0
+    cold_solves: int = 0
+
+    def as_dict(self) -> dict:
+        solves = self.closed_form + self.warm_starts + self.cold_solves
+        calls = solves + self.memo_hits
+        return {
+            "memo_hits": self.memo_hits, "closed_form": self.closed_form,
+            "warm_starts": self.warm_starts, "cold_solves": self.cold_solves,
+            "fast_path_rate": round((calls - self.cold_solves) / calls, 3) if calls else 0.0,
+        }
+
+
+def macro_vector(food) -> tuple[float, float, float]:
+    """(protein, carbs, total fat) per serving; missing values are 0."""
+    return (float(food.protein or 0), float(food.carbs or 0),
+            float((food.fat_saturated or 0) + (food.fat_unsaturated or 0)))
+
+
+def _within(x: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> bool:
+    return bool(np.all(x >= lo - _BOUND_SLACK) and np.all(x <= hi + _BOUND_SLACK))
+
+
+class ServingsSolver:
+    """Memoized bounded least squares for day plans. Thread-safe; one per process is enough."""
+
+    def __init__(self, memo_size: int = 256, recent: int = 16):
+        self.memo_size = memo_size
+        self.stats = SolverStats()
+        self._memo: OrderedDict[tuple, tuple[float, ...]] = OrderedDict()
+        self._recent: deque[dict] = deque(maxlen=recent)  # item -> servings, newest last
+        self._lock = threading.Lock()
+
+    def fit(self, specs: Sequence, protein_g: float, carb_g: float, fat_g: float,
+            protein_weight: float = 1.5) -> list[float]:
+        if not specs:
+            return []
+        # an item is its food id plus macros, so an edited food never reuses a stale answer
+        items = tuple((getattr(s.food, "id", None), macro_vector(s.food)) for s in specs)
+        lo = np.array([s.lo for s in specs], dtype=float)
+        hi = np.array([max(s.hi, s.lo) for s in specs], dtype=float)
+        key = (protein_weight,
+               tuple(round(t / TARGET_TOLERANCE_G) for t in (protein_g, carb_g, fat_g)),
+               items, tuple(lo), tuple(hi))
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit is not None:
+                self._memo.move_to_end(key)
+                self.stats.memo_hits += 1
+                return list(hit)
+            warm = self._warm_start(items, lo, hi)
+
+        A = np.array([v for _, v in items], dtype=float).T
+        A[0] *= protein_weight
+        b = np.array([protein_weight * protein_g, carb_g, fat_g], dtype=float)
+        x, path = self._solve(A, b, lo, hi, warm)
+
+        solution = tuple(float(v) for v in x)
+        with self._lock:
+            setattr(self.stats, path, getattr(self.stats, path) + 1)
+            self._memo[key] = solution
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+            self._recent.append(dict(zip(items, solution)))
+        return list(solution)
+
+    def _warm_start(self, items: tuple, lo: np.ndarray, hi: np.ndarray) -> np.ndarray | None:
+        """Servings of the newest recent plan at most one item away, aligned to `items`
+        (a new item starts at its lower bound). Caller holds the lock."""
+        wanted = set(items)
+        for prev in reversed(self._recent):
+            if len(wanted - prev.keys()) <= 1 and len(prev.keys() - wanted) <= 1:
+                x0 = np.array([prev.get(it, l) for it, l in zip(items, lo)], dtype=float)
+                return np.clip(x0, lo, hi)
+        return None
+
+    @staticmethod
+    def _solve(A: np.ndarray, b: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+               warm: np.ndarray | None) -> tuple[np.ndarray, str]:
+        pinv = np.linalg.pinv(A)
+        # x0 + pinv (b - A x0) is the unconstrained minimizer nearest x0
+        x = lo + pinv @ (b - A @ lo)
+        if _within(x, lo, hi):
+            return np.clip(x, lo, hi), "closed_form"
+        if warm is not None:
+            x = warm + pinv @ (b - A @ warm)
+            if _within(x, lo, hi):
+                return np.clip(x, lo, hi), "warm_starts"
+        from scipy.optimize import lsq_linear  # lazy: SciPy is a heavy import for API workers
+        # BVLS (active set) is several times faster than TRF on a dense 3-row system
+        return lsq_linear(A, b, bounds=(lo, hi), method="bvls").x, "cold_solves"
+
+
+default_solver = ServingsSolver()
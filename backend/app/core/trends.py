@@ -0,0 +1,62 @@
+"""Intake trends over a window of days: averages, adherence to targets, streaks. Pure.
+
+Works on one row per logged day (see LogRepository.daily_intake), so the cost is
+O(days in the window) however many entries were logged.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Sequence
+from app.core.macros import NUTRIENTS
+from app.core.targets import NutritionTargets
+
+CALORIE_TOLERANCE = 0.10  # a day is on target within ±10% of the calorie target
+
+# averaged nutrient -> NutritionTargets field it is measured against
+_ADHERENCE = {"calories": "calories", "protein": "protein_g", "carbs": "carb_g",
+              "fat_total": "fat_g", "fiber": "fiber_g"}
+
+
+@dataclass
+class Streak:
+    current: int   # consecutive days up to today (or yesterday, while today is open)
+    longest: int   # longest run inside the window
+
+
+def streak(hits: Sequence[bool]) -> Streak:
+    """hits: one flag per day, oldest first, the last being today."""
+    longest = run = 0
+    for h in hits:
+        run = run + 1 if h else 0
+        longest = max(longest, run)
+    if hits and not hits[-1]:  # today isn't over: count the run ending yesterday
+        run = 0
+        for h in reversed(hits[:-1]):
+            if not h:
+                break
+            run += 1
+    return Streak(current=run, longest=longest)
+
+
+def summarize(rows: Sequence[dict], targets: NutritionTargets, start: date, end: date) -> dict:
+    """rows: {"day", "entries", <NUTRIENTS>} per logged day in start..end.
+
+    Averages are per logged day (a day with nothing logged is missing data, not a fast);
+    adherence is the average as a percentage of its target."""
+    by_day = {r["day"]: r for r in rows}
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    logged = len(by_day)
+    averages = {n: round(sum(r[n] or 0 for r in rows) / logged, 1) if logged else 0.0
+                for n in NUTRIENTS}
+    averages["fat_total"] = round(averages["fat_saturated"] + averages["fat_unsaturated"], 1)
+    adherence = {n: round(100 * averages[n] / getattr(targets, t), 1) if logged and getattr(targets, t) else 0.0
+                 for n, t in _ADHERENCE.items()}
+    low, high = (1 - CALORIE_TOLERANCE) * targets.calories, (1 + CALORIE_TOLERANCE) * targets.calories
+    on_target = [d in by_day and low <= (by_day[d]["calories"] or 0) <= high for d in days]
+    return {
+        "days_logged": logged,
+        "averages": averages,
+        "adherence": adherence,
+        "days_on_target": sum(on_target),
+        "streaks": {"logging": streak([d in by_day for d in days]).__dict__,
+                    "on_target": streak(on_target).__dict__},
+    }
@@ -1,5 +1,6 @@
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from app.config import settings
@@ -25,8 +26,37 @@ def new_session_factory(engine: Engine) -> sessionmaker:
     return sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
+# async drivers for the same databases: SQLite -> aiosqlite, Postgres -> asyncpg
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    """A sync database URL -> the same database through its async driver."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"no async driver configured for {backend!r}")
+    return u.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def new_async_engine(url: str | None = None) -> AsyncEngine:
+    url = async_url(url or settings.database_url)
+    if not url.startswith("sqlite"):
+        return create_async_engine(url)
+    if url in ("sqlite+aiosqlite://", "sqlite+aiosqlite:///:memory:"):
+        return create_async_engine(url, poolclass=StaticPool)
+    return create_async_engine(url)
+
+
+def new_async_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    # expire_on_commit=False: an async session can't lazy-reload attributes after commit
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
 engine = new_engine()
 SessionLocal = new_session_factory(engine)
+async_engine = new_async_engine()
+AsyncSessionLocal = new_async_session_factory(async_engine)
 
 
 def init_db() -> None:
@@ -41,3 +71,9 @@ def get_session():
         yield db
     finally:
         db.close()
+
+
+async def get_async_session():
+    """FastAPI dependency for `async def` routes."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,85 @@
+"""Fan a nutrition search out to several providers at once and merge the answers."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import cache
+from itertools import chain, zip_longest
+from typing import Sequence
+
+from app.config import settings
+from app.integrations.nutrition import NutritionProvider, NutritionResult
+from app.integrations.openfoodfacts import OpenFoodFactsProvider
+from app.integrations.usda import USDAProvider
+
+PROVIDERS = {OpenFoodFactsProvider.name: OpenFoodFactsProvider, USDAProvider.name: USDAProvider}
+
+# sync fan-out runs each provider's blocking search on these threads
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nutrition")
+
+
+def _key(r: NutritionResult) -> tuple[str, str]:
+    return " ".join(r.name.lower().split()), " ".join(r.brand.lower().split())
+
+
+def merge_results(per_provider: Sequence[list[NutritionResult]], limit: int) -> list[NutritionResult]:
+    """Interleave providers' results (first provider first), dropping repeated name+brand."""
+    seen, out = set(), []
+    for r in chain.from_iterable(zip_longest(*per_provider)):
+        if r is None or _key(r) in seen:
+            continue
+        seen.add(_key(r))
+        out.append(r)
+        if len(out) == limit:
+            break
+    return out
+
+
+class AggregateNutritionProvider:
+    """Queries every provider concurrently; whatever has answered by the shared deadline is
+    merged. A provider that errors or runs late simply contributes nothing."""
+
+    def __init__(self, providers: Sequence[NutritionProvider], deadline_s: float | None = None):
+        self.providers = list(providers)
+        self.deadline_s = settings.nutrition_deadline_s if deadline_s is None else deadline_s
+
+    def search(self, query: str, limit: int = 5) -> list[NutritionResult]:
+        """Sync fan-out on _POOL. The deadline bounds how long the caller waits, not the
+        requests: cancel() only drops a search still queued for a thread. One already running
+        keeps its worker until it returns or its own HTTP client times out (10-15 s for the
+        shipped providers), so a slow provider can hold pool threads past the deadline."""
+        futures = [_POOL.submit(p.search, query, limit) for p in self.providers]
+        wait(futures, timeout=self.deadline_s)
+        answered = []
+        for f in futures:
+            if f.done() and f.exception() is None:
+                answered.append(f.result())
+            else:
+                f.cancel()  # no-op once the search is running
+                answered.append([])
+        return merge_results(answered, limit)
+
+    async def asearch(self, query: str, limit: int = 5) -> list[NutritionResult]:
+        tasks = [asyncio.ensure_future(p.asearch(query, limit)) for p in self.providers]
+        await asyncio.wait(tasks, timeout=self.deadline_s)
+        answered = []
+        for t in tasks:
+            if t.done() and not t.cancelled() and t.exception() is None:
+                answered.append(t.result())
+            else:
+                t.cancel()
+                answered.append([])
+        return merge_results(answered, limit)
+
+
+@cache
+def default_provider() -> AggregateNutritionProvider:
+    """The process-wide provider behind /nutrition/search and the coach (settings.nutrition_providers).
+
+    Each provider sits behind its own lookup cache on the app DB (app.integrations.cache).
+    """
+    from app.db import engine
+    from app.integrations.cache import CachedNutritionProvider
+    names = [n.strip() for n in settings.nutrition_providers.split(",") if n.strip()]
+    unknown = [n for n in names if n not in PROVIDERS]
+    if unknown:
+        raise ValueError(f"unknown nutrition providers: {unknown}")
+    return AggregateNutritionProvider([CachedNutritionProvider(PROVIDERS[n](), engine) for n in names])
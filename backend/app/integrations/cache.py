@@ -0,0 +1,210 @@
+"""Two-tier cache in front of a NutritionProvider.
+
+Answers are keyed by provider + normalized query + limit. An in-process LRU serves repeat
+lookups; the `nutrition_cache` table keeps them across restarts and workers. Empty answers
+are cached too, for a shorter TTL. Past its TTL an answer is still served for a while
+(stale-while-revalidate) while one background refresh fetches a new one.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.integrations.nutrition import NutritionProvider, NutritionResult
+from app.models import NutritionCacheEntry
+
+# background refreshes for sync callers
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="nutrition-refresh")
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    negative_hits: int = 0
+    refreshes: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+            "stale_hits": self.stale_hits, "negative_hits": self.negative_hits,
+            "refreshes": self.refreshes, "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+@dataclass(frozen=True)
+class _Entry:
+    results: list[NutritionResult]
+    fetched_at: float
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class CachedNutritionProvider:
+    """Wraps one provider; same search/asearch interface, answers served from the cache."""
+
+    def __init__(self, provider: NutritionProvider, engine: Engine, *, name: str | None = None,
+                 ttl_s: float | None = None, negative_ttl_s: float | None = None,
+                 stale_s: float | None = None, memory_size: int | None = None,
+                 max_rows: int | None = None, clock: Callable[[], float] = time.time):
+        self.provider = provider
+        self.name = name or getattr(provider, "name", type(provider).__name__)
+        self._engine = engine
+        self.ttl_s = settings.nutrition_cache_ttl_s if ttl_s is None else ttl_s
+        self.negative_ttl_s = (settings.nutrition_cache_negative_ttl_s
+                               if negative_ttl_s is None else negative_ttl_s)
+        self.stale_s = settings.nutrition_cache_stale_s if stale_s is None else stale_s
+        self._memory_size = memory_size or settings.nutrition_cache_memory_size
+        self._max_rows = max_rows or settings.nutrition_cache_max_rows
+        self._clock = clock
+        self._memory: OrderedDict[tuple[str, int], _Entry] = OrderedDict()
+        self._refreshing: set[tuple[str, int]] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    # --- tiers ---
+
+    def _memory_put(self, key: tuple[str, int], entry: _Entry) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_size:
+                self._memory.popitem(last=False)
+                self.stats.evictions += 1
+
+    def _lookup(self, key: tuple[str, int]) -> tuple[Optional[_Entry], str]:
+        """(entry, tier it came from) — memory first, then the table."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry, "memory"
+        with self._engine.connect() as conn:
+            row = conn.execute(select(NutritionCacheEntry.fetched_at, NutritionCacheEntry.results).where(
+                NutritionCacheEntry.provider == self.name, NutritionCacheEntry.query == key[0],
+                NutritionCacheEntry.result_limit == key[1])).first()
+        if row is None:
+            return None, ""
+        entry = _Entry([NutritionResult(**r) for r in json.loads(row.results)], row.fetched_at)
+        self._memory_put(key, entry)
+        return entry, "disk"
+
+    def _store(self, key: tuple[str, int], results: list[NutritionResult]) -> None:
+        entry = _Entry(results, self._clock())
+        self._memory_put(key, entry)
+        where = (NutritionCacheEntry.provider == self.name, NutritionCacheEntry.query == key[0],
+                 NutritionCacheEntry.result_limit == key[1])
+        with self._engine.begin() as conn:
+            conn.execute(delete(NutritionCacheEntry).where(*where))
+            conn.execute(insert(NutritionCacheEntry).values(
+                provider=self.name, query=key[0], result_limit=key[1], fetched_at=entry.fetched_at,
+                results=json.dumps([r.model_dump() for r in results])))
+            # size-bound the table: drop everything older than the newest max_rows answers
+            cutoff = conn.scalar(select(NutritionCacheEntry.fetched_at)
+                                 .order_by(NutritionCacheEntry.fetched_at.desc())
+                                 .offset(self._max_rows).limit(1))
+            if cutoff is not None:
+                gone = conn.execute(delete(NutritionCacheEntry).where(
+                    NutritionCacheEntry.fetched_at <= cutoff)).rowcount
+                self.stats.evictions += gone
+
+    def _classify(self, key: tuple[str, int]) -> tuple[Optional[_Entry], bool]:
+        """(usable entry or None, whether it is stale and should be refreshed)."""
+        entry, tier = self._lookup(key)
+        if entry is not None:
+            ttl = self.ttl_s if entry.results else self.negative_ttl_s
+            age = self._clock() - entry.fetched_at
+        if entry is None or age > ttl + self.stale_s:
+            self.stats.misses += 1
+            return None, False
+        if tier == "memory":
+            self.stats.memory_hits += 1
+        else:
+            self.stats.disk_hits += 1
+        if not entry.results:
+            self.stats.negative_hits += 1
+        if age > ttl:
+            self.stats.stale_hits += 1
+            return entry, True
+        return entry, False
+
+    def _claim_refresh(self, key: tuple[str, int]) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.stats.refreshes += 1
+            return True
+
+    def _release_refresh(self, key: tuple[str, int]) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    # --- provider interface ---
+
+    def search(self, query: str, limit: int = 5) -> list[NutritionResult]:
+        key = (normalize_query(query), limit)
+        entry, stale = self._classify(key)
+        if entry is None:
+            results = self.provider.search(query, limit)
+            self._store(key, results)
+            return results
+        if stale and self._claim_refresh(key):
+            _REFRESH_POOL.submit(self._refresh, key, query, limit)
+        return entry.results
+
+    def _refresh(self, key: tuple[str, int], query: str, limit: int) -> None:
+        try:
+            self._store(key, self.provider.search(query, limit))
+        except Exception:
+            pass  # keep serving the stale answer; the next stale hit retries
+        finally:
+            self._release_refresh(key)
+
+    async def asearch(self, query: str, limit: int = 5) -> list[NutritionResult]:
+        # the table lookups and writes are sync engine calls: keep them off the event loop
+        key = (normalize_query(query), limit)
+        entry, stale = await asyncio.to_thread(self._classify, key)
+        if entry is None:
+            results = await self.provider.asearch(query, limit)
+            await asyncio.to_thread(self._store, key, results)
+            return results
+        if stale and self._claim_refresh(key):
+            task = asyncio.create_task(self._arefresh(key, query, limit))
+            self._tasks.add(task)  # keep a reference until it finishes
+            task.add_done_callback(self._tasks.discard)
+        return entry.results
+
+    async def _arefresh(self, key: tuple[str, int], query: str, limit: int) -> None:
+        try:
+            results = await self.provider.asearch(query, limit)
+            await asyncio.to_thread(self._store, key, results)
+        except Exception:
+            pass  # keep serving the stale answer; the next stale hit retries
+        finally:
+            self._release_refresh(key)
+
+    # --- metrics ---
+
+    def metrics(self) -> dict:
+        with self._engine.connect() as conn:
+            rows = conn.scalar(select(func.count()).select_from(NutritionCacheEntry)
+                               .where(NutritionCacheEntry.provider == self.name))
+        return {**self.stats.as_dict(), "memory_entries": len(self._memory), "stored_entries": rows}
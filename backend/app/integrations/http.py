@@ -0,0 +1,91 @@
+"""Process-wide pooled HTTP clients for the nutrition providers.
+
+Each provider registers its base URL, timeout and concurrency cap once at import; callers
+then share one keep-alive pool per provider instead of opening a client per request. The
+concurrency cap is the pool size, so it holds for sync and async callers alike.
+"""
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import httpx
+
+
+@dataclass(frozen=True)
+class ClientConfig:
+    base_url: str
+    timeout: float = 10.0
+    max_concurrency: int = 4
+    headers: dict = field(default_factory=dict)
+
+    def options(self) -> dict:
+        n = self.max_concurrency
+        return {"base_url": self.base_url, "timeout": self.timeout, "headers": self.headers,
+                "limits": httpx.Limits(max_connections=n, max_keepalive_connections=n)}
+
+
+class ClientRegistry:
+    """Named HTTP clients, created lazily and reused.
+
+    Sync clients are shared process-wide (httpx.Client is thread-safe). Async clients are
+    kept per event loop, since an AsyncClient's pool can't be used from another loop.
+    `transport` lets tests route every client through an httpx.MockTransport.
+    """
+
+    def __init__(self, transport: Optional[Callable[[str], httpx.MockTransport]] = None):
+        self._configs: dict[str, ClientConfig] = {}
+        self._sync: dict[str, httpx.Client] = {}
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = \
+            weakref.WeakKeyDictionary()
+        self._transport = transport
+        self._lock = threading.Lock()
+
+    def register(self, name: str, config: ClientConfig) -> None:
+        self._configs[name] = config
+
+    def config(self, name: str) -> ClientConfig:
+        try:
+            return self._configs[name]
+        except KeyError:
+            raise KeyError(f"no HTTP client registered as {name!r}") from None
+
+    def _kwargs(self, name: str) -> dict:
+        kw = self.config(name).options()
+        if self._transport is not None:
+            kw["transport"] = self._transport(name)
+        return kw
+
+    def client(self, name: str) -> httpx.Client:
+        with self._lock:
+            c = self._sync.get(name)
+            if c is None or c.is_closed:
+                c = self._sync[name] = httpx.Client(**self._kwargs(name))
+            return c
+
+    def async_client(self, name: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            per_loop = self._async.setdefault(loop, {})
+            c = per_loop.get(name)
+            if c is None or c.is_closed:
+                c = per_loop[name] = httpx.AsyncClient(**self._kwargs(name))
+            return c
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._sync = list(self._sync.values()), {}
+        for c in clients:
+            c.close()
+
+    async def aclose(self) -> None:
+        """Close the sync clients and the current loop's async clients."""
+        self.close()
+        with self._lock:
+            clients = list(self._async.pop(asyncio.get_running_loop(), {}).values())
+        for c in clients:
+            await c.aclose()
+
+
+clients = ClientRegistry()
@@ -29,6 +29,9 @@ class NutritionProvider(Protocol):
     def search(self, query: str, limit: int = 5) -> list[NutritionResult]:
         ...
 
+    async def asearch(self, query: str, limit: int = 5) -> list[NutritionResult]:
+        ...
+
 
 def _num(d: dict, key: str, default: float = 0.0) -> float:
     v = d.get(key)
@@ -1,34 +1,57 @@
 """Open Food Facts nutrition provider."""
 import httpx
+from app.config import settings
+from app.integrations.http import ClientConfig, ClientRegistry, clients
 from app.integrations.nutrition import NutritionResult, parse_off_product
 
 _FIELDS = "code,product_name,brands,nutriments"
+_SEARCH_PATH = "/cgi/search.pl"
+
+
+def _search_params(query: str, limit: int) -> dict:
+    return {
+        "search_terms": query,
+        "search_simple": 1,
+        "action": "process",
+        "json": 1,
+        "page_size": limit,
+        "fields": _FIELDS,
+    }
+
+
+def _parse_search(resp: httpx.Response, limit: int) -> list[NutritionResult]:
+    resp.raise_for_status()
+    products = resp.json().get("products", [])
+    results = [parse_off_product(p) for p in products]
+    # keep only usable results (real calorie data)
+    return [r for r in results if r.calories > 0][:limit]
 
 
 class OpenFoodFactsProvider:
+    name = "openfoodfacts"
     BASE = "https://world.openfoodfacts.org"
 
-    def __init__(self, client: httpx.Client | None = None):
-        self._client = client or httpx.Client(
-            base_url=self.BASE,
-            timeout=10.0,
-            headers={"User-Agent": "fitness-coach/0.1 (personal project)"},
-        )
+    def __init__(self, client: httpx.Client | None = None,
+                 async_client: httpx.AsyncClient | None = None,
+                 registry: ClientRegistry = clients):
+        # explicit clients win (tests); otherwise borrow the registry's shared pools
+        self._client = client
+        self._async_client = async_client
+        self._registry = registry
 
     def search(self, query: str, limit: int = 5) -> list[NutritionResult]:
-        resp = self._client.get(
-            "/cgi/search.pl",
-            params={
-                "search_terms": query,
-                "search_simple": 1,
-                "action": "process",
-                "json": 1,
-                "page_size": limit,
-                "fields": _FIELDS,
-            },
-        )
-        resp.raise_for_status()
-        products = resp.json().get("products", [])
-        results = [parse_off_product(p) for p in products]
-        # keep only usable results (real calorie data)
-        return [r for r in results if r.calories > 0][:limit]
+        client = self._client or self._registry.client(self.name)
+        return _parse_search(client.get(_SEARCH_PATH, params=_search_params(query, limit)), limit)
+
+    async def asearch(self, query: str, limit: int = 5) -> list[NutritionResult]:
+        client = self._async_client or self._registry.async_client(self.name)
+        resp = await client.get(_SEARCH_PATH, params=_search_params(query, limit))
+        return _parse_search(resp, limit)
+
+
+clients.register(OpenFoodFactsProvider.name, ClientConfig(
+    base_url=OpenFoodFactsProvider.BASE,
+    timeout=10.0,
+    max_concurrency=settings.off_max_concurrency,
+    headers={"User-Agent": "fitness-coach/0.1 (personal project)"},
+))
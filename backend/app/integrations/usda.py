@@ -1,6 +1,9 @@
 """USDA FoodData Central provider — rich macros + micros (per 100 g)."""
+import asyncio
 import os
 import httpx
+from app.config import settings
+from app.integrations.http import ClientConfig, ClientRegistry, clients
 from app.integrations.nutrition import NutritionResult
 
 # nutrient numbers (consistent across SR Legacy + Foundation)
@@ -48,18 +51,58 @@ def parse_usda_food(food: dict) -> NutritionResult:
 
 
 class USDAProvider:
+    name = "usda"
     BASE = "https://api.nal.usda.gov"
+    DATA_TYPES = ("Foundation", "SR Legacy")
 
-    def __init__(self, api_key: str | None = None, client: httpx.Client | None = None):
+    def __init__(self, api_key: str | None = None, client: httpx.Client | None = None,
+                 async_client: httpx.AsyncClient | None = None,
+                 registry: ClientRegistry = clients, mode: str | None = None, local=None):
         self.api_key = api_key or os.environ.get("USDA_API_KEY", "DEMO_KEY")
-        self._client = client or httpx.Client(base_url=self.BASE, timeout=15.0)
+        self._client = client
+        self._async_client = async_client
+        self._registry = registry
+        self.mode = mode or settings.usda_mode
+        if self.mode not in ("api", "local"):
+            raise ValueError(f"unsupported usda_mode: {self.mode!r}")
+        # "local": answer from the usda_foods mirror (a LocalUSDAIndex) instead of the API
+        self._local = local
 
-    def search(self, query: str, limit: int = 5,
-               data_types: tuple[str, ...] = ("Foundation", "SR Legacy")) -> list[NutritionResult]:
-        resp = self._client.get("/fdc/v1/foods/search", params={
-            "query": query, "pageSize": limit, "api_key": self.api_key,
-            "dataType": ",".join(data_types),
-        })
+    def _local_index(self):
+        if self._local is None:
+            from app.db import engine
+            from app.integrations.usda_local import LocalUSDAIndex
+            self._local = LocalUSDAIndex(engine)
+        return self._local
+
+    def _params(self, query: str, limit: int, data_types: tuple[str, ...]) -> dict:
+        return {"query": query, "pageSize": limit, "api_key": self.api_key,
+                "dataType": ",".join(data_types)}
+
+    @staticmethod
+    def _parse(resp: httpx.Response, limit: int) -> list[NutritionResult]:
         resp.raise_for_status()
         foods = resp.json().get("foods", [])
         return [parse_usda_food(f) for f in foods][:limit]
+
+    def search(self, query: str, limit: int = 5,
+               data_types: tuple[str, ...] = DATA_TYPES) -> list[NutritionResult]:
+        if self.mode == "local":
+            return self._local_index().search(query, limit, data_types)
+        client = self._client or self._registry.client(self.name)
+        resp = client.get("/fdc/v1/foods/search", params=self._params(query, limit, data_types))
+        return self._parse(resp, limit)
+
+    async def asearch(self, query: str, limit: int = 5,
+                      data_types: tuple[str, ...] = DATA_TYPES) -> list[NutritionResult]:
+        if self.mode == "local":
+            # indexed, no network, but a sync DB query: run it off the event loop
+            return await asyncio.to_thread(self._local_index().search, query, limit, data_types)
+        client = self._async_client or self._registry.async_client(self.name)
+        resp = await client.get("/fdc/v1/foods/search", params=self._params(query, limit, data_types))
+        return self._parse(resp, limit)
+
+
+clients.register(USDAProvider.name, ClientConfig(
+    base_url=USDAProvider.BASE, timeout=15.0, max_concurrency=settings.usda_max_concurrency,
+))
@@ -0,0 +1,140 @@
+"""Local FoodData Central mirror: stream a bulk FDC JSON dump into `usda_foods`, search it offline.
+
+The bulk downloads (`FoodData_Central_sr_legacy_food_json_*.zip`, `..._foundation_food_json_*`)
+are one JSON object holding a single array of foods. The importer decodes that array one
+food at a time and writes in batches, so memory stays flat whatever the dump size.
+"""
+import io
+import json
+import zipfile
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Sequence
+
+from sqlalchemy import case, column, delete, func, insert, literal_column, select, table, text
+from sqlalchemy.engine import Engine
+
+from app.integrations.nutrition import NutritionResult
+from app.integrations.usda import USDAProvider, parse_usda_food
+from app.models import USDA_SEARCH_TABLE, UsdaFood, food_search_supported
+
+_CHUNK = 1 << 16
+_TRIGRAM = 3
+_usda_fts = table(USDA_SEARCH_TABLE, column("rowid"))
+
+
+def iter_json_array(fp: IO[str], chunk_size: int = _CHUNK) -> Iterator[dict]:
+    """Yield the elements of the first JSON array in `fp`, decoding one element at a time."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    while "[" not in buf:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            return
+        buf += chunk
+    buf = buf[buf.index("[") + 1:]
+    while True:
+        buf = buf.lstrip(" \t\r\n,")
+        if buf.startswith("]"):
+            return
+        try:
+            item, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                raise
+            buf += chunk
+            continue
+        yield item
+        buf = buf[end:]
+
+
+def _open_dump(path: Path) -> IO[str]:
+    if path.suffix == ".zip":
+        zf = zipfile.ZipFile(path)
+        member = next(n for n in zf.namelist() if n.endswith(".json"))
+        return io.TextIOWrapper(zf.open(member), encoding="utf-8")
+    return path.open(encoding="utf-8")
+
+
+def to_search_shape(food: dict) -> dict:
+    """Bulk-dump food ({"nutrient": {"number"}, "amount"}) -> the search API's shape that
+    parse_usda_food reads ({"nutrientNumber", "value"})."""
+    nutrients = [{"nutrientNumber": n["nutrient"].get("number"), "value": n.get("amount")}
+                 for n in food.get("foodNutrients", []) if "nutrient" in n]
+    return {**food, "foodNutrients": nutrients}
+
+
+def _row(food: dict) -> dict:
+    r = parse_usda_food(to_search_shape(food))
+    return {"fdc_id": int(food["fdcId"]), "data_type": food.get("dataType", ""),
+            "name": r.name, "result": r.model_dump_json()}
+
+
+def import_foods(engine: Engine, foods: Iterable[dict],
+                 data_types: Sequence[str] = USDAProvider.DATA_TYPES, batch_size: int = 500) -> int:
+    """Upsert FDC foods of the given data types into usda_foods; returns how many were written."""
+    wanted, batch, n = set(data_types), [], 0
+
+    def flush():
+        with engine.begin() as conn:
+            # delete + insert rather than UPDATE so the FTS triggers see the new name
+            conn.execute(delete(UsdaFood).where(UsdaFood.fdc_id.in_([r["fdc_id"] for r in batch])))
+            conn.execute(insert(UsdaFood), batch)
+        batch.clear()
+
+    for food in foods:
+        if food.get("dataType") not in wanted or not food.get("fdcId"):
+            continue
+        batch.append(_row(food))
+        n += 1
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return n
+
+
+def import_dump(engine: Engine, path: str | Path,
+                data_types: Sequence[str] = USDAProvider.DATA_TYPES, batch_size: int = 500) -> int:
+    """Stream one bulk FDC JSON dump (.json or the downloaded .zip) into usda_foods."""
+    with _open_dump(Path(path)) as fp:
+        return import_foods(engine, iter_json_array(fp), data_types, batch_size)
+
+
+class LocalUSDAIndex:
+    """Offline USDA search over usda_foods: every query word must appear in the name."""
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._indexed: bool | None = None
+
+    def _has_index(self, conn) -> bool:
+        if self._indexed is None:
+            self._indexed = food_search_supported(conn.dialect.name) and conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :n"), {"n": USDA_SEARCH_TABLE}
+            ).first() is not None
+        return self._indexed
+
+    def search(self, query: str, limit: int = 5,
+               data_types: Sequence[str] = USDAProvider.DATA_TYPES) -> list[NutritionResult]:
+        words = [w for w in query.strip().split() if w]
+        if not words:
+            return []
+        with self._engine.connect() as conn:
+            indexed = [w for w in words if len(w) >= _TRIGRAM] if self._has_index(conn) else []
+            stmt = select(UsdaFood.result).where(UsdaFood.data_type.in_(data_types))
+            if indexed:
+                match = " AND ".join('"' + w.replace('"', '""') + '"' for w in indexed)
+                stmt = stmt.join(_usda_fts, _usda_fts.c.rowid == UsdaFood.fdc_id).where(
+                    literal_column(USDA_SEARCH_TABLE).op("MATCH")(match))
+            conds = [UsdaFood.name.icontains(w, autoescape=True) for w in words if w not in indexed]
+            # USDA names lead with the noun ("Rice, brown, ..."): prefer those, then the plainest
+            lead = case((func.lower(UsdaFood.name).startswith(words[0].lower(), autoescape=True), 0),
+                        else_=1)
+            stmt = stmt.where(*conds).order_by(lead, func.length(UsdaFood.name), UsdaFood.name)
+            rows = conn.scalars(stmt.limit(limit)).all()
+        return [NutritionResult.model_validate_json(r) for r in rows]
+
+    def count(self) -> int:
+        with self._engine.connect() as conn:
+            return conn.scalar(select(func.count()).select_from(UsdaFood))
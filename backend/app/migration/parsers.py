@@ -5,12 +5,13 @@ from app.models import Food
 _MULT = re.compile(r"^\s*([0-9]+(?:\.[0-9]+)?)\s*x\s+(.*\S)\s*$", re.IGNORECASE)
 
 
-def food_from_row(row: dict) -> Food:
+def food_values(row: dict) -> dict:
+    """Legacy food row -> Food column values (for bulk inserts)."""
     def num(key):
         v = row.get(key)
         return float(v) if v is not None else 0.0
 
-    return Food(
+    return dict(
         name=str(row["Name"]).strip(),
         brand=str(row.get("Label") or "").strip(),
         serving_description=str(row.get("Measurement") or "100g").strip(),
@@ -24,6 +25,10 @@ def food_from_row(row: dict) -> Food:
     )
 
 
+def food_from_row(row: dict) -> Food:
+    return Food(**food_values(row))
+
+
 def parse_meal_food_name(raw: str) -> tuple[float, str]:
     """'2.1x Chichen' -> (2.1, 'Chichen'). Raises ValueError on non-item rows."""
     m = _MULT.match(raw or "")
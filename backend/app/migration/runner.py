@@ -1,59 +1,106 @@
-"""Seed the DB from legacy Excel exports. Idempotent on foods (name+brand)."""
+"""Seed the DB from legacy Excel exports. Idempotent on foods (name+brand) and meal names.
+
+Set-based: existing foods and meals are preloaded in one query each, sheet rows are
+streamed from openpyxl's read-only reader, and new rows go in as batched INSERTs (one
+cached statement, sent as multi-row VALUES) — round-trips per batch, not per row.
+"""
+from itertools import islice
+from typing import Iterable, Iterator
+
 from openpyxl import load_workbook
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
-from app.models import Meal, MealItem
-from app.repositories import FoodRepository, MealRepository
-from app.migration.parsers import food_from_row, parse_meal_food_name
+from app.models import Food, Meal, MealItem
+from app.migration.parsers import food_values, parse_meal_food_name
 
+BATCH_SIZE = 500  # rows per INSERT; keeps bound parameters well under SQLite's limit
 
-def _rows(path: str) -> list[dict]:
+
+def _rows(path: str) -> Iterator[dict]:
+    """Stream a sheet's rows as {header: value}, skipping blank rows."""
     wb = load_workbook(path, read_only=True, data_only=True)
-    ws = wb.active
-    data = list(ws.iter_rows(values_only=True))
-    if not data:
-        return []
-    header = [str(h) for h in data[0]]
-    return [dict(zip(header, r)) for r in data[1:] if any(c is not None for c in r)]
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        header = [str(h) for h in first]
+        for r in rows:
+            if any(c is not None for c in r):
+                yield dict(zip(header, r))
+    finally:
+        wb.close()
+
+
+def _batches(items: Iterable, size: int = BATCH_SIZE) -> Iterator[list]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _key(name: str, brand: str) -> tuple[str, str]:
+    # same match as FoodRepository.find_by_name_brand: case-insensitive, stripped input
+    return name.strip().lower(), (brand or "").strip().lower()
 
 
 def migrate(session: Session, foods_path: str, meals_path: str | None = None) -> dict:
-    foods = FoodRepository(session)
-    report = {"foods_added": 0, "meals_added": 0, "meal_items_added": 0, "skipped": 0}
-
-    for row in _rows(foods_path):
-        if not row.get("Name"):
-            continue
-        if foods.find_by_name_brand(str(row["Name"]), str(row.get("Label") or "")):
-            continue
-        foods.add(food_from_row(row))
-        report["foods_added"] += 1
-    session.flush()
+    report = {"foods_added": 0, "meals_added": 0, "meal_items_added": 0, "skipped": 0, "rows_read": 0}
+
+    food_ids = {_key(name, brand): fid for fid, name, brand in
+                session.execute(select(Food.id, Food.name, Food.brand))}
+
+    def new_food_rows() -> Iterator[dict]:
+        pending = set()
+        for row in _rows(foods_path):
+            report["rows_read"] += 1
+            if not row.get("Name"):
+                continue
+            key = _key(str(row["Name"]), str(row.get("Label") or ""))
+            if key in food_ids or key in pending:
+                continue
+            pending.add(key)
+            yield food_values(row)
+
+    for batch in _batches(new_food_rows()):
+        # RETURNING hands back the new ids to link meal items against
+        for fid, name, brand in session.execute(
+                insert(Food).returning(Food.id, Food.name, Food.brand), batch):
+            food_ids[_key(name, brand)] = fid
+        report["foods_added"] += len(batch)
 
     if meals_path:
-        meals = MealRepository(session)
-        grouped: dict[str, list[dict]] = {}
+        # lowercased in Python like every row below: SQLite's lower() only folds ASCII
+        existing = {n.lower() for n in session.scalars(select(Meal.name))}
+        grouped: dict[str, list[tuple[int, float]]] = {}
         for row in _rows(meals_path):
+            report["rows_read"] += 1
             name = row.get("Meal_Name")
-            if name:
-                grouped.setdefault(str(name), []).append(row)
-
-        for meal_name, items in grouped.items():
-            if meals.find_by_name(meal_name):
+            if not name or str(name).lower() in existing:
+                continue
+            items = grouped.setdefault(str(name), [])
+            try:
+                mult, food_name = parse_meal_food_name(str(row.get("Food_Name") or ""))
+            except ValueError:
+                continue  # Total / summary rows
+            fid = food_ids.get(_key(food_name, str(row.get("Label") or "")))
+            if fid is None:
+                report["skipped"] += 1
                 continue
-            meal = Meal(name=meal_name)
-            session.add(meal)
-            session.flush()
-            for row in items:
-                try:
-                    mult, food_name = parse_meal_food_name(str(row.get("Food_Name") or ""))
-                except ValueError:
-                    continue  # Total / summary rows
-                food = foods.find_by_name_brand(food_name, str(row.get("Label") or ""))
-                if not food:
-                    report["skipped"] += 1
-                    continue
-                session.add(MealItem(meal_id=meal.id, food_id=food.id, servings=mult))
-                report["meal_items_added"] += 1
-            report["meals_added"] += 1
+            items.append((fid, mult))
+
+        names = []
+        for name in grouped:  # drop case-variants of a name already being added
+            if name.lower() not in existing:
+                existing.add(name.lower())
+                names.append(name)
+        for batch in _batches(names):
+            new_meals = session.execute(insert(Meal).returning(Meal.id, Meal.name),
+                                        [{"name": n} for n in batch])
+            item_rows = [{"meal_id": mid, "food_id": fid, "servings": mult}
+                         for mid, n in new_meals for fid, mult in grouped[n]]
+            for items in _batches(item_rows):
+                session.execute(insert(MealItem), items)
+            report["meals_added"] += len(batch)
+            report["meal_items_added"] += len(item_rows)
 
     return report
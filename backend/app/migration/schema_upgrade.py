@@ -1,6 +1,9 @@
 """Idempotent additive schema upgrades for the existing SQLite dev DB."""
 from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.engine import Engine
+from app.db import Base
+from app.models import FOOD_SEARCH_DDL, FOOD_SEARCH_TABLE, food_search_supported
 
 _FOOD_MICRO_COLUMNS = {
     "sugar_g": "FLOAT", "iron_mg": "FLOAT", "calcium_mg": "FLOAT",
@@ -14,3 +17,28 @@ def ensure_food_micro_columns(engine: Engine) -> None:
         for name, sqltype in _FOOD_MICRO_COLUMNS.items():
             if name not in existing:
                 conn.execute(text(f"ALTER TABLE foods ADD COLUMN {name} {sqltype}"))
+
+
+def ensure_food_search_index(engine: Engine) -> None:
+    """Create the foods FTS index + sync triggers on a DB that predates them, then
+    populate it from the existing rows. No-op when the index is already there."""
+    if not food_search_supported(engine.dialect.name):
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :n"),
+                              {"n": FOOD_SEARCH_TABLE}).first()
+        if exists:
+            return
+        for stmt in FOOD_SEARCH_DDL:
+            conn.execute(text(stmt))
+        conn.execute(text(f"INSERT INTO {FOOD_SEARCH_TABLE}({FOOD_SEARCH_TABLE}) VALUES ('rebuild')"))
+
+
+def ensure_indexes(engine: Engine) -> None:
+    """Add any index declared on the models (e.g. the lower(name) expression indexes) that
+    a DB created before it lacks. Run after create_all, so every table exists."""
+    # IF NOT EXISTS: checkfirst's reflection doesn't report expression indexes on SQLite
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
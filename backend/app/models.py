@@ -1,6 +1,7 @@
+import sqlite3
 from datetime import date
 from typing import Optional
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import DDL, Index, String, ForeignKey, LargeBinary, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db import Base
 
@@ -52,6 +53,36 @@ class Food(Base):
         return self.fat_saturated + self.fat_unsaturated
 
 
+# SQLite FTS5 index over food names. The trigram tokenizer matches arbitrary substrings,
+# so FoodRepository.search keeps its "every word, any order" semantics without a full
+# scan. Triggers keep it in sync on insert/update/delete; it is created with the foods
+# table, and ensure_food_search_index backfills DBs that predate it.
+FOOD_SEARCH_TABLE = "foods_fts"
+FOOD_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FOOD_SEARCH_TABLE} USING fts5("
+    "name, content='foods', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS foods_fts_ai AFTER INSERT ON foods BEGIN "
+    f"INSERT INTO {FOOD_SEARCH_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS foods_fts_ad AFTER DELETE ON foods BEGIN "
+    f"INSERT INTO {FOOD_SEARCH_TABLE}({FOOD_SEARCH_TABLE}, rowid, name) "
+    f"VALUES ('delete', old.id, old.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS foods_fts_au AFTER UPDATE OF name ON foods BEGIN "
+    f"INSERT INTO {FOOD_SEARCH_TABLE}({FOOD_SEARCH_TABLE}, rowid, name) "
+    f"VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {FOOD_SEARCH_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+)
+
+
+def food_search_supported(dialect_name: str) -> bool:
+    """FTS5's trigram tokenizer is SQLite-only and needs SQLite >= 3.34."""
+    return dialect_name == "sqlite" and sqlite3.sqlite_version_info >= (3, 34)
+
+
+for _stmt in FOOD_SEARCH_DDL:
+    event.listen(Food.__table__, "after_create", DDL(_stmt).execute_if(
+        callable_=lambda ddl, target, bind, **kw: food_search_supported(bind.dialect.name)))
+
+
 class Meal(Base):
     __tablename__ = "meals"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -61,17 +92,48 @@ class Meal(Base):
     )
 
 
+# Case-insensitive lookups (find_by_name_brand, find_by_name) compare lower(column), which
+# the plain name indexes can't serve. SQLite and Postgres both index the expression
+# itself; created with the tables, and ensure_indexes adds them to DBs that predate them.
+# Not unique: existing DBs may hold case-variant duplicates.
+CASE_INSENSITIVE_INDEXES = (
+    Index("ix_foods_lower_name_brand", func.lower(Food.name), func.lower(Food.brand)),
+    Index("ix_meals_lower_name", func.lower(Meal.name)),
+    Index("ix_users_lower_name", func.lower(User.name)),
+)
+
+
 class MealItem(Base):
     __tablename__ = "meal_items"
     id: Mapped[int] = mapped_column(primary_key=True)
-    meal_id: Mapped[int] = mapped_column(ForeignKey("meals.id"))
-    food_id: Mapped[int] = mapped_column(ForeignKey("foods.id"))
+    # both indexed: loading a meal's items, and finding the meals that use a food
+    meal_id: Mapped[int] = mapped_column(ForeignKey("meals.id"), index=True)
+    food_id: Mapped[int] = mapped_column(ForeignKey("foods.id"), index=True)
     servings: Mapped[float] = mapped_column(default=1.0)
 
     meal: Mapped["Meal"] = relationship(back_populates="items")
     food: Mapped["Food"] = relationship(back_populates="meal_items")
 
 
+class MealTotals(Base):
+    """A saved meal's recipe totals (sum of food NUTRIENTS × servings), one row per meal,
+    so meal lists read one row instead of walking items and foods (see app.rollups)."""
+    __tablename__ = "meal_totals"
+    meal_id: Mapped[int] = mapped_column(ForeignKey("meals.id", ondelete="CASCADE"), primary_key=True)
+    calories: Mapped[float] = mapped_column(default=0.0)
+    protein: Mapped[float] = mapped_column(default=0.0)
+    carbs: Mapped[float] = mapped_column(default=0.0)
+    fat_saturated: Mapped[float] = mapped_column(default=0.0)
+    fat_unsaturated: Mapped[float] = mapped_column(default=0.0)
+    fiber: Mapped[float] = mapped_column(default=0.0)
+    sodium: Mapped[float] = mapped_column(default=0.0)
+    iron_mg: Mapped[float] = mapped_column(default=0.0)
+    calcium_mg: Mapped[float] = mapped_column(default=0.0)
+    potassium_mg: Mapped[float] = mapped_column(default=0.0)
+    vitamin_c_mg: Mapped[float] = mapped_column(default=0.0)
+    vitamin_d_ug: Mapped[float] = mapped_column(default=0.0)
+
+
 class Plan(Base):
     __tablename__ = "plans"
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -109,7 +171,108 @@ class LogEntry(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     eaten_on: Mapped[date] = mapped_column(default=date.today)
-    food_id: Mapped[int] = mapped_column(ForeignKey("foods.id"))
+    food_id: Mapped[int] = mapped_column(ForeignKey("foods.id"), index=True)
     servings: Mapped[float] = mapped_column(default=1.0)
     source: Mapped[str] = mapped_column(String, default="manual")
     food: Mapped["Food"] = relationship()
+
+    __table_args__ = (Index("ix_log_entries_user_day", "user_id", "eaten_on"),)
+
+
+class DailyIntake(Base):
+    """A user's logged totals for one day (sum of food NUTRIENTS × servings), so trends
+    read one row per day instead of re-scanning log_entries (see app.rollups)."""
+    __tablename__ = "daily_intake"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True)
+    entries: Mapped[int] = mapped_column(default=0)
+    calories: Mapped[float] = mapped_column(default=0.0)
+    protein: Mapped[float] = mapped_column(default=0.0)
+    carbs: Mapped[float] = mapped_column(default=0.0)
+    fat_saturated: Mapped[float] = mapped_column(default=0.0)
+    fat_unsaturated: Mapped[float] = mapped_column(default=0.0)
+    fiber: Mapped[float] = mapped_column(default=0.0)
+    sodium: Mapped[float] = mapped_column(default=0.0)
+    iron_mg: Mapped[float] = mapped_column(default=0.0)
+    calcium_mg: Mapped[float] = mapped_column(default=0.0)
+    potassium_mg: Mapped[float] = mapped_column(default=0.0)
+    vitamin_c_mg: Mapped[float] = mapped_column(default=0.0)
+    vitamin_d_ug: Mapped[float] = mapped_column(default=0.0)
+
+
+class AgentCheckpoint(Base):
+    """Latest coach-agent checkpoint per conversation thread (see app.agent.memory)."""
+    __tablename__ = "agent_checkpoints"
+    thread_id: Mapped[str] = mapped_column(String, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    checkpoint_id: Mapped[str] = mapped_column(String)
+    parent_id: Mapped[Optional[str]] = mapped_column(String, default=None)
+    type: Mapped[str] = mapped_column(String)
+    checkpoint: Mapped[bytes] = mapped_column(LargeBinary)
+    meta_type: Mapped[str] = mapped_column(String)
+    meta: Mapped[bytes] = mapped_column(LargeBinary)
+
+
+class AgentCheckpointWrite(Base):
+    """Pending task writes against a thread's latest checkpoint."""
+    __tablename__ = "agent_checkpoint_writes"
+    thread_id: Mapped[str] = mapped_column(String, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    checkpoint_id: Mapped[str] = mapped_column(String, primary_key=True)
+    task_id: Mapped[str] = mapped_column(String, primary_key=True)
+    idx: Mapped[int] = mapped_column(primary_key=True)
+    channel: Mapped[str] = mapped_column(String)
+    type: Mapped[str] = mapped_column(String)
+    value: Mapped[bytes] = mapped_column(LargeBinary)
+    task_path: Mapped[str] = mapped_column(String, default="")
+
+
+class NutritionCacheEntry(Base):
+    """A provider's answer to one normalized search (see app.integrations.cache)."""
+    __tablename__ = "nutrition_cache"
+    provider: Mapped[str] = mapped_column(String, primary_key=True)
+    query: Mapped[str] = mapped_column(String, primary_key=True)
+    result_limit: Mapped[int] = mapped_column(primary_key=True)
+    fetched_at: Mapped[float] = mapped_column(index=True)
+    results: Mapped[str] = mapped_column(String)  # JSON list of NutritionResult
+
+
+class UsdaFood(Base):
+    """One food from a local FoodData Central mirror (see app.integrations.usda_local)."""
+    __tablename__ = "usda_foods"
+    fdc_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    data_type: Mapped[str] = mapped_column(String, index=True)
+    name: Mapped[str] = mapped_column(String)
+    result: Mapped[str] = mapped_column(String)  # JSON NutritionResult (per 100 g)
+
+
+# Same trigram index as foods_fts, over the mirror's names (rows are only inserted/deleted)
+USDA_SEARCH_TABLE = "usda_foods_fts"
+USDA_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {USDA_SEARCH_TABLE} USING fts5("
+    "name, content='usda_foods', content_rowid='fdc_id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS usda_foods_fts_ai AFTER INSERT ON usda_foods BEGIN "
+    f"INSERT INTO {USDA_SEARCH_TABLE}(rowid, name) VALUES (new.fdc_id, new.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS usda_foods_fts_ad AFTER DELETE ON usda_foods BEGIN "
+    f"INSERT INTO {USDA_SEARCH_TABLE}({USDA_SEARCH_TABLE}, rowid, name) "
+    f"VALUES ('delete', old.fdc_id, old.name); END",
+)
+
+for _stmt in USDA_SEARCH_DDL:
+    event.listen(UsdaFood.__table__, "after_create", DDL(_stmt).execute_if(
+        callable_=lambda ddl, target, bind, **kw: food_search_supported(bind.dialect.name)))
+
+
+class SeedState(Base):
+    """What the last full startup applied (see app.seed.startup). One row per key."""
+    __tablename__ = "seed_state"
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    schema_version: Mapped[int]
+    staples_hash: Mapped[str] = mapped_column(String)
+    micros_hash: Mapped[str] = mapped_column(String)
+    foods_max_id: Mapped[int] = mapped_column(default=0)  # foods above it haven't been enriched
+
+
+# Session listeners that keep meal_totals and daily_intake current; imported last so
+# every mapped class above exists when they register.
+from app import rollups  # noqa: E402,F401
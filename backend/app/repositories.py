@@ -1,8 +1,161 @@
 import datetime
-from typing import Optional
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
-from app.models import User, Food, Meal, Plan, PlanEntry, PlanItem, LogEntry
+import weakref
+from typing import AsyncIterator, Iterator, Optional
+from sqlalchemy import case, column, insert, literal_column, select, func, table, text, tuple_, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from app.models import (
+    User, Food, Meal, MealTotals, Plan, PlanEntry, PlanItem, LogEntry, DailyIntake,
+    FOOD_SEARCH_TABLE, food_search_supported,
+)
+from app.core.macros import NUTRIENTS, FoodVector
+
+# strftime (SQLite) / to_char (Postgres) patterns for LogRepository.totals_for_range
+_PERIOD_FORMATS = {"month": ("%Y-%m", "YYYY-MM"), "year": ("%Y", "YYYY")}
+
+_food_fts = table(FOOD_SEARCH_TABLE, column("rowid"))
+_TRIGRAM = 3  # shortest word the trigram index can answer
+_PLAN_GRAPH = selectinload(Plan.entries).selectinload(PlanEntry.items).selectinload(PlanItem.food)
+_SEARCH_INDEX_PROBE = text("SELECT 1 FROM sqlite_master WHERE name = :n").bindparams(n=FOOD_SEARCH_TABLE)
+# Engines whose search index is known to exist. The index is created (create_all or the
+# startup upgrade) but never dropped, so only a hit is remembered: a miss probes again.
+_SEARCH_INDEXED: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+# Statement builders shared by the sync repositories and their async twins below.
+
+
+def _food_by_name_brand(name: str, brand: str):
+    # exact, case-insensitive, whitespace-tolerant — robust dedup.
+    # lower(column) = ... is served by ix_foods_lower_name_brand (see models); both sides
+    # go through SQL lower() because SQLite's only folds ASCII and str.lower() folds all.
+    return select(Food).where(
+        func.lower(Food.name) == func.lower(name.strip()),
+        func.lower(Food.brand) == func.lower((brand or "").strip()),
+    )
+
+
+_NAME_BRAND_KEYS = select(Food.name, Food.brand, Food.id)
+
+
+def _name_brand_keys(rows) -> dict[tuple[str, str], int]:
+    # folded in Python, like the incoming rows they are matched against: SQLite's lower()
+    # only folds ASCII, so lowering in SQL would miss e.g. Greek names on every re-import
+    return {(name.strip().lower(), (brand or "").strip().lower()): food_id
+            for name, brand, food_id in rows}
+_INSERT_FOODS = insert(Food).returning(Food.id, sort_by_parameter_order=True)
+
+
+def _by_lower_name(model, name: str):
+    # exact, case-insensitive; ilike would scan and treat % and _ as wildcards
+    return select(model).where(func.lower(model.name) == func.lower(name))
+
+
+def _food_search(query: str, limit: int, has_index: bool):
+    """None for a blank query, else the ranked search select (see FoodRepository.search)."""
+    # token match: every query word must appear in the name (any order), so
+    # "brown rice" matches the USDA-style name "Rice, Brown, Parboiled, Cooked".
+    words = [w for w in query.strip().split() if w]
+    if not words:
+        return None
+    indexed = [w for w in words if len(w) >= _TRIGRAM] if has_index else []
+    stmt = select(Food)
+    if indexed:
+        # FTS5 narrows to candidate rows; words too short for trigrams filter those
+        match = " AND ".join('"' + w.replace('"', '""') + '"' for w in indexed)
+        stmt = stmt.join(_food_fts, _food_fts.c.rowid == Food.id).where(
+            literal_column(FOOD_SEARCH_TABLE).op("MATCH")(match))
+    conds = [Food.name.icontains(w, autoescape=True) for w in words if w not in indexed]
+    # rank: exact name > name prefix > any token match; then name, brand
+    phrase = " ".join(words).lower()
+    lname = func.lower(Food.name)
+    rank = case((lname == phrase, 0), (lname.startswith(phrase, autoescape=True), 1), else_=2)
+    return stmt.where(*conds).order_by(rank, Food.name, Food.brand).limit(limit)
+
+
+# FoodVector rows straight from SQL: no entities, identity map or instrumented attributes
+_FOOD_VECTOR = select(Food.id, Food.name,
+                      *(func.coalesce(getattr(Food, n), 0.0) for n in NUTRIENTS))
+
+
+def _food_vectors(food_ids: Optional[list[int]] = None):
+    if food_ids is None:
+        return _FOOD_VECTOR.order_by(Food.name)
+    return _FOOD_VECTOR.where(Food.id.in_(food_ids))
+
+
+# A saved meal as one FoodVector: its id, name and materialized recipe totals
+_MEAL_VECTOR = (select(Meal.id, Meal.name,
+                       *(func.coalesce(getattr(MealTotals, n), 0.0) for n in NUTRIENTS))
+                .outerjoin(MealTotals, MealTotals.meal_id == Meal.id))
+
+
+def _meal_vectors(meal_ids: Optional[list[int]] = None):
+    if meal_ids is None:
+        return _MEAL_VECTOR.order_by(Meal.name)
+    return _MEAL_VECTOR.where(Meal.id.in_(meal_ids))
+
+
+def _food_listing(columns: list, after: Optional[tuple[str, int]] = None):
+    """Foods in keyset order: rows are (name, id, *columns), strictly after the `after`
+    (name, id) cursor. The name index (which carries the rowid) serves each page as a
+    range scan, however deep."""
+    stmt = select(Food.name, Food.id, *columns).order_by(Food.name, Food.id)
+    if after is not None:
+        stmt = stmt.where(tuple_(Food.name, Food.id) > tuple_(*after))
+    return stmt
+
+
+def _plan_from_draft(user_id: Optional[int], name: str, draft: list[dict]) -> Plan:
+    plan = Plan(user_id=user_id, name=name)
+    for pos, entry in enumerate(draft):
+        pe = PlanEntry(name=entry.get("name", f"Meal {pos + 1}"), position=pos)
+        for food, servings in entry["items"]:
+            pe.items.append(PlanItem(food_id=food.id, servings=servings))
+        plan.entries.append(pe)
+    return plan
+
+
+def _log_for_day(user_id: int, day: datetime.date):
+    return (select(LogEntry).where(LogEntry.user_id == user_id, LogEntry.eaten_on == day)
+            .options(selectinload(LogEntry.food)))
+
+
+def _log_totals(dialect: str, user_id: int, start: datetime.date, end: datetime.date,
+                group_by: str):
+    if group_by == "day":
+        period = LogEntry.eaten_on
+    elif group_by in _PERIOD_FORMATS:
+        sqlite_fmt, pg_fmt = _PERIOD_FORMATS[group_by]
+        if dialect == "sqlite":
+            period = func.strftime(sqlite_fmt, LogEntry.eaten_on)
+        else:
+            period = func.to_char(LogEntry.eaten_on, pg_fmt)
+    else:
+        raise ValueError(f"unsupported group_by: {group_by!r}")
+    period = period.label("period")
+    sums = [func.sum(LogEntry.servings * func.coalesce(getattr(Food, n), 0)).label(n)
+            for n in NUTRIENTS]
+    return (select(period, func.count(LogEntry.id).label("entries"), *sums)
+            .join(Food, Food.id == LogEntry.food_id)
+            .where(LogEntry.user_id == user_id, LogEntry.eaten_on.between(start, end))
+            .group_by(period).order_by(period))
+
+
+def _daily_intake(user_id: int, start: datetime.date, end: datetime.date):
+    return (select(DailyIntake.day, DailyIntake.entries, *(getattr(DailyIntake, n) for n in NUTRIENTS))
+            .where(DailyIntake.user_id == user_id, DailyIntake.day.between(start, end))
+            .order_by(DailyIntake.day))
+
+
+def _period_rows(result) -> list[dict]:
+    out = []
+    for r in result.mappings():
+        row = dict(r)
+        if isinstance(row["period"], datetime.date):
+            row["period"] = row["period"].isoformat()
+        out.append(row)
+    return out
 
 
 class FoodRepository:
@@ -14,13 +167,7 @@ class FoodRepository:
         return food
 
     def find_by_name_brand(self, name: str, brand: str) -> Optional[Food]:
-        # exact, case-insensitive, whitespace-tolerant — robust dedup
-        return self.s.scalar(
-            select(Food).where(
-                func.lower(Food.name) == name.strip().lower(),
-                func.lower(Food.brand) == (brand or "").strip().lower(),
-            )
-        )
+        return self.s.scalar(_food_by_name_brand(name, brand))
 
     def get(self, food_id: int) -> Optional[Food]:
         return self.s.get(Food, food_id)
@@ -28,16 +175,52 @@ class FoodRepository:
     def list_all(self) -> list[Food]:
         return list(self.s.scalars(select(Food).order_by(Food.name)))
 
+    def list_vectors(self) -> list[FoodVector]:
+        """Every food as a FoodVector, in list_all order."""
+        return list(map(FoodVector._make, self.s.execute(_food_vectors())))
+
+    def get_vectors(self, food_ids: list[int]) -> dict[int, FoodVector]:
+        rows = self.s.execute(_food_vectors(food_ids))
+        return {r[0]: FoodVector._make(r) for r in rows}
+
+    def name_brand_keys(self) -> dict[tuple[str, str], int]:
+        """(name, brand) -> id for every food, in one query, keyed like the rows of a bulk
+        import (stripped, lowercased in Python): the in-memory dedup set."""
+        return _name_brand_keys(self.s.execute(_NAME_BRAND_KEYS))
+
+    def insert_many(self, rows: list[dict]) -> list[int]:
+        """One batched INSERT; returns the new ids in input order."""
+        return list(self.s.scalars(_INSERT_FOODS, rows).all()) if rows else []
+
+    def update_many(self, rows: list[dict]) -> None:
+        """Bulk UPDATE by primary key: each row is {"id": ..., column: value, ...}."""
+        rows = [r for r in rows if len(r) > 1]  # nothing to set
+        if rows:
+            self.s.execute(update(Food), rows)
+
+    def list_page(self, columns: list, after: Optional[tuple[str, int]] = None,
+                  limit: int = 100) -> list:
+        """One keyset page of (name, id, *columns) rows; see _food_listing."""
+        return self.s.execute(_food_listing(columns, after).limit(limit)).all()
+
+    def iter_listing(self, columns: list, after: Optional[tuple[str, int]] = None,
+                     batch: int = 500) -> Iterator[list]:
+        """The whole listing in `batch`-row chunks from a server-side cursor (yield_per)."""
+        result = self.s.execute(_food_listing(columns, after).execution_options(yield_per=batch))
+        yield from result.partitions()
+
     def search(self, query: str, limit: int = 20) -> list[Food]:
-        # token match: every query word must appear in the name (any order), so
-        # "brown rice" matches the USDA-style name "Rice, Brown, Parboiled, Cooked".
-        words = [w for w in query.strip().split() if w]
-        if not words:
-            return []
-        conds = [Food.name.ilike(f"%{w}%") for w in words]
-        return list(self.s.scalars(
-            select(Food).where(*conds).order_by(Food.name).limit(limit)
-        ))
+        stmt = _food_search(query, limit, self._has_search_index())
+        return [] if stmt is None else list(self.s.scalars(stmt))
+
+    def _has_search_index(self) -> bool:
+        engine = self.s.get_bind().engine
+        if engine in _SEARCH_INDEXED:
+            return True
+        if not food_search_supported(engine.dialect.name) or self.s.scalar(_SEARCH_INDEX_PROBE) is None:
+            return False
+        _SEARCH_INDEXED.add(engine)
+        return True
 
 
 class MealRepository:
@@ -50,11 +233,19 @@ class MealRepository:
         return meal
 
     def find_by_name(self, name: str) -> Optional[Meal]:
-        return self.s.scalar(select(Meal).where(Meal.name.ilike(name)))
+        return self.s.scalar(_by_lower_name(Meal, name))
 
     def list_all(self) -> list[Meal]:
         return list(self.s.scalars(select(Meal).order_by(Meal.name)))
 
+    def list_vectors(self) -> list[FoodVector]:
+        """Every meal as a FoodVector of its recipe totals (one row each), by name."""
+        return list(map(FoodVector._make, self.s.execute(_meal_vectors())))
+
+    def get_vectors(self, meal_ids: list[int]) -> dict[int, FoodVector]:
+        rows = self.s.execute(_meal_vectors(meal_ids))
+        return {r[0]: FoodVector._make(r) for r in rows}
+
 
 class UserRepository:
     def __init__(self, session: Session):
@@ -69,7 +260,7 @@ class UserRepository:
         return self.s.get(User, user_id)
 
     def find_by_name(self, name: str) -> Optional[User]:
-        return self.s.scalar(select(User).where(User.name.ilike(name)))
+        return self.s.scalar(_by_lower_name(User, name))
 
     def list_all(self) -> list[User]:
         return list(self.s.scalars(select(User).order_by(User.name)))
@@ -80,20 +271,54 @@ class PlanRepository:
         self.s = session
 
     def save_draft(self, user_id: Optional[int], name: str, draft: list[dict]) -> Plan:
-        plan = Plan(user_id=user_id, name=name)
-        for pos, entry in enumerate(draft):
-            pe = PlanEntry(name=entry.get("name", f"Meal {pos + 1}"), position=pos)
-            for food, servings in entry["items"]:
-                pe.items.append(PlanItem(food_id=food.id, servings=servings))
-            plan.entries.append(pe)
+        plan = _plan_from_draft(user_id, name, draft)
         self.s.add(plan)
         return plan
 
+    def bulk_save(self, plans: list[tuple[Optional[int], str, list[dict]]]) -> list[int]:
+        """Insert many (user_id, name, draft) plans with one multi-row INSERT per table.
+
+        Unlike save_draft, draft items are (food_id, servings) pairs — no ORM objects.
+        Returns the new plan ids in input order.
+        """
+        if not plans:
+            return []
+        plan_ids = self.s.scalars(
+            insert(Plan).returning(Plan.id, sort_by_parameter_order=True),
+            [{"user_id": user_id, "name": name} for user_id, name, _ in plans],
+        ).all()
+        entry_rows, entry_items = [], []
+        for plan_id, (_, _, draft) in zip(plan_ids, plans):
+            for pos, entry in enumerate(draft):
+                entry_rows.append({"plan_id": plan_id, "position": pos,
+                                   "name": entry.get("name", f"Meal {pos + 1}")})
+                entry_items.append(entry["items"])
+        if entry_rows:
+            entry_ids = self.s.scalars(
+                insert(PlanEntry).returning(PlanEntry.id, sort_by_parameter_order=True), entry_rows,
+            ).all()
+            item_rows = [{"entry_id": entry_id, "food_id": food_id, "servings": servings}
+                         for entry_id, items in zip(entry_ids, entry_items)
+                         for food_id, servings in items]
+            if item_rows:
+                self.s.execute(insert(PlanItem), item_rows)
+        return list(plan_ids)
+
     def get(self, plan_id: int) -> Optional[Plan]:
-        return self.s.get(Plan, plan_id)
+        # whole plan graph (entries -> items -> food) in a fixed 4 queries
+        return self.s.scalar(select(Plan).where(Plan.id == plan_id).options(_PLAN_GRAPH))
+
+    def get_many(self, plan_ids: list[int]) -> list[Plan]:
+        """Plans by id with their full graph, in the given order (missing ids skipped)."""
+        by_id = {p.id: p for p in self.s.scalars(
+            select(Plan).where(Plan.id.in_(plan_ids)).options(_PLAN_GRAPH)
+        )}
+        return [by_id[i] for i in plan_ids if i in by_id]
 
     def list_for_user(self, user_id: int) -> list[Plan]:
-        return list(self.s.scalars(select(Plan).where(Plan.user_id == user_id)))
+        return list(self.s.scalars(
+            select(Plan).where(Plan.user_id == user_id).options(_PLAN_GRAPH)
+        ))
 
 
 class LogRepository:
@@ -106,6 +331,160 @@ class LogRepository:
         return entry
 
     def for_day(self, user_id: int, day: datetime.date) -> list[LogEntry]:
-        return list(self.s.scalars(
-            select(LogEntry).where(LogEntry.user_id == user_id, LogEntry.eaten_on == day)
+        return list(self.s.scalars(_log_for_day(user_id, day)))
+
+    def totals_for_range(self, user_id: int, start: datetime.date, end: datetime.date,
+                         group_by: str = "day") -> list[dict]:
+        """Per-period nutrient totals for start..end (inclusive) in one SQL aggregate.
+
+        group_by is "day" | "month" | "year"; each row is {"period", "entries", <NUTRIENTS>},
+        periods ascending, with "period" as ISO date / "YYYY-MM" / "YYYY".
+        """
+        dialect = self.s.get_bind().dialect.name
+        return _period_rows(self.s.execute(_log_totals(dialect, user_id, start, end, group_by)))
+
+    def daily_intake(self, user_id: int, start: datetime.date, end: datetime.date) -> list[dict]:
+        """Logged days in start..end (inclusive) from the daily_intake rollup — one row per
+        day, no log scan. Each row is {"day", "entries", <NUTRIENTS>}, days ascending."""
+        return [dict(r) for r in self.s.execute(_daily_intake(user_id, start, end)).mappings()]
+
+
+# Async twins for `async def` routes: same queries, awaited on an AsyncSession.
+# Relationships must be eager-loaded (as above) — async sessions can't lazy-load.
+
+
+class AsyncFoodRepository:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    def add(self, food: Food) -> Food:
+        self.s.add(food)
+        return food
+
+    async def find_by_name_brand(self, name: str, brand: str) -> Optional[Food]:
+        return await self.s.scalar(_food_by_name_brand(name, brand))
+
+    async def get(self, food_id: int) -> Optional[Food]:
+        return await self.s.get(Food, food_id)
+
+    async def list_all(self) -> list[Food]:
+        return list(await self.s.scalars(select(Food).order_by(Food.name)))
+
+    async def list_vectors(self) -> list[FoodVector]:
+        return list(map(FoodVector._make, await self.s.execute(_food_vectors())))
+
+    async def get_vectors(self, food_ids: list[int]) -> dict[int, FoodVector]:
+        rows = await self.s.execute(_food_vectors(food_ids))
+        return {r[0]: FoodVector._make(r) for r in rows}
+
+    async def name_brand_keys(self) -> dict[tuple[str, str], int]:
+        return _name_brand_keys(await self.s.execute(_NAME_BRAND_KEYS))
+
+    async def insert_many(self, rows: list[dict]) -> list[int]:
+        return list((await self.s.scalars(_INSERT_FOODS, rows)).all()) if rows else []
+
+    async def update_many(self, rows: list[dict]) -> None:
+        rows = [r for r in rows if len(r) > 1]  # nothing to set
+        if rows:
+            await self.s.execute(update(Food), rows)
+
+    async def list_page(self, columns: list, after: Optional[tuple[str, int]] = None,
+                        limit: int = 100) -> list:
+        return (await self.s.execute(_food_listing(columns, after).limit(limit))).all()
+
+    async def iter_listing(self, columns: list, after: Optional[tuple[str, int]] = None,
+                           batch: int = 500) -> AsyncIterator[list]:
+        result = await self.s.stream(_food_listing(columns, after).execution_options(yield_per=batch))
+        async for rows in result.partitions():
+            yield rows
+
+    async def search(self, query: str, limit: int = 20) -> list[Food]:
+        stmt = _food_search(query, limit, await self._has_search_index())
+        return [] if stmt is None else list(await self.s.scalars(stmt))
+
+    async def _has_search_index(self) -> bool:
+        engine = self.s.get_bind().engine  # the sync Engine behind the AsyncEngine
+        if engine in _SEARCH_INDEXED:
+            return True
+        if not food_search_supported(engine.dialect.name) or await self.s.scalar(_SEARCH_INDEX_PROBE) is None:
+            return False
+        _SEARCH_INDEXED.add(engine)
+        return True
+
+
+class AsyncMealRepository:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    async def list_vectors(self) -> list[FoodVector]:
+        return list(map(FoodVector._make, await self.s.execute(_meal_vectors())))
+
+    async def get_vectors(self, meal_ids: list[int]) -> dict[int, FoodVector]:
+        rows = await self.s.execute(_meal_vectors(meal_ids))
+        return {r[0]: FoodVector._make(r) for r in rows}
+
+
+class AsyncUserRepository:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    def create(self, **fields) -> User:
+        user = User(**fields)
+        self.s.add(user)
+        return user
+
+    async def get(self, user_id: int) -> Optional[User]:
+        return await self.s.get(User, user_id)
+
+    async def find_by_name(self, name: str) -> Optional[User]:
+        return await self.s.scalar(_by_lower_name(User, name))
+
+    async def list_all(self) -> list[User]:
+        return list(await self.s.scalars(select(User).order_by(User.name)))
+
+
+class AsyncPlanRepository:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    def save_draft(self, user_id: Optional[int], name: str, draft: list[dict]) -> Plan:
+        plan = _plan_from_draft(user_id, name, draft)
+        self.s.add(plan)
+        return plan
+
+    async def get(self, plan_id: int) -> Optional[Plan]:
+        return await self.s.scalar(select(Plan).where(Plan.id == plan_id).options(_PLAN_GRAPH))
+
+    async def get_many(self, plan_ids: list[int]) -> list[Plan]:
+        by_id = {p.id: p for p in await self.s.scalars(
+            select(Plan).where(Plan.id.in_(plan_ids)).options(_PLAN_GRAPH)
+        )}
+        return [by_id[i] for i in plan_ids if i in by_id]
+
+    async def list_for_user(self, user_id: int) -> list[Plan]:
+        return list(await self.s.scalars(
+            select(Plan).where(Plan.user_id == user_id).options(_PLAN_GRAPH)
         ))
+
+
+class AsyncLogRepository:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    def add(self, user_id: int, food_id: int, servings: float, source: str = "manual") -> LogEntry:
+        entry = LogEntry(user_id=user_id, food_id=food_id, servings=servings, source=source)
+        self.s.add(entry)
+        return entry
+
+    async def for_day(self, user_id: int, day: datetime.date) -> list[LogEntry]:
+        return list(await self.s.scalars(_log_for_day(user_id, day)))
+
+    async def totals_for_range(self, user_id: int, start: datetime.date, end: datetime.date,
+                               group_by: str = "day") -> list[dict]:
+        dialect = self.s.get_bind().dialect.name
+        return _period_rows(await self.s.execute(_log_totals(dialect, user_id, start, end, group_by)))
+
+    async def daily_intake(self, user_id: int, start: datetime.date,
+                           end: datetime.date) -> list[dict]:
+        rows = await self.s.execute(_daily_intake(user_id, start, end))
+        return [dict(r) for r in rows.mappings()]
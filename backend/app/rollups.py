@@ -0,0 +1,207 @@
+"""Rollup tables kept current by Session listeners: meal_totals (one row per saved meal)
+and daily_intake (one row per user and day), both sums of food NUTRIENTS × servings.
+
+- after_flush sees the unit of work. New log entries are added to their days with one
+  INSERT ... SELECT ... ON CONFLICT DO UPDATE per flush; everything else (meal items,
+  meals, edited or deleted entries, a food's nutrients) recomputes just the affected
+  rows from source.
+- do_orm_execute sees ORM-enabled bulk INSERT/UPDATE/DELETE statements, which bypass
+  the flush, and refreshes after them — the affected rows when the parameters name
+  them, otherwise the whole rollup.
+
+Plain Core statements on a Connection are not seen; refresh_meal_totals and
+refresh_daily_intake rebuild from source (startup, scripts/backfill_daily_intake.py).
+"""
+from itertools import chain, islice
+from typing import Callable, Iterable, Optional
+from sqlalchemy import bindparam, event, func, inspect, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import ORMExecuteState, Session
+from app.core.macros import NUTRIENTS
+from app.models import DailyIntake, Food, LogEntry, Meal, MealItem, MealTotals
+
+_BATCH = 500  # ids (or keys) per IN (...), well under SQLite's bound-parameter limit
+_NUTRIENT_KEYS = frozenset(NUTRIENTS)
+_UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+_INTAKE_COLUMNS = ["user_id", "day", "entries", *NUTRIENTS]
+_ENTRY_UPSERTS: dict = {}  # dialect name -> the statement _entries_upsert builds
+
+
+def _batches(items: set, size: int = _BATCH):
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _sums(servings) -> list:
+    return [func.coalesce(func.sum(func.coalesce(getattr(Food, n), 0.0) * servings), 0.0)
+            for n in NUTRIENTS]
+
+
+# --- meal_totals ---
+
+
+def _refresh_meals(conn: Connection, cond_meal, cond_totals) -> None:
+    totals = MealTotals.__table__
+    conn.execute(totals.delete().where(cond_totals))
+    conn.execute(totals.insert().from_select(
+        ["meal_id", *NUTRIENTS],
+        select(Meal.id, *_sums(MealItem.servings))
+        .select_from(Meal)
+        .outerjoin(MealItem, MealItem.meal_id == Meal.id)
+        .outerjoin(Food, Food.id == MealItem.food_id)
+        .where(cond_meal)
+        .group_by(Meal.id)))
+
+
+def refresh_meal_totals(conn: Connection, meal_ids: Optional[Iterable[int]] = None,
+                        food_ids: Iterable[int] = ()) -> None:
+    """Recompute meal_totals from the current rows for `meal_ids` plus every meal using
+    one of `food_ids`; every meal when meal_ids is None. Rows of deleted meals go away."""
+    if meal_ids is None:
+        _refresh_meals(conn, Meal.id.is_not(None), MealTotals.meal_id.is_not(None))
+        return
+    for batch in _batches({i for i in meal_ids if i is not None}):
+        _refresh_meals(conn, Meal.id.in_(batch), MealTotals.meal_id.in_(batch))
+    for batch in _batches({i for i in food_ids if i is not None}):
+        users = select(MealItem.meal_id).where(MealItem.food_id.in_(batch))
+        _refresh_meals(conn, Meal.id.in_(users), MealTotals.meal_id.in_(users))
+
+
+# --- daily_intake ---
+
+
+def _intake(cond):
+    """(user_id, day, entries, *NUTRIENTS) per logged day among the entries matching cond."""
+    return (select(LogEntry.user_id, LogEntry.eaten_on, func.count(LogEntry.id),
+                   *_sums(LogEntry.servings))
+            .join(Food, Food.id == LogEntry.food_id)
+            .where(cond)
+            .group_by(LogEntry.user_id, LogEntry.eaten_on))
+
+
+def _refresh_days(conn: Connection, cond_log, cond_intake) -> None:
+    intake = DailyIntake.__table__
+    conn.execute(intake.delete().where(cond_intake))
+    conn.execute(intake.insert().from_select(_INTAKE_COLUMNS, _intake(cond_log)))
+
+
+def refresh_daily_intake(conn: Connection, days: Optional[Iterable[tuple]] = None,
+                         user_ids: Iterable[int] = (), food_ids: Iterable[int] = ()) -> None:
+    """Recompute daily_intake from log_entries for the (user_id, day) `days`, every day
+    of `user_ids` and every day that logged one of `food_ids`; all of it when days is None."""
+    if days is None:
+        _refresh_days(conn, LogEntry.id.is_not(None), DailyIntake.user_id.is_not(None))
+        return
+    log_day = tuple_(LogEntry.user_id, LogEntry.eaten_on)
+    intake_day = tuple_(DailyIntake.user_id, DailyIntake.day)
+    for batch in _batches({d for d in days if None not in d}):
+        _refresh_days(conn, log_day.in_(batch), intake_day.in_(batch))
+    for batch in _batches({i for i in user_ids if i is not None}):
+        _refresh_days(conn, LogEntry.user_id.in_(batch), DailyIntake.user_id.in_(batch))
+    for batch in _batches({i for i in food_ids if i is not None}):
+        touched = select(LogEntry.user_id, LogEntry.eaten_on).where(LogEntry.food_id.in_(batch))
+        _refresh_days(conn, log_day.in_(touched), intake_day.in_(touched))
+
+
+def _entries_upsert(dialect: str):
+    """INSERT ... SELECT ... ON CONFLICT DO UPDATE adding the :ids entries to their days.
+    Built once per dialect: constructing it costs more than running it."""
+    stmt = _ENTRY_UPSERTS.get(dialect)
+    if stmt is None:
+        intake = DailyIntake.__table__
+        ins = _UPSERTS[dialect](intake).from_select(
+            _INTAKE_COLUMNS, _intake(LogEntry.id.in_(bindparam("ids", expanding=True))))
+        stmt = _ENTRY_UPSERTS[dialect] = ins.on_conflict_do_update(
+            index_elements=[intake.c.user_id, intake.c.day],
+            set_={c: intake.c[c] + ins.excluded[c] for c in _INTAKE_COLUMNS[2:]})
+    return stmt
+
+
+def _add_entries(conn: Connection, entry_ids: list[int]) -> None:
+    """Add freshly inserted log entries to their days: an upsert that increments."""
+    stmt = _entries_upsert(conn.dialect.name)
+    for batch in _batches(entry_ids):
+        conn.execute(stmt, {"ids": batch})
+
+
+# --- listeners ---
+
+
+@event.listens_for(Session, "after_flush")
+def _rollups_after_flush(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still describe the flush that just ran
+    meal_ids, food_ids, days, new_entries = set(), set(), set(), []
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, LogEntry):
+            if obj in session.new:
+                new_entries.append(obj)
+                continue
+            state = inspect(obj)
+            user, day = state.dict.get("user_id"), state.dict.get("eaten_on")
+            old_user = (state.attrs.user_id.history.deleted or [user])[0]
+            old_day = (state.attrs.eaten_on.history.deleted or [day])[0]
+            days.update({(user, day), (old_user, old_day)})  # edited, moved or deleted
+        elif isinstance(obj, MealItem):
+            state = inspect(obj)
+            meal_ids.add(state.dict.get("meal_id"))
+            meal_ids.update(state.attrs.meal_id.history.deleted)  # moved to another meal
+        elif isinstance(obj, Meal) and obj not in session.dirty:
+            meal_ids.add(obj.id)  # created (zero totals) or deleted
+        elif isinstance(obj, Food) and obj in session.dirty:
+            state = inspect(obj)
+            if any(state.attrs[n].history.has_changes() for n in NUTRIENTS):
+                food_ids.add(obj.id)
+    if not (meal_ids or food_ids or days or new_entries):
+        return
+    conn = session.connection()
+    if new_entries:
+        if conn.dialect.name in _UPSERTS:
+            _add_entries(conn, [e.id for e in new_entries])
+        else:
+            days.update((e.user_id, e.eaten_on) for e in new_entries)
+    # recomputes run after the increments, so they win wherever both apply
+    if days or food_ids:
+        refresh_daily_intake(conn, days, food_ids=food_ids)
+    if meal_ids or food_ids:
+        refresh_meal_totals(conn, meal_ids, food_ids)
+
+
+def _bulk_refresh(entity, state: ORMExecuteState) -> Optional[Callable[[Connection], None]]:
+    """What to refresh after a bulk statement on `entity`; None when nothing depends on it."""
+    params = state.parameters if isinstance(state.parameters, list) else None
+    if entity is MealItem:
+        if state.is_insert and params and all("meal_id" in p for p in params):
+            meal_ids = {p["meal_id"] for p in params}
+            return lambda conn: refresh_meal_totals(conn, meal_ids)
+        return refresh_meal_totals
+    if entity is LogEntry:
+        if state.is_insert and params and all("user_id" in p for p in params):
+            user_ids = {p["user_id"] for p in params}
+            return lambda conn: refresh_daily_intake(conn, (), user_ids=user_ids)
+        return refresh_daily_intake
+    if entity is Food and not state.is_insert:  # a new food is in no meal or log yet
+        if state.is_update and params and all("id" in p for p in params):  # bulk by primary key
+            food_ids = {p["id"] for p in params if _NUTRIENT_KEYS & p.keys()}
+            if not food_ids:
+                return None
+            return lambda conn: (refresh_meal_totals(conn, (), food_ids),
+                                 refresh_daily_intake(conn, (), food_ids=food_ids))
+        return lambda conn: (refresh_meal_totals(conn), refresh_daily_intake(conn))
+    return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _rollups_after_bulk(orm_execute_state: ORMExecuteState):
+    state = orm_execute_state
+    if not (state.is_insert or state.is_update or state.is_delete) or state.bind_mapper is None:
+        return None
+    refresh = _bulk_refresh(state.bind_mapper.class_, state)
+    if refresh is None:
+        return None
+    result = state.invoke_statement()
+    # drain RETURNING rows before issuing more statements on the connection
+    frozen = result.freeze() if state.statement.returning_column_descriptions else None
+    refresh(state.session.connection())
+    return frozen() if frozen is not None else result
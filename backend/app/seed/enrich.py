@@ -1,28 +1,32 @@
 """Apply legacy_micros.json onto legacy foods — fills micros + serving_grams, keeps macros."""
 import json
 from pathlib import Path
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
-from app.repositories import FoodRepository
+from app.models import Food
 
-_FILE = Path(__file__).resolve().parent / "legacy_micros.json"
+MICROS_FILE = Path(__file__).resolve().parent / "legacy_micros.json"
 _FIELDS = ("serving_grams", "fiber", "sugar_g", "iron_mg", "calcium_mg",
            "potassium_mg", "vitamin_c_mg", "vitamin_d_ug")
 
 
 def enrich_legacy(session: Session) -> int:
     """Backfill micros onto foods whose name matches the enrichment data. Idempotent
-    (skips foods already enriched). Macros are never touched."""
-    if not _FILE.exists():
+    (skips foods already enriched). Macros are never touched.
+
+    Only the matching, not-yet-enriched foods are selected (by lower(name) IN ...), then
+    updated with one bulk UPDATE by primary key."""
+    if not MICROS_FILE.exists():
+        return 0
+    data = json.loads(MICROS_FILE.read_text())
+    if not data:
         return 0
-    data = json.loads(_FILE.read_text())
-    n = 0
-    for food in FoodRepository(session).list_all():
-        rec = data.get(food.name.lower())
-        if not rec or food.iron_mg is not None:  # no source, or already enriched
-            continue
-        for field in _FIELDS:
-            if rec.get(field) is not None:
-                setattr(food, field, rec[field])
-        n += 1
-    session.flush()
-    return n
+    matches = session.execute(
+        select(Food.id, func.lower(Food.name))
+        .where(func.lower(Food.name).in_(list(data)), Food.iron_mg.is_(None))
+    ).all()
+    rows = [{"id": fid, **{f: data[key][f] for f in _FIELDS if data[key].get(f) is not None}}
+            for fid, key in matches]
+    if any(len(r) > 1 for r in rows):
+        session.execute(update(Food), [r for r in rows if len(r) > 1])
+    return len(rows)
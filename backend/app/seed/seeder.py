@@ -1,11 +1,15 @@
-"""Load the committed staples.json into the food library (idempotent on name+brand)."""
+"""Load the committed staples.json into the food library (idempotent on name+brand).
+
+Set-based: existing name+brand keys are preloaded in one query and the missing staples
+go in as one batched INSERT.
+"""
 import json
 from pathlib import Path
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 from app.models import Food
-from app.repositories import FoodRepository
 
-_SEED_FILE = Path(__file__).resolve().parent / "staples.json"
+SEED_FILE = Path(__file__).resolve().parent / "staples.json"
 _FOOD_FIELDS = {
     "name", "brand", "serving_description", "serving_grams", "source", "source_id",
     "calories", "protein", "carbs", "fat_saturated", "fat_unsaturated", "fiber", "sodium",
@@ -13,17 +17,25 @@ _FOOD_FIELDS = {
 }
 
 
+def _key(name: str, brand: str) -> tuple[str, str]:
+    # same match as FoodRepository.find_by_name_brand: case-insensitive, stripped input
+    return name.strip().lower(), (brand or "").strip().lower()
+
+
 def seed_staples(session: Session) -> int:
-    if not _SEED_FILE.exists():
+    if not SEED_FILE.exists():
         return 0
-    repo = FoodRepository(session)
-    records = json.loads(_SEED_FILE.read_text())
-    added = 0
+    records = json.loads(SEED_FILE.read_text())
+    existing = {(name, brand or "") for name, brand in
+                session.execute(select(func.lower(Food.name), func.lower(Food.brand)))}
+    rows = []
     for rec in records:
         name, brand = rec.get("name", ""), rec.get("brand", "") or ""
-        if not name or repo.find_by_name_brand(name, brand):
+        key = _key(name, brand)
+        if not name or key in existing:
             continue
-        repo.add(Food(**{k: v for k, v in rec.items() if k in _FOOD_FIELDS}))
-        added += 1
-    session.flush()
-    return added
+        existing.add(key)
+        rows.append({k: v for k, v in rec.items() if k in _FOOD_FIELDS})
+    if rows:
+        session.execute(insert(Food), rows)
+    return len(rows)
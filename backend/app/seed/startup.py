@@ -0,0 +1,74 @@
+"""Boot-time schema upgrades, seeding and enrichment, skipped when nothing changed.
+
+The last full run records a fingerprint in `seed_state`: SCHEMA_VERSION, content hashes
+of staples.json and legacy_micros.json, and the highest foods.id it enriched. A boot
+whose fingerprint matches costs one single-row SELECT; anything else (a fresh DB, an
+edited seed file, a schema bump, foods added since) takes the full idempotent path.
+"""
+import hashlib
+from pathlib import Path
+from typing import Callable
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.db import Base
+from app.models import DailyIntake, Food, SeedState
+from app.migration.schema_upgrade import (
+    ensure_food_micro_columns, ensure_food_search_index, ensure_indexes,
+)
+from app.rollups import refresh_daily_intake, refresh_meal_totals
+from app.seed.enrich import MICROS_FILE, enrich_legacy
+from app.seed.seeder import SEED_FILE, seed_staples
+
+# Bump whenever create_all/schema_upgrade gains something an existing DB must pick up.
+SCHEMA_VERSION = 4
+_KEY = "startup"
+
+
+def content_hash(path: Path) -> str:
+    """sha256 of a seed file; a missing file hashes to "" (its loader is a no-op too)."""
+    return hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else ""
+
+
+def _wanted() -> dict:
+    return {"schema_version": SCHEMA_VERSION, "staples_hash": content_hash(SEED_FILE),
+            "micros_hash": content_hash(MICROS_FILE)}
+
+
+def is_current(engine: Engine, wanted: dict | None = None) -> bool:
+    """True when the recorded fingerprint matches and no food was added since."""
+    wanted = wanted or _wanted()
+    stmt = select(SeedState, select(func.coalesce(func.max(Food.id), 0)).scalar_subquery()) \
+        .where(SeedState.key == _KEY)
+    try:
+        with Session(engine) as s:
+            row = s.execute(stmt).first()
+    except DBAPIError:  # seed_state (or foods) doesn't exist yet
+        return False
+    if row is None:
+        return False
+    state, max_id = row
+    return (all(getattr(state, k) == v for k, v in wanted.items())
+            and max_id <= state.foods_max_id)
+
+
+def prepare_database(engine: Engine, session_factory: Callable[[], Session]) -> dict:
+    """Bring the DB up to date for serving. Returns what was done."""
+    wanted = _wanted()
+    if is_current(engine, wanted):
+        return {"skipped": True, "foods_added": 0, "foods_enriched": 0}
+    Base.metadata.create_all(engine)
+    ensure_food_micro_columns(engine)
+    ensure_food_search_index(engine)
+    ensure_indexes(engine)
+    with session_factory() as s:
+        added = seed_staples(s)
+        enriched = enrich_legacy(s)
+        refresh_meal_totals(s.connection())  # backfills meal_totals on DBs that predate it
+        if s.scalar(select(DailyIntake.user_id).limit(1)) is None:
+            refresh_daily_intake(s.connection())  # first boot with the rollup: backfill it
+        max_id = s.scalar(select(func.coalesce(func.max(Food.id), 0)))
+        s.merge(SeedState(key=_KEY, foods_max_id=max_id, **wanted))
+        s.commit()
+    return {"skipped": False, "foods_added": added, "foods_enriched": enriched}
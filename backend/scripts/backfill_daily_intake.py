@@ -0,0 +1,43 @@
+"""Rebuild the daily_intake rollup from log_entries, for every user or --users 1,2,3.
+Run: `uv run python scripts/backfill_daily_intake.py [--users 1,2,3]`. Idempotent: the
+affected rows are recomputed from the log in one transaction. Startup already backfills
+an empty rollup; use this after writing log_entries outside the ORM (e.g. raw SQL).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from sqlalchemy import func, select
+
+from app.db import SessionLocal, init_db
+from app.models import DailyIntake, LogEntry
+from app.rollups import refresh_daily_intake
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--users", help="comma-separated user ids (default: all users)")
+    args = ap.parse_args()
+
+    init_db()
+    user_ids = [int(x) for x in args.users.split(",")] if args.users else None
+    with SessionLocal() as s:
+        t0 = time.perf_counter()
+        if user_ids is None:
+            refresh_daily_intake(s.connection())
+        else:
+            refresh_daily_intake(s.connection(), (), user_ids=user_ids)
+        s.commit()
+        dt = time.perf_counter() - t0
+        scope = [DailyIntake.user_id.in_(user_ids)] if user_ids else []
+        days = s.scalar(select(func.count()).select_from(DailyIntake).where(*scope))
+        entries = s.scalar(select(func.count(LogEntry.id)).where(
+            *([LogEntry.user_id.in_(user_ids)] if user_ids else [])))
+    print(f"{entries} log entries -> {days} daily_intake rows in {dt:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
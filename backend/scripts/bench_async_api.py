@@ -0,0 +1,111 @@
+"""Benchmark: mixed traffic — slow coach calls saturating the threadpool while clients hit
+GET /foods — with the old sync /foods handler (threadpool) vs the async one (event loop).
+The coach's LLM round-trip is simulated with a blocking sleep, as the real sync agent does.
+Run: `uv run python scripts/bench_async_api.py [coach_calls] [llm_seconds] [foods_clients]`
+(default 80 coach calls, 2.0 s each, 20 concurrent /foods clients).
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.api.coach import get_coach_agent_builder, router as coach_router
+from app.api.foods import _to_out, router as foods_router
+from app.db import (
+    Base, get_async_session, get_session, new_async_engine, new_async_session_factory,
+    new_engine, new_session_factory,
+)
+from app.models import Food
+from app.repositories import FoodRepository
+
+
+class SlowAgent:
+    def __init__(self, llm_seconds: float):
+        self.llm_seconds = llm_seconds
+
+    def invoke(self, payload, config=None):
+        time.sleep(self.llm_seconds)
+        return {"messages": [SimpleNamespace(content="ok")]}
+
+
+def _app(async_foods: bool, url: str, llm_seconds: float) -> FastAPI:
+    app = FastAPI()
+    app.include_router(coach_router)
+    if async_foods:
+        app.include_router(foods_router)
+    else:
+        @app.get("/foods")
+        def list_foods(db: Session = Depends(get_session)):  # the pre-async handler
+            return [_to_out(f) for f in FoodRepository(db).list_all()]
+
+    SyncSession = new_session_factory(new_engine(url))
+    AsyncSession = new_async_session_factory(new_async_engine(url))
+
+    def sync_session():
+        with SyncSession() as s:
+            yield s
+
+    async def async_session():
+        async with AsyncSession() as s:
+            yield s
+
+    app.dependency_overrides[get_session] = sync_session
+    app.dependency_overrides[get_async_session] = async_session
+    app.dependency_overrides[get_coach_agent_builder] = lambda: (lambda db, uid: SlowAgent(llm_seconds))
+    return app
+
+
+async def _run(app: FastAPI, coach_calls: int, llm_seconds: float, clients: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as c:
+        coach = [asyncio.create_task(c.post(f"/users/{i}/coach", json={"message": "plan"}))
+                 for i in range(coach_calls)]
+        await asyncio.sleep(0.05)  # let the coach calls grab the threadpool first
+        deadline = time.perf_counter() + llm_seconds
+        latencies: list[float] = []
+
+        async def foods_client():
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                (await c.get("/foods")).raise_for_status()
+                latencies.append((time.perf_counter() - t0) * 1e3)
+
+        await asyncio.gather(*(foods_client() for _ in range(clients)))
+        await asyncio.gather(*coach)
+    return latencies
+
+
+def main():
+    coach_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 80
+    llm_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    clients = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = new_engine(url)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Food), [{"name": f"Food {i}", "calories": 100 + i % 400}
+                                        for i in range(200)])
+        print(f"{coach_calls} coach calls x {llm_seconds}s LLM, {clients} /foods clients")
+        print(f"{'/foods':>7} | {'req/s':>7} {'p50 ms':>8} {'p99 ms':>9}")
+        for label, async_foods in (("sync", False), ("async", True)):
+            lat = asyncio.run(_run(_app(async_foods, url, llm_seconds), coach_calls, llm_seconds, clients))
+            if len(lat) < 2:
+                print(f"{label:>7} | {len(lat) / llm_seconds:7.1f} {'-':>8} {'-':>9}  (starved)")
+                continue
+            cuts = statistics.quantiles(lat, n=100)
+            print(f"{label:>7} | {len(lat) / llm_seconds:7.1f} {cuts[49]:8.1f} {cuts[98]:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
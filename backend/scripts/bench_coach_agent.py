@@ -0,0 +1,80 @@
+"""Benchmark: per-request coach overhead, cold (compile the graph every request, as before)
+vs warm (shared compiled graph + CoachContext). The LLM is stubbed, so the numbers are pure
+framework overhead.
+Run: `uv run python scripts/bench_coach_agent.py [requests]` (default 200).
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.agent import coach
+from app.agent.tools import CoachContext
+from app.db import Base, new_engine, new_session_factory
+from app.integrations.openfoodfacts import OpenFoodFactsProvider
+from app.models import User
+
+
+class StubModel(BaseChatModel):
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+def _cold(session, saver):
+    # what every request used to pay: new model, new HTTP client, fresh create_agent compile
+    provider = OpenFoodFactsProvider()
+    graph = coach.compile_coach_graph(StubModel(), saver)
+    agent = coach.CoachAgent(graph, CoachContext(session, 1, provider))
+    return agent, provider
+
+
+def _warm(session, saver):
+    return coach.build_coach_agent(session, 1, checkpointer=saver), None
+
+
+def _timed(build, session, saver, n: int) -> list[float]:
+    timings = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        agent, provider = build(session, saver)
+        agent.invoke({"messages": [{"role": "user", "content": "hi"}]},
+                     config={"configurable": {"thread_id": f"bench-{build.__name__}-{i}"}})
+        timings.append((time.perf_counter() - t0) * 1e3)
+        if provider is not None:
+            provider._client.close()
+    return timings
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    coach.default_chat_model = StubModel  # stub the LLM for the shared-graph path
+    engine = new_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    saver = InMemorySaver()
+    with new_session_factory(engine)() as s:
+        s.add(User(name="K", age=30, sex="male", height_cm=180, weight_kg=80, activity_level="moderate"))
+        s.commit()
+        print(f"{n} requests, stubbed LLM")
+        print(f"{'mode':>6} | {'p50 ms':>8} {'p99 ms':>8} {'total s':>8}")
+        for build in (_cold, _warm):
+            timings = _timed(build, s, saver, n)
+            cuts = statistics.quantiles(timings, n=100)
+            print(f"{build.__name__[1:]:>6} | {cuts[49]:8.2f} {cuts[98]:8.2f} {sum(timings) / 1e3:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
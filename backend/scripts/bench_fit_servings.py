@@ -0,0 +1,71 @@
+"""Benchmark: fit_servings as the coach uses it — re-fits of nearly the same plan.
+Run: `uv run python scripts/bench_fit_servings.py [rounds]` (default 200). For 3–40 item
+plans, times a cold lsq_linear per call (the old fit_servings) against ServingsSolver on
+a sequence of: a fresh plan, the same plan again, and the plan with one item swapped.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+import numpy as np
+from scipy.optimize import lsq_linear
+
+from app.core.planner import ItemSpec
+from app.core.solver import ServingsSolver
+
+SIZES = (3, 5, 10, 20, 40)
+TARGETS = (140.0, 220.0, 70.0)  # protein, carbs, fat (g)
+
+
+def old_fit(specs, protein_g, carb_g, fat_g, protein_weight=1.5):
+    P = np.array([s.food.protein or 0 for s in specs], dtype=float)
+    C = np.array([s.food.carbs or 0 for s in specs], dtype=float)
+    Ft = np.array([(s.food.fat_saturated or 0) + (s.food.fat_unsaturated or 0) for s in specs], dtype=float)
+    A = np.vstack([protein_weight * P, C, Ft])
+    b = np.array([protein_weight * protein_g, carb_g, fat_g], dtype=float)
+    lb = np.array([s.lo for s in specs], dtype=float)
+    ub = np.array([max(s.hi, s.lo) for s in specs], dtype=float)
+    return [float(x) for x in lsq_linear(A, b, bounds=(lb, ub)).x]
+
+
+def _food(rng, i):
+    return SimpleNamespace(id=i, protein=rng.uniform(0, 30), carbs=rng.uniform(0, 40),
+                           fat_saturated=rng.uniform(0, 3), fat_unsaturated=rng.uniform(0, 12))
+
+
+def workload(n: int, rounds: int, seed: int = 0) -> list[list[ItemSpec]]:
+    """rounds × [fresh plan, same plan, one item swapped] (the plan_day refine loop)."""
+    rng = random.Random(seed * 1000 + n)
+    calls, next_id = [], 0
+    for _ in range(rounds):
+        foods = [_food(rng, next_id + i) for i in range(n)]
+        next_id += n + 1
+        plan = [ItemSpec(f, 0.0, 4.0) for f in foods]
+        swapped = plan[:-1] + [ItemSpec(_food(rng, next_id - 1), 0.0, 4.0)]
+        calls += [plan, list(plan), swapped]
+    return calls
+
+
+def _time(fn, calls) -> float:
+    t0 = time.perf_counter()
+    for specs in calls:
+        fn(specs, *TARGETS)
+    return (time.perf_counter() - t0) / len(calls) * 1e6
+
+
+def main(rounds: int) -> None:
+    print(f"{'items':>5} {'cold lsq':>10} {'solver':>10} {'speedup':>8}  paths")
+    for n in SIZES:
+        calls = workload(n, rounds)
+        solver = ServingsSolver(memo_size=4 * rounds)
+        cold = _time(old_fit, calls)
+        fast = _time(solver.fit, calls)
+        print(f"{n:5d} {cold:8.0f}µs {fast:8.0f}µs {cold / fast:7.1f}x  {solver.stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
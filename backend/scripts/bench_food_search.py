@@ -0,0 +1,74 @@
+"""Benchmark: FoodRepository.search (FTS5 trigram index) vs the old per-word ILIKE scan.
+Run: `uv run python scripts/bench_food_search.py [sizes]` (default 1000,100000,1000000).
+Each size gets a fresh file-backed SQLite DB in a temp dir; reports p50/p99 per query.
+"""
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from sqlalchemy import insert, select
+
+from app.db import Base, new_engine, new_session_factory
+from app.models import Food
+from app.repositories import FoodRepository
+
+_NOUNS = ("rice", "chicken", "yogurt", "beans", "bread", "cheese", "apple", "salmon",
+          "oats", "potato", "lentils", "pasta", "milk", "tofu", "beef", "spinach")
+_MODS = ("brown", "white", "greek", "raw", "cooked", "canned", "whole", "nonfat",
+         "roasted", "smoked", "plain", "organic", "frozen", "dried", "sweet", "low sodium")
+QUERIES = ("brown rice", "greek yogurt", "chicken", "smoked salmon raw", "zzz nothing",
+           "whole wheat bread", "beans")
+
+
+def _populate(engine, n: int) -> None:
+    rng = random.Random(n)
+    with engine.begin() as conn:
+        for start in range(0, n, 50_000):
+            rows = []
+            for i in range(start, min(n, start + 50_000)):
+                words = [rng.choice(_NOUNS).title()] + [rng.choice(_MODS).title()
+                                                        for _ in range(rng.randint(1, 3))]
+                rows.append({"name": ", ".join(words) + f" #{i}", "brand": f"Brand {i % 997}",
+                             "calories": rng.uniform(20, 600)})
+            conn.execute(insert(Food), rows)
+
+
+def _ilike_scan(session, query: str, limit: int = 20):
+    conds = [Food.name.ilike(f"%{w}%") for w in query.split()]
+    return list(session.scalars(select(Food).where(*conds).order_by(Food.name).limit(limit)))
+
+
+def _percentiles(fn, session, rounds: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            t0 = time.perf_counter()
+            fn(session, q)
+            timings.append((time.perf_counter() - t0) * 1e3)
+    cuts = statistics.quantiles(timings, n=100)
+    return cuts[49], cuts[98]
+
+
+def main():
+    sizes = [int(x) for x in (sys.argv[1] if len(sys.argv) > 1 else "1000,100000,1000000").split(",")]
+    print(f"{'foods':>9} | {'ILIKE p50':>10} {'p99':>8} | {'FTS p50':>9} {'p99':>8}  (ms)")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = new_engine(f"sqlite:///{tmp}/bench.db")
+            Base.metadata.create_all(engine)
+            _populate(engine, n)
+            rounds = 20 if n <= 100_000 else 5
+            with new_session_factory(engine)() as s:
+                scan = _percentiles(_ilike_scan, s, rounds)
+                fts = _percentiles(lambda sess, q: FoodRepository(sess).search(q), s, rounds)
+            engine.dispose()
+        print(f"{n:>9} | {scan[0]:>10.2f} {scan[1]:>8.2f} | {fts[0]:>9.2f} {fts[1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: planning against a large catalog with ORM Food entities vs FoodVector rows.
+Run: `uv run python scripts/bench_food_vectors.py [foods]` (default 100000). Loads every
+candidate (FoodRepository.list_all vs list_vectors), builds a day plan over all of them,
+and scores the whole catalog at one serving each; reports time and traced memory.
+"""
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from sqlalchemy import insert
+
+from app.core.planner import build_day_plan, food_spec, score_plan
+from app.core.targets import compute_targets
+from app.db import Base, new_engine, new_session_factory
+from app.models import Food
+from app.repositories import FoodRepository
+
+TARGETS = compute_targets(sex="female", weight_kg=65, height_cm=168, age=34, activity_level="moderate")
+
+
+def populate(Session, n: int) -> None:
+    rng = random.Random(n)
+    with Session() as s:
+        s.execute(insert(Food), [{
+            "name": f"Food {i}", "calories": rng.uniform(20, 600), "protein": rng.uniform(0, 30),
+            "carbs": rng.uniform(0, 60), "fat_saturated": rng.uniform(0, 8),
+            "fat_unsaturated": rng.uniform(0, 20), "sodium": rng.uniform(0, 800),
+            "fiber": rng.choice((None, rng.uniform(0, 10))), "iron_mg": rng.uniform(0, 4),
+        } for i in range(n)])
+        s.commit()
+
+
+def plan(candidates) -> None:
+    build_day_plan(TARGETS.calories, candidates, meals=4, foods_per_meal=3)
+    specs = [food_spec(f) for f in candidates]
+    score_plan(specs, [1.0] * len(specs), TARGETS)
+
+
+def timed(Session, loader: str) -> tuple[float, float]:
+    with Session() as s:
+        t0 = time.perf_counter()
+        candidates = getattr(FoodRepository(s), loader)()
+        t1 = time.perf_counter()
+        plan(candidates)
+        return t1 - t0, time.perf_counter() - t1
+
+
+def traced(Session, loader: str) -> tuple[float, float]:
+    """(MiB held by the loaded candidates, peak MiB through planning), a separate pass."""
+    with Session() as s:
+        tracemalloc.start()
+        candidates = getattr(FoodRepository(s), loader)()
+        held = tracemalloc.get_traced_memory()[0]
+        plan(candidates)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return held / 2**20, peak / 2**20
+
+
+def main(n: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = new_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        Session = new_session_factory(engine)
+        populate(Session, n)
+        print(f"{n} candidate foods")
+        for label, loader in (("ORM entities", "list_all"), ("FoodVector", "list_vectors")):
+            t_load, t_plan = timed(Session, loader)
+            held, peak = traced(Session, loader)
+            print(f"{label:13} load {t_load * 1e3:7.0f} ms  plan+score {t_plan * 1e3:6.0f} ms  "
+                  f"held {held:6.1f} MiB  peak {peak:6.1f} MiB")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
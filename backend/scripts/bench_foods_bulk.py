@@ -0,0 +1,98 @@
+"""Benchmark: syncing a partner catalog — POST /foods per row vs one POST /foods/bulk.
+Run: `uv run python scripts/bench_foods_bulk.py [rows] [single_rows]` (default 100000 and
+2000; the per-row path is timed on `single_rows` and extrapolated). The bulk upload is
+sent as NDJSON in 64 KiB chunks through the ASGI app, first into an empty catalog
+(all creates), then again (all updates).
+"""
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from fastapi import FastAPI
+
+from app.api.foods import router as foods_router
+from app.db import Base, get_async_session, new_async_engine, new_async_session_factory, new_engine
+
+CHUNK = 64 * 1024
+
+
+def _app(url: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(foods_router)
+    Session = new_async_session_factory(new_async_engine(url))
+
+    async def session():
+        async with Session() as s:
+            yield s
+
+    app.dependency_overrides[get_async_session] = session
+    return app
+
+
+async def post(app: FastAPI, path: str, body: bytes, content_type: str) -> tuple[int, bytes]:
+    """One POST through the ASGI app, body sent in CHUNK pieces. Returns (status, body)."""
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+             "query_string": b"", "headers": [(b"content-type", content_type.encode())],
+             "client": ("bench", 0), "server": ("bench", 80)}
+    chunks = [body[i:i + CHUNK] for i in range(0, len(body), CHUNK)] or [b""]
+    status, out = 0, []
+
+    async def receive():
+        if not chunks:  # request fully sent; never disconnect
+            await asyncio.Event().wait()
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            out.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(out)
+
+
+def rows(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [{"name": f"Partner food {i}", "brand": f"Brand {i % 211}",
+             "serving_description": "100g", "calories": round(rng.uniform(20, 600), 1),
+             "protein": round(rng.uniform(0, 30), 1), "carbs": round(rng.uniform(0, 60), 1),
+             "fat_saturated": round(rng.uniform(0, 8), 1), "sodium": round(rng.uniform(0, 800), 1)}
+            for i in range(n)]
+
+
+async def main(n: int, single: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("single", "bulk"):
+            url = f"sqlite:///{tmp}/{label}.db"
+            Base.metadata.create_all(new_engine(url))
+            app = _app(url)
+            if label == "single":
+                t0 = time.perf_counter()
+                for r in rows(single):
+                    await post(app, "/foods", json.dumps(r).encode(), "application/json")
+                dt = time.perf_counter() - t0
+                print(f"POST /foods x{single:<7} {dt:7.2f} s  = {single / dt:8.0f} rows/s  "
+                      f"(~{n / (single / dt):.0f} s for {n})")
+                continue
+            body = "".join(json.dumps(r) + "\n" for r in rows(n)).encode()
+            for run in ("creates", "updates"):
+                t0 = time.perf_counter()
+                status, out = await post(app, "/foods/bulk", body, "application/x-ndjson")
+                dt = time.perf_counter() - t0
+                counts = {k: v for k, v in json.loads(out).items() if k != "rows"}
+                print(f"POST /foods/bulk {run:8} {dt:7.2f} s  = {n / dt:8.0f} rows/s  {status} {counts}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 2_000))
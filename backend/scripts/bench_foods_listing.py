@@ -0,0 +1,113 @@
+"""Benchmark: GET /foods on a large catalog — the old entity list vs the streamed listing.
+Run: `uv run python scripts/bench_foods_listing.py [foods]` (default 300000). Drives the
+ASGI app directly with a `send` that only counts bytes, so the traced memory is the
+server's alone. Each variant runs twice: timed, then under tracemalloc for peak memory.
+"""
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.foods import _to_out, router as foods_router
+from app.db import (
+    Base, get_async_session, new_async_engine, new_async_session_factory, new_engine,
+)
+from app.models import Food
+from app.repositories import AsyncFoodRepository
+
+VARIANTS = (
+    ("old: entities + FoodOut", "/foods-old", ""),
+    ("page of 1000", "/foods", "limit=1000"),
+    ("stream JSON array", "/foods", ""),
+    ("stream NDJSON", "/foods", "format=ndjson"),
+    ("stream NDJSON, 2 fields", "/foods", "format=ndjson&fields=id,name"),
+)
+
+
+def _app(url: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(foods_router)
+
+    @app.get("/foods-old")
+    async def list_foods_old(db: AsyncSession = Depends(get_async_session)):  # pre-keyset handler
+        return [_to_out(f) for f in await AsyncFoodRepository(db).list_all()]
+
+    Session = new_async_session_factory(new_async_engine(url))
+
+    async def session():
+        async with Session() as s:
+            yield s
+
+    app.dependency_overrides[get_async_session] = session
+    return app
+
+
+async def fetch(app: FastAPI, path: str, query: str) -> int:
+    """Run one GET through the ASGI app, discarding the body. Returns bytes sent."""
+    sent = 0
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+             "query_string": query.encode(), "headers": [], "client": ("bench", 0),
+             "server": ("bench", 80)}
+
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:  # never disconnect: park StreamingResponse's disconnect listener
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return sent
+
+
+def populate(url: str, n: int) -> None:
+    engine = new_engine(url)
+    Base.metadata.create_all(engine)
+    rng = random.Random(n)
+    with engine.begin() as conn:
+        for start in range(0, n, 50_000):
+            conn.execute(insert(Food), [{
+                "name": f"Food {rng.randrange(10 ** 9):09d}", "brand": f"Brand {i % 97}",
+                "calories": rng.uniform(20, 600), "protein": rng.uniform(0, 30),
+                "carbs": rng.uniform(0, 60), "fat_saturated": rng.uniform(0, 8),
+                "fat_unsaturated": rng.uniform(0, 20), "sodium": rng.uniform(0, 800),
+            } for i in range(start, min(n, start + 50_000))])
+    engine.dispose()
+
+
+async def main(n: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        populate(url, n)
+        app = _app(url)
+        print(f"{n} foods")
+        for label, path, query in VARIANTS:
+            t0 = time.perf_counter()
+            size = await fetch(app, path, query)
+            dt = time.perf_counter() - t0
+            tracemalloc.start()
+            await fetch(app, path, query)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            print(f"{label:24} {dt:7.2f} s  {size / 2**20:7.1f} MiB sent  peak {peak:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000))
@@ -0,0 +1,40 @@
+"""Benchmark: cold-start import cost of the API and of the coach agent.
+Run: `uv run python scripts/bench_imports.py [runs]` (default 5). Each run is a fresh
+interpreter under `-X importtime`; reports the best cumulative time per target and the
+slowest top-level packages behind it.
+"""
+import re
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+TARGETS = ("app.main", "app.agent.coach", "app.core.planner")
+_LINE = re.compile(r"^import time:\s*(\d+) \|\s*(\d+) \|( *)(\S+)$")
+
+
+def importtime(module: str) -> list[tuple[int, int, int, str]]:
+    """(self_us, cumulative_us, depth, module) per import, in -X importtime order."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=BACKEND, capture_output=True, text=True, check=True).stderr
+    return [(int(m[1]), int(m[2]), len(m[3]) // 2, m[4])
+            for m in map(_LINE.match, err.splitlines()) if m]
+
+
+def main(runs: int) -> None:
+    for target in TARGETS:
+        best, packages = None, Counter()
+        for _ in range(runs):
+            rows = importtime(target)
+            total = next(cum for _, cum, _, mod in rows if mod == target)
+            if best is None or total < best:
+                best, packages = total, Counter()
+                for self_us, _, _, mod in rows:
+                    packages[mod.split(".")[0]] += self_us
+        top = ", ".join(f"{p} {us / 1e3:.0f}ms" for p, us in packages.most_common(6))
+        print(f"{target:18} {best / 1e3:8.1f} ms   {top}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,54 @@
+"""Benchmark: per-item Macros arithmetic vs the MacroMatrix batch rollup.
+Run: `uv run python scripts/bench_macros.py [items] [foods]` (default 10000 items over 300 foods).
+"""
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from app.core.macros import NUTRIENTS, MacroMatrix, scale_food, sum_macros, to_macros
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_foods = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    rng = random.Random(0)
+    foods = [SimpleNamespace(id=i, **{n: rng.uniform(0, 50) for n in NUTRIENTS})
+             for i in range(n_foods)]
+    picks = [rng.choice(foods) for _ in range(n_items)]
+    ids = [f.id for f in picks]
+    servings = [rng.uniform(0.5, 3) for _ in range(n_items)]
+
+    def per_item():
+        return sum_macros(scale_food(f, q) for f, q in zip(picks, servings))
+
+    def batch():
+        return to_macros(MacroMatrix(picks).scale_and_sum(ids, servings))
+
+    matrix = MacroMatrix(foods)
+
+    def batch_prebuilt():
+        return matrix.scale_and_sum(ids, servings)
+
+    assert abs(per_item().calories - batch().calories) < 1e-6 * per_item().calories
+    t_item, t_batch, t_pre = _best_of(per_item), _best_of(batch), _best_of(batch_prebuilt)
+    print(f"{n_items} items over {n_foods} foods")
+    print(f"  scale_food + sum_macros : {t_item * 1e3:8.2f} ms")
+    print(f"  MacroMatrix (build+sum) : {t_batch * 1e3:8.2f} ms  ({t_item / t_batch:.1f}x)")
+    print(f"  scale_and_sum (prebuilt): {t_pre * 1e3:8.2f} ms  ({t_item / t_pre:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
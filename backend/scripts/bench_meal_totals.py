@@ -0,0 +1,76 @@
+"""Benchmark: listing saved meals with totals — walking items and foods vs meal_totals.
+Run: `uv run python scripts/bench_meal_totals.py [meals]` (default 20000 meals of 5 items
+over 5000 foods). Also times what keeping the totals current costs on writes: creating
+the meals (flush listener) and editing one popular food (refreshes every meal using it).
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import selectinload
+
+from app.core.macros import NUTRIENTS
+from app.db import Base, new_engine, new_session_factory
+from app.models import Food, Meal, MealItem
+from app.repositories import MealRepository
+
+ITEMS = 5
+FOODS = 5000
+
+
+def walk(s) -> list[tuple]:
+    """The old way: every meal, its items and their foods, summed in Python."""
+    meals = s.scalars(select(Meal).order_by(Meal.name)
+                      .options(selectinload(Meal.items).selectinload(MealItem.food)))
+    return [(m.id, *(sum((getattr(it.food, n) or 0) * it.servings for it in m.items)
+                     for n in NUTRIENTS)) for m in meals]
+
+
+def main(n: int) -> None:
+    rng = random.Random(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = new_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        Session = new_session_factory(engine)
+        with Session() as s:
+            s.execute(insert(Food), [{"name": f"Food {i}", "calories": rng.uniform(20, 600),
+                                      "protein": rng.uniform(0, 30), "iron_mg": rng.uniform(0, 3)}
+                                     for i in range(FOODS)])
+            s.commit()
+            t0 = time.perf_counter()
+            for m in range(n):  # ORM unit of work: the flush listener keeps meal_totals current
+                s.add(Meal(name=f"Meal {m}", items=[
+                    MealItem(food_id=1 + (0 if k == 0 and m % 10 == 0 else rng.randrange(FOODS)),
+                             servings=rng.choice((0.5, 1.0, 2.0))) for k in range(ITEMS)]))
+            s.commit()
+            print(f"{n} meals x {ITEMS} items, {FOODS} foods; created in "
+                  f"{time.perf_counter() - t0:.2f} s")
+
+        results = {}
+        for label, fn in (("walk items + foods", walk),
+                          ("meal_totals rows", lambda s: MealRepository(s).list_vectors())):
+            with Session() as s:
+                t0 = time.perf_counter()
+                results[label] = fn(s)
+                print(f"{label:20} {time.perf_counter() - t0:7.3f} s")
+        old, new = results.values()
+        assert all(abs(a - b) < 1e-6 for o, v in zip(old, new) for a, b in zip(o[1:], v[2:]))
+
+        with Session() as s:
+            food = s.get(Food, 1)
+            used_by = s.scalar(select(func.count(MealItem.meal_id.distinct()))
+                               .where(MealItem.food_id == 1))
+            t0 = time.perf_counter()
+            food.calories += 10
+            s.commit()
+            print(f"edit a food used by {used_by} meals: {time.perf_counter() - t0:.3f} s")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
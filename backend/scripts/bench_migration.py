@@ -0,0 +1,69 @@
+"""Benchmark: legacy Excel migration throughput on a synthetic export.
+Run: `uv run python scripts/bench_migration.py [food_rows]` (default 100000; the meals
+sheet gets a meal of 4 items per 20 foods). Builds both workbooks with openpyxl's
+write-only mode in a temp dir, migrates into a fresh SQLite file, reports rows/s.
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from openpyxl import Workbook
+
+from app.db import Base, new_engine, new_session_factory
+from app.migration.runner import migrate
+
+FOOD_HEADER = ["Name", "Label", "Measurement", "Calories", "Protein", "Carbs",
+               "Fat_Saturated", "Fat_Regular", "Sodium"]
+
+
+def _write(path: Path, header: list, rows) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(header)
+    for r in rows:
+        ws.append(r)
+    wb.save(path)
+
+
+def build(tmp: Path, n_foods: int) -> tuple[Path, Path, int]:
+    rng = random.Random(n_foods)
+    foods, meals = tmp / "foods.xlsx", tmp / "meals.xlsx"
+    _write(foods, FOOD_HEADER, (
+        [f"Food {i}", f"Brand {i % 97}", "100g", rng.uniform(20, 600), rng.uniform(0, 40),
+         rng.uniform(0, 80), rng.uniform(0, 10), rng.uniform(0, 20), rng.uniform(0, 800)]
+        for i in range(n_foods)))
+    n_meals = n_foods // 20
+    meal_rows = []
+    for m in range(n_meals):
+        for _ in range(4):
+            i = rng.randrange(n_foods)
+            meal_rows.append([f"Meal {m}", f"{rng.choice((0.5, 1, 1.5, 2))}x Food {i}", f"Brand {i % 97}"])
+        meal_rows.append([f"Meal {m}", "Total", ""])
+    _write(meals, ["Meal_Name", "Food_Name", "Label"], meal_rows)
+    return foods, meals, n_foods + len(meal_rows)
+
+
+def main(n_foods: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        foods, meals, rows = build(Path(tmp), n_foods)
+        print(f"built {rows} rows in {time.perf_counter() - t0:.1f}s")
+        engine = new_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        for label in ("fresh DB", "re-run (all dups)"):
+            with new_session_factory(engine)() as s:
+                t0 = time.perf_counter()
+                report = migrate(s, str(foods), str(meals))
+                s.commit()
+                dt = time.perf_counter() - t0
+            print(f"{label:18} {report['rows_read']} rows in {dt:6.2f}s  "
+                  f"= {report['rows_read'] / dt:9.0f} rows/s  {report}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
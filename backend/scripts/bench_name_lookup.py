@@ -0,0 +1,68 @@
+"""Benchmark: case-insensitive dedup lookups with and without the lower(name) indexes.
+Run: `uv run python scripts/bench_name_lookup.py [foods] [lookups]` (default 200000 foods,
+20000 meals, 2000 lookups of each kind). Times FoodRepository.find_by_name_brand (the
+add_food_to_library / POST /foods dedup check) and MealRepository.find_by_name, first
+with the expression indexes dropped (the old full scan), then with them in place.
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from sqlalchemy import insert, text
+
+from app.db import Base, new_engine, new_session_factory
+from app.migration.schema_upgrade import ensure_indexes
+from app.models import CASE_INSENSITIVE_INDEXES, Food, Meal
+from app.repositories import FoodRepository, MealRepository
+
+
+def populate(engine, n: int) -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for start in range(0, n, 50_000):
+            conn.execute(insert(Food), [{"name": f"Food {i}", "brand": f"Brand {i % 97}"}
+                                        for i in range(start, min(n, start + 50_000))])
+        conn.execute(insert(Meal), [{"name": f"Meal {i}"} for i in range(n // 10)])
+
+
+def run(Session, n: int, lookups: int) -> tuple[float, float]:
+    rng = random.Random(lookups)
+    foods = [rng.randrange(n) for _ in range(lookups)]
+    meals = [rng.randrange(n // 10) for _ in range(lookups)]
+    with Session() as s:
+        repo, t0 = FoodRepository(s), time.perf_counter()
+        for i in foods:
+            assert repo.find_by_name_brand(f" FOOD {i}", f"brand {i % 97}") is not None
+        food_dt = time.perf_counter() - t0
+        repo, t0 = MealRepository(s), time.perf_counter()
+        for i in meals:
+            assert repo.find_by_name(f"meal {i}") is not None
+        return food_dt, time.perf_counter() - t0
+
+
+def main(n: int, lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = new_engine(f"sqlite:///{tmp}/bench.db")
+        populate(engine, n)
+        Session = new_session_factory(engine)
+        print(f"{n} foods, {n // 10} meals, {lookups} lookups each")
+        with engine.begin() as conn:
+            for index in CASE_INSENSITIVE_INDEXES:
+                conn.execute(text(f"DROP INDEX {index.name}"))
+        for label in ("full scan (no index)", "lower(name) index"):
+            if label != "full scan (no index)":
+                ensure_indexes(engine)
+            food_dt, meal_dt = run(Session, n, lookups)
+            print(f"{label:22} find_by_name_brand {lookups / food_dt:9.0f}/s  "
+                  f"({food_dt * 1e6 / lookups:8.1f} us)   "
+                  f"meal find_by_name {lookups / meal_dt:9.0f}/s  ({meal_dt * 1e6 / lookups:8.1f} us)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 2_000)
@@ -0,0 +1,71 @@
+"""Benchmark: batch plan generation, sequential vs fanning the solves out to processes.
+Run: `uv run python scripts/bench_plan_batch.py [users] [foods]` (default 2000 users, 5000 foods).
+The pool rows time only the solves (spawn start method, pool created per batch as a
+request would); the sequential batch includes its DB reads and writes.
+"""
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from sqlalchemy import insert
+
+from app.batch.plans import CatalogFood, _candidates, _solve, generate_batch, load_catalog
+from app.db import Base, new_engine, new_session_factory
+from app.models import Food, User
+
+
+def _timed_solve(job):
+    candidates, target = job
+    return _solve(candidates, target, 3, 2)[2]
+
+
+def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_foods = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = new_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Food), [{"name": f"Food {i}", "calories": rng.uniform(20, 600)}
+                                        for i in range(n_foods)])
+            conn.execute(insert(User), [
+                {"name": f"user{i}", "age": rng.randint(18, 70), "sex": rng.choice(("male", "female")),
+                 "height_cm": rng.uniform(150, 200), "weight_kg": rng.uniform(50, 120),
+                 "activity_level": "moderate"} for i in range(n_users)])
+        Session = new_session_factory(engine)
+        print(f"{n_users} users, {n_foods} foods")
+        with Session() as s:
+            t0 = time.perf_counter()
+            report = generate_batch(s)
+            s.rollback()
+            wall = time.perf_counter() - t0
+            catalog = load_catalog(s)
+        solve = [r["solve_s"] for r in report["plans"]]
+        print(f"  sequential batch (DB included): {wall:6.2f}s, "
+              f"per-user solve mean {1e6 * sum(solve) / len(solve):.1f} us")
+
+        full = [CatalogFood(int(i), float(c)) for i, c in catalog.tolist()]
+        t0 = time.perf_counter()
+        for _ in range(n_users):
+            _timed_solve((full, 2500.0))
+        print(f"  solves over the whole catalog (previous per-user cost): {time.perf_counter() - t0:6.2f}s")
+        spawn = multiprocessing.get_context("spawn")
+        job = (_candidates(catalog, 3, 2), 2500.0)
+        for workers in (2, 4):
+            t0 = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as pool:
+                list(pool.map(_timed_solve, [job] * n_users,
+                              chunksize=max(1, n_users // (workers * 4))))
+            print(f"  pool workers={workers}, solves only: {time.perf_counter() - t0:6.2f}s")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
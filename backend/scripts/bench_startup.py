@@ -0,0 +1,67 @@
+"""Benchmark: API startup work (schema, seeding, enrichment) on a fresh and a warm DB.
+Run: `uv run python scripts/bench_startup.py [foods]` (default 20000 legacy foods). Compares
+the pre-fingerprint lifespan (create_all + upgrades + per-staple lookups + full foods scan)
+with app.seed.startup.prepare_database, against a throwaway SQLite file.
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from sqlalchemy import insert
+
+from app.db import Base, new_engine, new_session_factory
+from app.migration.schema_upgrade import ensure_food_micro_columns, ensure_food_search_index
+from app.models import Food
+from app.repositories import FoodRepository
+from app.seed.enrich import MICROS_FILE
+from app.seed.seeder import SEED_FILE, _FOOD_FIELDS
+from app.seed.startup import prepare_database
+
+
+def old_startup(engine, Session) -> None:
+    # the lifespan before seed_state: every step, every boot
+    Base.metadata.create_all(engine)
+    ensure_food_micro_columns(engine)
+    ensure_food_search_index(engine)
+    with Session() as s:
+        repo = FoodRepository(s)
+        for rec in json.loads(SEED_FILE.read_text()):
+            if rec.get("name") and not repo.find_by_name_brand(rec["name"], rec.get("brand") or ""):
+                repo.add(Food(**{k: v for k, v in rec.items() if k in _FOOD_FIELDS}))
+        data = json.loads(MICROS_FILE.read_text())
+        for food in repo.list_all():
+            rec = data.get(food.name.lower())
+            if rec and food.iron_mg is None:
+                for k, v in rec.items():
+                    setattr(food, k, v)
+        s.commit()
+
+
+def _timed(label: str, fn) -> None:
+    t0 = time.perf_counter()
+    out = fn()
+    print(f"{label:28} {(time.perf_counter() - t0) * 1e3:9.1f} ms  {out or ''}")
+
+
+def main(n_foods: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, boot in (("old", old_startup), ("new", prepare_database)):
+            engine = new_engine(f"sqlite:///{tmp}/{label}.db")
+            Session = new_session_factory(engine)
+            _timed(f"{label}  cold (empty DB)", lambda: boot(engine, Session))
+            with Session() as s:  # a migrated legacy library, already enriched
+                s.execute(insert(Food), [{"name": f"Legacy food {i}", "source": "legacy", "iron_mg": 1.0}
+                                         for i in range(n_foods)])
+                s.commit()
+            boot(engine, Session)
+            for i in range(3):
+                _timed(f"{label}  warm boot #{i + 1}", lambda: boot(engine, Session))
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
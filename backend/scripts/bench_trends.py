@@ -0,0 +1,93 @@
+"""Benchmark: a user's 90-day intake trend — scanning log_entries vs the daily_intake rollup.
+Run: `uv run python scripts/bench_trends.py [users] [days]` (default 200 users x 365 days,
+8 entries a day). Times the log scan (LogRepository.totals_for_range by day, a join of
+every entry in the window with its food) against one daily_intake row per day, both
+followed by the same summarize(), and what the rollup costs on LogRepository.add.
+"""
+import datetime
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app import rollups
+from app.core.targets import compute_targets
+from app.core.trends import summarize
+from app.db import Base, new_engine, new_session_factory
+from app.models import Food, LogEntry, User
+from app.repositories import LogRepository
+from app.rollups import refresh_daily_intake
+
+PER_DAY = 8
+FOODS = 2000
+WINDOW = 90
+LOOKUPS = 200
+ADDS = 2000
+
+
+def populate(engine, users: int, days: int) -> None:
+    rng = random.Random(users)
+    today = datetime.date.today()
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:  # Core inserts: the rollup is backfilled once, below
+        conn.execute(insert(User), [{"name": f"U{u}", "age": 30, "sex": "male", "height_cm": 180,
+                                     "weight_kg": 80, "activity_level": "moderate"} for u in range(users)])
+        conn.execute(insert(Food), [{"name": f"Food {i}", "calories": rng.uniform(20, 600),
+                                     "protein": rng.uniform(0, 30)} for i in range(FOODS)])
+        for u in range(1, users + 1):
+            conn.execute(insert(LogEntry), [
+                {"user_id": u, "food_id": 1 + rng.randrange(FOODS), "servings": rng.choice((0.5, 1, 2)),
+                 "eaten_on": today - datetime.timedelta(days=d), "source": "manual"}
+                for d in range(days) for _ in range(PER_DAY)])
+
+
+def main(users: int, days: int) -> None:
+    today = datetime.date.today()
+    start = today - datetime.timedelta(days=WINDOW - 1)
+    targets = compute_targets(sex="male", weight_kg=80, height_cm=180, age=30, activity_level="moderate")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = new_engine(f"sqlite:///{tmp}/bench.db")
+        populate(engine, users, days)
+        factory = new_session_factory(engine)
+        with factory() as s:
+            t0 = time.perf_counter()
+            refresh_daily_intake(s.connection())
+            s.commit()
+            print(f"{users * days * PER_DAY} log entries; backfill {time.perf_counter() - t0:.2f} s")
+
+        rng = random.Random(0)
+        picks = [1 + rng.randrange(users) for _ in range(LOOKUPS)]
+        with factory() as s:
+            logs = LogRepository(s)
+            for label, fetch in (
+                    ("scan log_entries", lambda u: [dict(r, day=datetime.date.fromisoformat(r["period"]))
+                                                    for r in logs.totals_for_range(u, start, today)]),
+                    ("daily_intake rows", lambda u: logs.daily_intake(u, start, today))):
+                t0 = time.perf_counter()
+                for u in picks:
+                    summarize(fetch(u), targets, start, today)
+                dt = (time.perf_counter() - t0) / LOOKUPS
+                print(f"{WINDOW}-day trend, {label:18} {dt * 1e3:8.2f} ms")
+
+        for label in ("add + commit, rollup", "add + commit, no rollup"):
+            if label.endswith("no rollup"):
+                event.remove(Session, "after_flush", rollups._rollups_after_flush)
+            with factory() as s:
+                logs = LogRepository(s)
+                t0 = time.perf_counter()
+                for i in range(ADDS):
+                    logs.add(user_id=picks[i % LOOKUPS], food_id=1 + i % FOODS, servings=1.0)
+                    s.commit()
+                print(f"{label:24} {(time.perf_counter() - t0) / ADDS * 1e3:8.3f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 365)
@@ -1,5 +1,6 @@
 """One-off: build micronutrient enrichment for the legacy foods -> app/seed/legacy_micros.json.
 Run with USDA_API_KEY: `PYTHONPATH=$(pwd) uv run python scripts/build_enrichment.py`.
+With USDA_MODE=local it reads the offline mirror (scripts/import_usda.py) instead.
 
 Macros stay as the user entered them; we only source the 5 micros (+ fiber/sugar) from a
 category-appropriate USDA food and scale to each food's serving grams. Greek items map to
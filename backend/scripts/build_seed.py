@@ -1,5 +1,6 @@
 """One-off: fetch curated canonical staples from USDA -> app/seed/staples.json.
 Run with USDA_API_KEY available: `uv run python scripts/build_seed.py`.
+With USDA_MODE=local it reads the offline mirror (scripts/import_usda.py) instead.
 
 For each staple we give a search query and the REQUIRED tokens (whole words that
 must all appear in the result name). USDA names are "Noun, modifier, modifier",
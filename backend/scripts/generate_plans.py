@@ -0,0 +1,36 @@
+"""Nightly job: regenerate a day plan for every user (or --users 1,2,3) in one batch.
+Run: `uv run python scripts/generate_plans.py [--meals 3] [--foods-per-meal 2]`.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from app.batch.plans import generate_batch
+from app.db import SessionLocal, init_db
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--users", help="comma-separated user ids (default: all users)")
+    ap.add_argument("--meals", type=int, default=3)
+    ap.add_argument("--foods-per-meal", type=int, default=2)
+    args = ap.parse_args()
+
+    init_db()
+    user_ids = [int(x) for x in args.users.split(",")] if args.users else None
+    with SessionLocal() as s:
+        report = generate_batch(s, user_ids=user_ids, meals=args.meals,
+                                foods_per_meal=args.foods_per_meal)
+        s.commit()
+    for row in report["plans"]:
+        print(f"ok   user {row['user_id']:>6} -> plan #{row['plan_id']}  {row['solve_s'] * 1e3:8.2f} ms")
+    for row in report["failed"]:
+        print(f"FAIL user {row['user_id']:>6}: {row['error']}")
+    print(f"\n{len(report['plans'])} plans, {len(report['failed'])} failed, "
+          f"{report['elapsed_s']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
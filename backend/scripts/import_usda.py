@@ -0,0 +1,28 @@
+"""Load FoodData Central bulk dumps into the local usda_foods mirror.
+Run: `uv run python scripts/import_usda.py FoodData_Central_sr_legacy_food_json_*.zip [more dumps]`
+(the SR Legacy + Foundation JSON downloads, zipped or not). Then set USDA_MODE=local and
+USDAProvider — the API, the coach and scripts/build_seed.py — searches the mirror offline.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/ on sys.path
+
+from app.db import engine, init_db
+from app.integrations.usda_local import LocalUSDAIndex, import_dump
+
+
+def main(paths: list[str]) -> None:
+    if not paths:
+        sys.exit(__doc__)
+    init_db()
+    for path in paths:
+        t0 = time.perf_counter()
+        n = import_dump(engine, path)
+        print(f"{path}: {n} foods in {time.perf_counter() - t0:.1f}s")
+    print(f"usda_foods now holds {LocalUSDAIndex(engine).count()} foods")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,74 @@
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import InMemorySaver
+from app.db import Base, new_engine, new_session_factory
+from app.models import User
+from app.agent import coach
+from app.agent.coach import build_coach_agent
+
+
+class ProfileThenReplyModel(BaseChatModel):
+    """Calls get_profile once, then answers with the tool's output."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            msg = AIMessage(content=f"profile: {last.content}")
+        else:
+            msg = AIMessage(content="", tool_calls=[{"name": "get_profile", "args": {}, "id": "c1"}])
+        return ChatResult(generations=[ChatGeneration(message=msg)])
+
+
+def _session_with_users(*names):
+    engine = new_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    s = new_session_factory(engine)()
+    for name in names:
+        s.add(User(name=name, age=30, sex="male", height_cm=180, weight_kg=80,
+                   activity_level="moderate"))
+    s.commit()
+    return s
+
+
+def test_default_model_graph_is_compiled_once(monkeypatch):
+    monkeypatch.setattr(coach, "default_chat_model", lambda: ProfileThenReplyModel())
+    saver = InMemorySaver()
+    with _session_with_users("Ann", "Ben") as s:
+        a = build_coach_agent(s, user_id=1, checkpointer=saver)
+        b = build_coach_agent(s, user_id=2, checkpointer=saver)
+        assert a.graph is b.graph
+
+
+def test_tools_read_the_request_context(monkeypatch):
+    monkeypatch.setattr(coach, "default_chat_model", lambda: ProfileThenReplyModel())
+    saver = InMemorySaver()
+    with _session_with_users("Ann", "Ben") as s:
+        for user_id, name in ((1, "Ann"), (2, "Ben")):
+            out = build_coach_agent(s, user_id=user_id, checkpointer=saver).invoke(
+                {"messages": [{"role": "user", "content": "targets?"}]},
+                config={"configurable": {"thread_id": f"user-{user_id}"}},
+            )
+            assert out["messages"][-1].content.startswith(f"profile: {name}:")
+
+
+def test_graph_registry_is_bounded_and_releases_checkpointers(monkeypatch):
+    import gc
+    import weakref
+    monkeypatch.setattr(coach, "default_chat_model", lambda: ProfileThenReplyModel())
+    saver = InMemorySaver()
+    coach.coach_graph(saver)
+    dropped = weakref.ref(saver)
+    del saver
+    for _ in range(coach._MAX_GRAPHS):
+        coach.coach_graph(InMemorySaver())
+    gc.collect()
+    assert len(coach._GRAPHS) <= coach._MAX_GRAPHS
+    assert dropped() is None
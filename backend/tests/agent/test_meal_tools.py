@@ -2,7 +2,8 @@ import pytest
 from app.db import Base, new_engine, new_session_factory
 from app.models import User, Food
 from app.repositories import MealRepository
-from app.agent.tools import build_tools
+from langchain.tools import ToolRuntime
+from app.agent.tools import COACH_TOOLS, CoachContext
 
 
 @pytest.fixture
@@ -14,20 +15,26 @@ def ctx():
     s.add(Food(name="Oats", serving_description="100g", calories=375, protein=11, carbs=69))
     s.add(Food(name="Banana", serving_description="1", calories=105, protein=1, carbs=27))
     s.commit()
-    tools = {t.name: t for t in build_tools(s, user_id=1)}
-    yield s, tools
+    tools = {t.name: t for t in COACH_TOOLS}
+    runtime = ToolRuntime(state={}, context=CoachContext(s, user_id=1),
+                          config={}, stream_writer=None, tool_call_id=None, store=None)
+
+    def run(name, args):
+        return tools[name].invoke({**args, "runtime": runtime})
+
+    yield s, run
     s.close()
 
 
 def test_save_meal_creates_meal_with_items(ctx):
-    session, tools = ctx
-    out = tools["save_meal"].invoke({"name": "Breakfast Bowl",
-                                     "items": [{"food": "Oats", "servings": 1}, {"food": "Banana", "servings": 1}]})
-    assert "saved" in out.lower()
+    session, run = ctx
+    out = run("save_meal", {"name": "Breakfast Bowl",
+                            "items": [{"food": "Oats", "servings": 1}, {"food": "Banana", "servings": 1}]})
+    assert "saved" in out.lower() and "480 kcal" in out
     meal = MealRepository(session).find_by_name("Breakfast Bowl")
     assert meal is not None and len(meal.items) == 2
 
 
 def test_list_my_plans_empty(ctx):
-    _, tools = ctx
-    assert "no" in tools["list_my_plans"].invoke({}).lower()
+    _, run = ctx
+    assert "no" in run("list_my_plans", {}).lower()
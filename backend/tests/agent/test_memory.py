@@ -0,0 +1,172 @@
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from app.db import Base, new_engine, new_session_factory
+from app.models import User
+from app.agent.coach import build_coach_agent
+from app.agent.memory import SqlCheckpointer, checkpointer_for
+
+
+class FakeToolModel(BaseChatModel):
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+def _db(tmp_path):
+    engine = new_engine(f"sqlite:///{tmp_path / 'coach.db'}")
+    Base.metadata.create_all(engine)
+    with new_session_factory(engine)() as s:
+        s.add(User(name="K", age=30, sex="male", height_cm=180, weight_kg=80, activity_level="moderate"))
+        s.commit()
+    return engine
+
+
+def _chat(engine, saver, text, thread="t1"):
+    with new_session_factory(engine)() as s:
+        agent = build_coach_agent(s, user_id=1, model=FakeToolModel(), checkpointer=saver)
+        return agent.invoke({"messages": [{"role": "user", "content": text}]},
+                            config={"configurable": {"thread_id": thread}})
+
+
+def test_history_survives_restart_and_is_shared_between_workers(tmp_path):
+    engine = _db(tmp_path)
+    worker_a, worker_b = SqlCheckpointer(engine), SqlCheckpointer(engine)
+    _chat(engine, worker_a, "I am vegetarian.")
+    out = _chat(engine, worker_b, "What am I?")          # other worker / fresh process
+    assert out["messages"][0].content == "I am vegetarian."
+    out = _chat(engine, worker_a, "Still?")              # worker_a's cache is stale -> re-read
+    assert [m.content for m in out["messages"] if isinstance(m, HumanMessage)] == [
+        "I am vegetarian.", "What am I?", "Still?"]
+    assert worker_a.stats.cache_misses >= 1
+
+
+def test_only_latest_checkpoint_is_stored(tmp_path):
+    engine = _db(tmp_path)
+    saver = SqlCheckpointer(engine)
+    for i in range(3):
+        _chat(engine, saver, f"message {i}")
+    assert len(list(saver.list({"configurable": {"thread_id": "t1"}}))) == 1
+    assert list(saver.stored_bytes()) == ["t1"]
+    saver.delete_thread("t1")
+    assert saver.get_tuple({"configurable": {"thread_id": "t1"}}) is None
+
+
+def test_lru_tier_is_bounded(tmp_path):
+    engine = _db(tmp_path)
+    saver = SqlCheckpointer(engine, cache_size=2)
+    for thread in ("a", "b", "c"):
+        _chat(engine, saver, "hi", thread=thread)
+    assert saver.metrics()["cached_threads"] == 2
+    assert saver.get_tuple({"configurable": {"thread_id": "a"}}) is not None  # from the DB
+
+
+def test_long_threads_are_summarized(tmp_path, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "coach_history_max_messages", 6)
+    monkeypatch.setattr(settings, "coach_history_keep_messages", 2)
+    engine = _db(tmp_path)
+    saver = SqlCheckpointer(engine)
+    for i in range(8):
+        out = _chat(engine, saver, f"turn {i}")
+    # 16 raw messages would have accumulated; older turns were folded into a summary
+    assert len(out["messages"]) < 8
+    assert "turn 0" not in [m.content for m in out["messages"]]
+
+
+def test_checkpointer_is_process_wide_per_engine():
+    engine = new_engine("sqlite://")
+    assert checkpointer_for(engine) is checkpointer_for(engine)
+    assert checkpointer_for(engine) is not checkpointer_for(new_engine("sqlite://"))
+
+
+def test_cached_checkpoints_are_not_shared_with_callers(tmp_path):
+    from langgraph.checkpoint.base import empty_checkpoint
+    saver = SqlCheckpointer(_db(tmp_path))
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_versions"]["messages"] = "1"
+    config = saver.put({"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}, checkpoint, {}, {})
+    checkpoint["channel_versions"]["messages"] = "2"  # the loop keeps mutating its copy
+    read = saver.get_tuple(config).checkpoint
+    assert read["channel_versions"] == {"messages": "1"}
+    read["channel_versions"]["messages"] = "3"
+    read["versions_seen"]["model"] = {"messages": "3"}
+    again = saver.get_tuple(config)  # an LRU hit must serve what was persisted
+    assert saver.stats.cache_hits == 2
+    assert again.checkpoint["channel_versions"] == {"messages": "1"}
+    assert again.checkpoint["versions_seen"] == {}
+
+
+def test_checkpointer_registry_is_bounded_and_releases_engines():
+    import gc
+    import weakref
+    from app.agent import memory
+    first = new_engine("sqlite://")
+    checkpointer_for(first)
+    dropped = weakref.ref(first)
+    del first
+    for _ in range(memory._MAX_CHECKPOINTERS):
+        checkpointer_for(new_engine("sqlite://"))
+    gc.collect()
+    assert len(memory._CHECKPOINTERS) <= memory._MAX_CHECKPOINTERS
+    assert dropped() is None
+
+
+def test_concurrent_writes_on_a_shared_in_memory_connection():
+    from concurrent.futures import ThreadPoolExecutor
+    from langgraph.checkpoint.base import empty_checkpoint
+    engine = new_engine("sqlite://")  # StaticPool: every thread gets the same connection
+    Base.metadata.create_all(engine)
+    saver = SqlCheckpointer(engine)
+
+    def turn(thread):
+        for _ in range(20):
+            config = saver.put({"configurable": {"thread_id": thread, "checkpoint_ns": ""}},
+                               empty_checkpoint(), {}, {})
+            saver.put_writes(config, [("messages", "hi")], task_id="t")
+            assert saver.get_tuple(config).pending_writes == [("t", "messages", "hi")]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(turn, [f"t{i}" for i in range(8)]))
+    assert saver.stats.writes == 8 * 20 * 2
+
+
+def test_async_methods_do_not_block_the_loop(tmp_path):
+    import asyncio
+    import time
+    from langgraph.checkpoint.base import empty_checkpoint
+    from sqlalchemy import event
+    engine = _db(tmp_path)
+    saver = SqlCheckpointer(engine)
+    event.listen(engine, "before_cursor_execute", lambda *a: time.sleep(0.05))  # a slow disk
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        config = await saver.aput({"configurable": {"thread_id": "t1", "checkpoint_ns": ""}},
+                                  empty_checkpoint(), {}, {})
+        await saver.aput_writes(config, [("messages", "hi")], task_id="t")
+        listed = [tup async for tup in saver.alist(None)]
+        got = await saver.aget_tuple(config)
+        await saver.adelete_thread("t1")
+        t.cancel()
+        return listed, got, ticks
+
+    listed, got, ticks = asyncio.run(run())
+    assert [tup.config for tup in listed] == [got.config]
+    assert got.pending_writes == [("t", "messages", "hi")]
+    assert saver.get_tuple(got.config) is None
+    assert ticks >= 10  # the loop kept running while each call waited on the DB
@@ -2,7 +2,8 @@ import pytest
 from app.db import Base, new_engine, new_session_factory
 from app.models import User, Food
 from app.repositories import PlanRepository
-from app.agent.tools import build_tools
+from langchain.tools import ToolRuntime
+from app.agent.tools import COACH_TOOLS, CoachContext
 
 
 @pytest.fixture
@@ -21,14 +22,20 @@ def ctx():
     s.add(Food(name="Broccoli", serving_description="100g", calories=34, protein=2.8,
                carbs=7, vitamin_c_mg=89, potassium_mg=316))
     s.commit()
-    tools = {t.name: t for t in build_tools(s, user_id=1)}
-    yield s, tools
+    tools = {t.name: t for t in COACH_TOOLS}
+    runtime = ToolRuntime(state={}, context=CoachContext(s, user_id=1),
+                          config={}, stream_writer=None, tool_call_id=None, store=None)
+
+    def run(name, args):
+        return tools[name].invoke({**args, "runtime": runtime})
+
+    yield s, run
     s.close()
 
 
 def test_plan_day_persists_and_scores(ctx):
-    session, tools = ctx
-    out = tools["plan_day"].invoke({"meals": [
+    session, run = ctx
+    out = run("plan_day", {"meals": [
         {"name": "Lunch", "foods": ["Chicken Breast", "White Rice", "Olive Oil"]},
         {"name": "Dinner", "foods": ["Chicken Breast", "Broccoli", "White Rice"]},
     ]})
@@ -39,6 +46,16 @@ def test_plan_day_persists_and_scores(ctx):
 
 
 def test_plan_day_unknown_foods(ctx):
-    _, tools = ctx
-    out = tools["plan_day"].invoke({"meals": [{"name": "X", "foods": ["nonexistent food"]}]})
+    _, run = ctx
+    out = run("plan_day", {"meals": [{"name": "X", "foods": ["nonexistent food"]}]})
     assert "no" in out.lower() or "couldn" in out.lower()
+
+
+def test_plan_week_saves_a_plan_per_day(ctx):
+    session, run = ctx
+    out = run("plan_week", {"meals": [
+        {"name": "Lunch", "foods": ["Chicken Breast", "White Rice", "Broccoli"]},
+        {"name": "Dinner", "foods": ["Chicken Breast", "White Rice", "Olive Oil"]},
+    ], "max_repeats": 7})
+    assert "daily average" in out.lower() and "Day 7" in out
+    assert len(PlanRepository(session).list_for_user(1)) == 7
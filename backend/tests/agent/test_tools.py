@@ -2,7 +2,8 @@ import pytest
 from app.db import Base, new_engine, new_session_factory
 from app.models import User, Food
 from app.repositories import PlanRepository, LogRepository
-from app.agent.tools import build_tools
+from langchain.tools import ToolRuntime
+from app.agent.tools import COACH_TOOLS, CoachContext
 from app.integrations.nutrition import NutritionResult
 
 
@@ -21,32 +22,38 @@ def ctx():
     s.add(Food(name="Rice", serving_description="100g", calories=130, protein=2.7))
     s.add(Food(name="Chicken", serving_description="100g", calories=165, protein=31))
     s.commit()
-    tools = {t.name: t for t in build_tools(s, user_id=1, nutrition_provider=FakeProvider())}
-    yield s, tools
+    tools = {t.name: t for t in COACH_TOOLS}
+    runtime = ToolRuntime(state={}, context=CoachContext(s, user_id=1, nutrition_provider=FakeProvider()),
+                          config={}, stream_writer=None, tool_call_id=None, store=None)
+
+    def run(name, args):
+        return tools[name].invoke({**args, "runtime": runtime})
+
+    yield s, run
     s.close()
 
 
 def test_get_profile_tool(ctx):
-    _, tools = ctx
-    out = tools["get_profile"].invoke({})
+    _, run = ctx
+    out = run("get_profile", {})
     assert "kcal" in out and "K" in out
 
 
 def test_search_nutrition_tool(ctx):
-    _, tools = ctx
-    assert "Tofu" in tools["search_nutrition_database"].invoke({"query": "tofu"})
+    _, run = ctx
+    assert "Tofu" in run("search_nutrition_database", {"query": "tofu"})
 
 
 def test_plan_day_tool_persists(ctx):
-    session, tools = ctx
-    out = tools["plan_day"].invoke({"meals": [{"name": "Lunch", "foods": ["Rice", "Chicken"]}]})
+    session, run = ctx
+    out = run("plan_day", {"meals": [{"name": "Lunch", "foods": ["Rice", "Chicken"]}]})
     assert "plan" in out.lower()
     assert len(PlanRepository(session).list_for_user(1)) == 1
 
 
 def test_log_food_tool_persists(ctx):
     import datetime
-    session, tools = ctx
-    out = tools["log_food"].invoke({"name": "rice", "servings": 2})
+    session, run = ctx
+    out = run("log_food", {"name": "rice", "servings": 2})
     assert "Logged" in out
     assert len(LogRepository(session).for_day(1, datetime.date.today())) == 1
@@ -1,9 +1,17 @@
+import json
 import pytest
 from types import SimpleNamespace
 from fastapi.testclient import TestClient
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_core.messages import AIMessageChunk, ToolMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langgraph.checkpoint.memory import InMemorySaver
 from app.db import Base, new_engine, new_session_factory, get_session
 from app.main import app
+from app.models import User
 from app.api.coach import get_coach_agent_builder
+from app.agent.coach import build_coach_agent
 
 
 class FakeAgent:
@@ -17,6 +25,9 @@ def client():
     engine = new_engine("sqlite://")
     Base.metadata.create_all(engine)
     TestingSession = new_session_factory(engine)
+    with TestingSession() as s:
+        s.add(User(name="K", age=30, sex="male", height_cm=180, weight_kg=80, activity_level="moderate"))
+        s.commit()
 
     def override_session():
         with TestingSession() as s:
@@ -44,3 +55,64 @@ def test_coach_chat_extracts_gemini_text_blocks(client):
     r = client.post("/users/1/coach", json={"message": "plan"})
     assert r.status_code == 200
     assert r.json()["reply"] == "Here is\nyour plan."
+
+
+class FakeStreamingModel(BaseChatModel):
+    """Streams a get_profile tool call on the first turn, then the answer word by word."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if not isinstance(messages[-1], ToolMessage):
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "get_profile", "args": "{}", "id": "c1", "index": 0}]))
+            return
+        for word in ("Your ", "target ", "is ", "set."):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+            if run_manager:
+                run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    out = []
+    for frame in body.strip().split("\n\n"):
+        event, data = frame.split("\n")
+        out.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return out
+
+
+def test_coach_stream_emits_tokens_and_tool_progress(client):
+    saver = InMemorySaver()
+    app.dependency_overrides[get_coach_agent_builder] = lambda: (
+        lambda db, uid: build_coach_agent(db, uid, model=FakeStreamingModel(), checkpointer=saver))
+    with client.stream("POST", "/users/1/coach/stream", json={"message": "my target?"}) as r:
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/event-stream")
+        events = _events(r.read().decode())
+
+    kinds = [e for e, _ in events]
+    assert kinds[0] == "tool_start" and events[0][1]["name"] == "get_profile"
+    assert kinds[1] == "tool_end" and "kcal/day" in events[1][1]["output"]
+    assert [d["text"] for e, d in events if e == "token"] == ["Your ", "target ", "is ", "set."]
+    assert events[-1] == ("done", {"reply": "Your target is set."})
+
+
+def test_coach_stream_reports_errors_in_band(client):
+    class BrokenAgent:
+        def stream(self, payload, config=None, **kwargs):
+            raise RuntimeError("model unavailable")
+            yield
+
+    app.dependency_overrides[get_coach_agent_builder] = lambda: (lambda db, uid: BrokenAgent())
+    r = client.post("/users/1/coach/stream", json={"message": "hi"})
+    assert r.status_code == 200
+    assert _events(r.text) == [("error", {"detail": "model unavailable"})]
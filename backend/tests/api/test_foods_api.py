@@ -1,20 +1,24 @@
+import json
+from urllib.parse import unquote
 import pytest
 from fastapi.testclient import TestClient
-from app.db import Base, new_engine, new_session_factory, get_session
+from app.db import (
+    Base, new_engine, new_async_engine, new_async_session_factory, get_async_session,
+)
 from app.main import app
 
 
 @pytest.fixture
-def client():
-    engine = new_engine("sqlite://")
-    Base.metadata.create_all(engine)
-    TestingSession = new_session_factory(engine)
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    Base.metadata.create_all(new_engine(url))
+    TestingSession = new_async_session_factory(new_async_engine(url))
 
-    def override():
-        with TestingSession() as s:
+    async def override():
+        async with TestingSession() as s:
             yield s
 
-    app.dependency_overrides[get_session] = override
+    app.dependency_overrides[get_async_session] = override
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -34,3 +38,108 @@ def test_create_food_duplicate_rejected(client):
     payload = {"name": "Banana", "brand": "Dole", "calories": 105}
     assert client.post("/foods", json=payload).status_code == 201
     assert client.post("/foods", json=payload).status_code == 409
+
+
+def _add(client, *names):
+    for n in names:
+        assert client.post("/foods", json={"name": n, "calories": 100}).status_code == 201
+
+
+def test_list_foods_keyset_pages(client):
+    _add(client, "Oats", "Apple", "Rice, white", "Egg", "Milk")
+    seen, after = [], None
+    while True:
+        r = client.get("/foods", params={"limit": 2, "fields": "name", **({"after": after} if after else {})})
+        assert r.status_code == 200
+        seen += [f["name"] for f in r.json()]
+        assert all(set(f) == {"name"} for f in r.json())
+        after = r.headers.get("X-Next-Cursor")
+        if after is None:
+            break
+        after = unquote(after)
+    assert seen == ["Apple", "Egg", "Milk", "Oats", "Rice, white"]
+
+
+def test_list_foods_streams_json_and_ndjson(client):
+    _add(client, "Oats", "Apple", "Egg")
+    full = client.get("/foods").json()
+    assert [f["name"] for f in full] == ["Apple", "Egg", "Oats"]
+    r = client.get("/foods", params={"format": "ndjson", "fields": "id,fat_total"})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines == [{"id": f["id"], "fat_total": f["fat_total"]} for f in full]
+
+
+def test_list_foods_rejects_bad_params(client):
+    assert client.get("/foods", params={"fields": "name,secret"}).status_code == 400
+    assert client.get("/foods", params={"after": "Apple"}).status_code == 400
+    assert client.get("/foods", params={"limit": 0}).status_code == 422
+
+
+def test_bulk_import_json_upserts_and_reports_rows(client):
+    _add(client, "Apple")
+    r = client.post("/foods/bulk", json=[
+        {"name": "apple", "calories": 52},                  # existing (case-insensitive) -> updated
+        {"name": "Pear", "calories": 57},
+        {"name": "PEAR", "calories": 99},                   # repeat within the upload
+        {"name": "Kiwi", "calories": "lots"},               # invalid
+    ])
+    assert r.status_code == 200
+    body = r.json()
+    assert [row["status"] for row in body["rows"]] == ["updated", "created", "duplicate", "invalid"]
+    assert (body["created"], body["updated"], body["duplicate"], body["invalid"]) == (1, 1, 1, 1)
+    foods = {f["name"]: f for f in client.get("/foods").json()}
+    assert foods["Apple"]["calories"] == 52 and foods["Pear"]["calories"] == 57
+
+
+def test_bulk_import_ndjson_and_csv(client):
+    ndjson = '{"name": "Oats", "calories": 389}\n\nnot json\n{"name": "Rice", "carbs": 28}\n'
+    r = client.post("/foods/bulk", content=ndjson, headers={"content-type": "application/x-ndjson"})
+    assert [row["status"] for row in r.json()["rows"]] == ["created", "invalid", "created"]
+    csv_body = "name,brand,calories,fiber\nOats,,400,\nEgg,Farm,78,0\n"
+    r = client.post("/foods/bulk", params={"on_conflict": "skip"}, content=csv_body,
+                    headers={"content-type": "text/csv"})
+    assert [row["status"] for row in r.json()["rows"]] == ["skipped", "created"]
+    assert {f["name"]: f["calories"] for f in client.get("/foods").json()} == {
+        "Egg": 78, "Oats": 389, "Rice": 0}
+    bad = client.post("/foods/bulk", content="x", headers={"content-type": "text/plain"})
+    assert bad.status_code == 415
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 4096])
+def test_bulk_import_streams_a_json_array_in_any_chunking(client, chunk):
+    body = json.dumps([{"name": "Crème fraîche", "calories": 292.5}, 12345,
+                       {"name": "Skyr", "calories": 63}]).encode()
+    r = client.post("/foods/bulk", headers={"content-type": "application/json"},
+                    content=(body[i:i + chunk] for i in range(0, len(body), chunk)))
+    assert [row["status"] for row in r.json()["rows"]] == ["created", "invalid", "created"]
+    assert {f["name"]: f["calories"] for f in client.get("/foods").json()} == {
+        "Crème fraîche": 292.5, "Skyr": 63}
+
+
+def test_bulk_import_reimport_of_non_ascii_names_updates(client):
+    rows = [{"name": "Φέτα", "brand": "Δωδώνη", "calories": 264}]
+    assert client.post("/foods/bulk", json=rows).json()["created"] == 1
+    rows[0] |= {"name": "ΦΈΤΑ", "calories": 270}  # case-folds past what SQLite's lower() does
+    body = client.post("/foods/bulk", json=rows).json()
+    assert (body["created"], body["updated"]) == (0, 1)
+    assert [(f["name"], f["calories"]) for f in client.get("/foods").json()] == [("Φέτα", 270)]
+
+
+def test_bulk_import_rejects_malformed_json(client):
+    for body in ('{"name": "Oats"}', '[{"name": "Oats"} {"name": "Egg"}]', '[{"name": "Oats"}] x',
+                 '[{"name": "Oats"'):
+        r = client.post("/foods/bulk", content=body, headers={"content-type": "application/json"})
+        assert r.status_code == 400, body
+    assert client.get("/foods").json() == []
+
+
+def test_bulk_import_csv_quoted_fields_span_lines(client):
+    csv_body = ('name,brand,serving_description,calories\r\n'
+                '"Soup, tomato",Acme,"1 cup\r\n(240 ml)",74\r\n'
+                '12" pizza slice,,1 slice,285\r\n')
+    r = client.post("/foods/bulk", content=csv_body, headers={"content-type": "text/csv"})
+    assert [row["status"] for row in r.json()["rows"]] == ["created", "created"]
+    foods = {f["name"]: f for f in client.get("/foods").json()}
+    assert foods["Soup, tomato"]["serving_description"] == "1 cup\r\n(240 ml)"
+    assert foods['12" pizza slice']["calories"] == 285
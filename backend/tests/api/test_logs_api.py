@@ -1,13 +1,18 @@
+import datetime
 import pytest
 from fastapi.testclient import TestClient
-from app.db import Base, new_engine, new_session_factory, get_session
+from app.db import (
+    Base, new_engine, new_session_factory, new_async_engine, new_async_session_factory,
+    get_session, get_async_session,
+)
 from app.main import app
 from app.models import User, Food
 
 
 @pytest.fixture
-def client():
-    engine = new_engine("sqlite://")
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = new_engine(url)
     Base.metadata.create_all(engine)
     TestingSession = new_session_factory(engine)
     with TestingSession() as s:
@@ -15,11 +20,18 @@ def client():
         s.add(Food(name="Egg", serving_description="1", calories=78, protein=6))
         s.commit()
 
+    AsyncTestingSession = new_async_session_factory(new_async_engine(url))
+
     def override():
         with TestingSession() as s:
             yield s
 
+    async def override_async():
+        async with AsyncTestingSession() as s:
+            yield s
+
     app.dependency_overrides[get_session] = override
+    app.dependency_overrides[get_async_session] = override_async
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -33,3 +45,49 @@ def test_log_food_and_day_summary(client):
     body = s.json()
     assert body["totals"]["calories"] == pytest.approx(156)  # 78 * 2
     assert len(body["entries"]) == 1
+
+
+def test_log_summary_groups_by_day_and_month(client):
+    client.post("/users/1/log", json={"food_id": 1, "servings": 2})
+    client.post("/users/1/log", json={"food_id": 1, "servings": 1})
+    today = datetime.date.today()
+    r = client.get("/users/1/log/summary", params={"from": (today - datetime.timedelta(days=30)).isoformat(),
+                                                   "to": today.isoformat()})
+    assert r.status_code == 200
+    assert r.json() == [{"period": today.isoformat(), "entries": 2, "totals": pytest.approx({
+        "calories": 234.0, "protein": 18.0, "carbs": 0.0, "fat_saturated": 0.0,
+        "fat_unsaturated": 0.0, "fiber": 0.0, "sodium": 0.0, "iron_mg": 0.0, "calcium_mg": 0.0,
+        "potassium_mg": 0.0, "vitamin_c_mg": 0.0, "vitamin_d_ug": 0.0, "fat_total": 0.0})}]
+    monthly = client.get("/users/1/log/summary", params={
+        "from": today.isoformat(), "to": today.isoformat(), "group_by": "month"}).json()
+    assert monthly[0]["period"] == today.strftime("%Y-%m")
+
+
+def test_log_summary_rejects_inverted_range(client):
+    r = client.get("/users/1/log/summary", params={"from": "2026-02-01", "to": "2026-01-01"})
+    assert r.status_code == 400
+
+
+def test_trends_from_daily_rollup(client, tmp_path):
+    from app.core.targets import compute_targets
+    from app.models import LogEntry
+    today = datetime.date.today()
+    kcal = compute_targets(sex="male", weight_kg=80, height_cm=180, age=30,
+                           activity_level="moderate").calories
+    with new_session_factory(new_engine(f"sqlite:///{tmp_path / 'app.db'}"))() as s:
+        # on target 3 days running up to yesterday; a low day before a gap; 40 days ago
+        for back, servings in ((1, kcal / 78), (2, kcal / 78), (3, kcal / 78), (5, 10), (40, 20)):
+            s.add(LogEntry(user_id=1, food_id=1, servings=servings,
+                           eaten_on=today - datetime.timedelta(days=back)))
+        s.commit()
+
+    week = client.get("/users/1/trends", params={"window": 7}).json()
+    assert week["start"] == (today - datetime.timedelta(days=6)).isoformat()
+    assert week["days_logged"] == 4 and week["days_on_target"] == 3
+    assert week["averages"]["calories"] == pytest.approx((3 * kcal + 780) / 4, abs=0.1)
+    assert week["adherence"]["calories"] == pytest.approx(100 * (3 * kcal + 780) / 4 / kcal, abs=0.1)
+    assert week["streaks"] == {"logging": {"current": 3, "longest": 3},
+                               "on_target": {"current": 3, "longest": 3}}
+    assert client.get("/users/1/trends", params={"window": 90}).json()["days_logged"] == 5
+    assert client.get("/users/1/trends", params={"window": 14}).status_code == 422
+    assert client.get("/users/99/trends").status_code == 404
@@ -0,0 +1,37 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.db import Base, new_engine, new_session_factory, new_async_engine, new_async_session_factory, get_async_session
+from app.main import app
+from app.models import Food, Meal, MealItem
+
+
+@pytest.fixture
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = new_engine(url)
+    Base.metadata.create_all(engine)
+    with new_session_factory(engine)() as s:
+        egg = Food(name="Egg", serving_description="1", calories=78, protein=6)
+        toast = Food(name="Toast", serving_description="1 slice", calories=80, carbs=15)
+        s.add_all([Meal(name="Eggs on toast", items=[MealItem(food=egg, servings=2),
+                                                      MealItem(food=toast, servings=1)]),
+                   Meal(name="Boiled egg", items=[MealItem(food=egg, servings=1)])])
+        s.commit()
+    AsyncTestingSession = new_async_session_factory(new_async_engine(url))
+
+    async def override_async():
+        async with AsyncTestingSession() as s:
+            yield s
+
+    app.dependency_overrides[get_async_session] = override_async
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_list_and_get_meals_with_totals(client):
+    meals = client.get("/meals").json()
+    assert [m["name"] for m in meals] == ["Boiled egg", "Eggs on toast"]
+    assert meals[1]["totals"]["calories"] == 236 and meals[1]["totals"]["protein"] == 12
+    one = client.get(f"/meals/{meals[1]['id']}").json()
+    assert one == meals[1]
+    assert client.get("/meals/999").status_code == 404
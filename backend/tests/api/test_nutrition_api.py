@@ -10,6 +10,9 @@ class FakeProvider:
         return [NutritionResult(name=f"{query}-result", calories=100, protein=5,
                                 carbs=10, fat_saturated=1, fat_unsaturated=2, sodium=0.01)]
 
+    async def asearch(self, query: str, limit: int = 5):
+        return self.search(query, limit)
+
 
 @pytest.fixture
 def client():
@@ -24,3 +27,21 @@ def test_nutrition_search(client):
     body = r.json()
     assert body[0]["name"] == "apple-result"
     assert body[0]["calories"] == 100
+
+
+def test_cache_stats_lists_cached_providers(tmp_path):
+    from app.db import Base, new_engine
+    from app.integrations.aggregate import AggregateNutritionProvider
+    from app.integrations.cache import CachedNutritionProvider
+    engine = new_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(engine)
+    cached = CachedNutritionProvider(FakeProvider(), engine, name="fake")
+    app.dependency_overrides[get_nutrition_provider] = lambda: AggregateNutritionProvider([cached])
+    try:
+        c = TestClient(app)
+        c.get("/nutrition/search", params={"q": "apple"})
+        c.get("/nutrition/search", params={"q": "apple"})
+        stats = c.get("/nutrition/cache/stats").json()
+    finally:
+        app.dependency_overrides.clear()
+    assert stats["fake"]["misses"] == 1 and stats["fake"]["memory_hits"] == 1
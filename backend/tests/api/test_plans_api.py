@@ -1,13 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
-from app.db import Base, new_engine, new_session_factory, get_session
+from app.db import (
+    Base, new_engine, new_session_factory, new_async_engine, new_async_session_factory,
+    get_session, get_async_session,
+)
 from app.main import app
 from app.models import User, Food
 
 
 @pytest.fixture
-def client():
-    engine = new_engine("sqlite://")
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = new_engine(url)
     Base.metadata.create_all(engine)
     TestingSession = new_session_factory(engine)
     with TestingSession() as s:
@@ -16,11 +20,18 @@ def client():
         s.add(Food(name="Chicken", serving_description="100g", calories=165, protein=31))
         s.commit()
 
+    AsyncTestingSession = new_async_session_factory(new_async_engine(url))
+
     def override():
         with TestingSession() as s:
             yield s
 
+    async def override_async():
+        async with AsyncTestingSession() as s:
+            yield s
+
     app.dependency_overrides[get_session] = override
+    app.dependency_overrides[get_async_session] = override_async
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -37,3 +48,30 @@ def test_generate_plan_hits_target(client):
     r2 = client.get(f"/plans/{plan_id}")
     assert r2.status_code == 200
     assert r2.json()["totals"]["calories"] == pytest.approx(2000, abs=1)
+
+
+def test_generate_week_saves_seven_plans(client):
+    r = client.post("/users/1/plans/generate-week", json={
+        "slots": [{"name": "Lunch", "food_ids": [1, 2]}, {"name": "Dinner", "food_ids": [2, 1]}],
+        "max_repeats": 7,
+    })
+    assert r.status_code == 201
+    days = r.json()
+    assert len(days) == 7
+    assert [e["name"] for e in days[0]["entries"]] == ["Lunch", "Dinner"]
+    assert client.get(f"/plans/{days[-1]['id']}").status_code == 200
+
+
+def test_generate_week_rejects_unknown_user_and_food(client):
+    slots = [{"name": "Lunch", "food_ids": [1]}]
+    assert client.post("/users/99/plans/generate-week", json={"slots": slots}).status_code == 404
+    bad = [{"name": "Lunch", "food_ids": [999]}]
+    assert client.post("/users/1/plans/generate-week", json={"slots": bad}).status_code == 400
+
+
+def test_generate_batch_endpoint(client):
+    r = client.post("/plans/generate-batch", json={"meals": 2})
+    assert r.status_code == 201
+    report = r.json()
+    assert [p["user_id"] for p in report["plans"]] == [1]
+    assert client.get(f"/plans/{report['plans'][0]['plan_id']}").status_code == 200
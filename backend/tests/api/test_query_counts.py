@@ -0,0 +1,71 @@
+"""Guards against N+1 regressions: endpoint query counts must not grow with plan/log size."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.db import (
+    Base, new_engine, new_session_factory, new_async_engine, new_async_session_factory,
+    get_async_session,
+)
+from app.main import app
+from app.models import User, Food, PlanItem
+from app.repositories import PlanRepository, LogRepository
+
+
+@pytest.fixture
+def env(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = new_engine(url)
+    Base.metadata.create_all(engine)
+    TestingSession = new_session_factory(engine)  # seeding only
+    async_engine = new_async_engine(url)
+    AsyncTestingSession = new_async_session_factory(async_engine)
+    statements = []  # what the endpoints run
+    event.listen(async_engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, *a: statements.append(stmt))
+
+    async def override():
+        async with AsyncTestingSession() as s:
+            yield s
+
+    app.dependency_overrides[get_async_session] = override
+    yield TestClient(app), TestingSession, statements
+    app.dependency_overrides.clear()
+
+
+def _seed(Session, n_foods: int) -> int:
+    with Session() as s:
+        s.add(User(name="K", age=30, sex="male", height_cm=180, weight_kg=80, activity_level="moderate"))
+        foods = [Food(name=f"Food {i}", calories=100 + i, protein=5) for i in range(n_foods)]
+        s.add_all(foods)
+        s.flush()
+        draft = [{"name": f"Meal {m}", "items": [(f, 1.0) for f in foods[m::3]]} for m in range(3)]
+        plan = PlanRepository(s).save_draft(user_id=1, name="P", draft=draft)
+        for f in foods:
+            LogRepository(s).add(user_id=1, food_id=f.id, servings=1.5)
+        s.commit()
+        return plan.id
+
+
+def _count(statements, call) -> int:
+    statements.clear()
+    assert call().status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", ["/plans/{plan_id}", "/users/1/log/today"])
+def test_rollup_query_count_is_constant(env, path):
+    client, Session, statements = env
+    plan_id = _seed(Session, n_foods=3)
+    small = _count(statements, lambda: client.get(path.format(plan_id=plan_id)))
+    with Session() as s:  # grow the same plan/log tenfold
+        foods = [Food(name=f"More {i}", calories=50) for i in range(27)]
+        s.add_all(foods)
+        s.flush()
+        entry = PlanRepository(s).get(plan_id).entries[0]
+        for f in foods:
+            entry.items.append(PlanItem(food_id=f.id, servings=1.0))
+            LogRepository(s).add(user_id=1, food_id=f.id, servings=1.0)
+        s.commit()
+    large = _count(statements, lambda: client.get(path.format(plan_id=plan_id)))
+    assert large == small
+    assert small <= 4
@@ -1,20 +1,22 @@
 import pytest
 from fastapi.testclient import TestClient
-from app.db import Base, new_engine, new_session_factory, get_session
+from app.db import (
+    Base, new_engine, new_async_engine, new_async_session_factory, get_async_session,
+)
 from app.main import app
 
 
 @pytest.fixture
-def client():
-    engine = new_engine("sqlite://")
-    Base.metadata.create_all(engine)
-    TestingSession = new_session_factory(engine)
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    Base.metadata.create_all(new_engine(url))
+    TestingSession = new_async_session_factory(new_async_engine(url))
 
-    def override():
-        with TestingSession() as s:
+    async def override():
+        async with TestingSession() as s:
             yield s
 
-    app.dependency_overrides[get_session] = override
+    app.dependency_overrides[get_async_session] = override
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -0,0 +1,73 @@
+import pytest
+from app.core.macros import FoodVector
+from app.core.planner import WeekSlot, fit_week, food_spec, week_drafts
+from app.core.targets import compute_targets
+
+NUTRIENTS = ("protein", "carbs", "fat_saturated", "fat_unsaturated", "calories", "fiber",
+             "sodium", "iron_mg", "calcium_mg", "potassium_mg", "vitamin_c_mg", "vitamin_d_ug")
+
+
+class F:
+    def __init__(self, id, **k):
+        self.id, self.name = id, k.pop("name", f"f{id}")
+        for key in NUTRIENTS:
+            setattr(self, key, k.get(key, 0.0))
+
+
+TARGETS = compute_targets(sex="male", weight_kg=80, height_cm=180, age=30, activity_level="moderate")
+chicken = F(1, protein=31, fat_unsaturated=3, calories=165, iron_mg=0.7, potassium_mg=256)
+salmon = F(2, protein=20, fat_saturated=3, fat_unsaturated=10, calories=208, vitamin_d_ug=11)
+rice = F(3, protein=2.7, carbs=28, calories=130)
+oats = F(4, protein=13, carbs=68, fat_unsaturated=6, calories=389, iron_mg=4.7)
+spinach = F(5, protein=2.9, carbs=3.6, iron_mg=2.7, calcium_mg=99, potassium_mg=558, vitamin_c_mg=28)
+oil = F(6, fat_saturated=14, fat_unsaturated=86, calories=884)
+salty = F(7, protein=25, carbs=10, sodium=2000, calories=300)
+
+
+def _slots():
+    return [WeekSlot("Breakfast", [food_spec(oats), food_spec(spinach)]),
+            WeekSlot("Lunch", [food_spec(chicken), food_spec(rice), food_spec(salty)]),
+            WeekSlot("Dinner", [food_spec(salmon), food_spec(rice), food_spec(oil, 1)])]
+
+
+def _day_total(slots, day, nutrient):
+    return sum(getattr(s.food, nutrient) * q
+               for slot, qs in zip(slots, day) for s, q in zip(slot.specs, qs))
+
+
+def test_fit_week_shape_bounds_and_macros():
+    slots = _slots()
+    week = fit_week(slots, TARGETS)
+    assert len(week) == 7
+    assert [len(qs) for qs in week[0]] == [2, 3, 3]
+    for day in week:
+        for slot, qs in zip(slots, day):
+            assert all(s.lo - 1e-6 <= q <= s.hi + 1e-6 for s, q in zip(slot.specs, qs))
+        assert _day_total(slots, day, "protein") == pytest.approx(TARGETS.protein_g, rel=0.1)
+
+
+def test_fit_week_respects_sodium_cap():
+    slots = _slots()
+    for day in fit_week(slots, TARGETS):
+        assert _day_total(slots, day, "sodium") <= TARGETS.sodium_mg_max * 1.05
+
+
+def test_fit_week_caps_repeats_per_food():
+    slots = _slots()
+    week = fit_week(slots, TARGETS, max_repeats=3)
+    for food in (chicken, salmon, rice, oats, spinach, oil, salty):
+        days_used = sum(
+            1 for day in week
+            if sum(q for slot, qs in zip(slots, day) for s, q in zip(slot.specs, qs)
+                   if s.food is food) > 0.05)
+        assert days_used <= 3
+
+
+def test_week_drafts_drops_unused_items():
+    slots = [WeekSlot("Lunch", [food_spec(chicken), food_spec(rice)])]
+    drafts = week_drafts(slots, [[[1.5, 0.0]]])
+    assert drafts == [[{"name": "Lunch", "items": [(FoodVector.of(chicken), 1.5)]}]]
+
+
+def test_fit_week_empty():
+    assert fit_week([], TARGETS, days=2) == [[], []]
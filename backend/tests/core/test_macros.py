@@ -33,3 +33,34 @@ def test_sum_macros():
     ])
     assert total.calories == 300
     assert total.protein == 15
+
+
+def test_macro_matrix_scale_and_sum_matches_per_item():
+    from app.core.macros import MacroMatrix, to_macros, to_micros
+    egg = FakeFood(calories=78, protein=6, fat_saturated=1.6, fat_unsaturated=3.7)
+    egg.id, egg.iron_mg = 1, 0.9
+    rice = FakeFood(calories=130, protein=2.7, carbs=28, fiber=0.4)
+    rice.id = 2  # no micro attributes at all -> treated as 0
+    matrix = MacroMatrix([egg, rice, egg])
+    assert len(matrix) == 2
+    totals = matrix.scale_and_sum([1, 2, 1], [2, 1.5, 1])
+    expected = sum_macros([scale_food(egg, 2), scale_food(rice, 1.5), scale_food(egg, 1)])
+    assert vars(to_macros(totals)) == pytest.approx(vars(expected))
+    assert to_micros(totals)["iron_mg"] == pytest.approx(2.7)
+    assert matrix.scale([2], [2])[0, 0] == pytest.approx(260)
+
+
+def test_macro_matrix_empty_rollup():
+    from app.core.macros import MacroMatrix, to_macros
+    assert to_macros(MacroMatrix([]).scale_and_sum([], [])) == Macros()
+
+
+def test_food_vector_matches_source_food():
+    from app.core.macros import FoodVector, nutrient_matrix
+    egg = FakeFood(calories=78, protein=6, fat_saturated=1.6, fat_unsaturated=3.7)
+    egg.id, egg.name, egg.iron_mg = 1, "Egg", 0.9
+    v = FoodVector.of(egg)
+    assert (v.id, v.name, v.fiber, v.fat_total) == (1, "Egg", 0.0, pytest.approx(5.3))
+    assert FoodVector.of(v) is v
+    assert not hasattr(v, "__dict__")
+    assert nutrient_matrix([v]).tolist() == nutrient_matrix([egg]).tolist()
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from scipy.optimize import lsq_linear
+from app.core.planner import ItemSpec, food_spec
+from app.core.solver import ServingsSolver, macro_vector
+
+
+class F:
+    def __init__(self, id, protein=0.0, carbs=0.0, fat_unsaturated=0.0):
+        self.id, self.protein, self.carbs = id, protein, carbs
+        self.fat_saturated, self.fat_unsaturated = 0.0, fat_unsaturated
+
+
+CHICKEN = F(1, protein=31, fat_unsaturated=3)
+RICE = F(2, protein=2.7, carbs=28, fat_unsaturated=0.3)
+OIL = F(3, fat_unsaturated=14)
+OATS = F(4, protein=5, carbs=27, fat_unsaturated=3)
+BEANS = F(5, protein=8, carbs=20, fat_unsaturated=0.5)
+
+
+def _residual(specs, x, p, c, f, w=1.5):
+    A = np.array([macro_vector(s.food) for s in specs]).T
+    A[0] *= w
+    return float(np.linalg.norm(A @ np.asarray(x) - np.array([w * p, c, f])))
+
+
+def _cold(specs, p, c, f, w=1.5):
+    A = np.array([macro_vector(s.food) for s in specs]).T
+    A[0] *= w
+    lo = np.array([s.lo for s in specs])
+    hi = np.array([s.hi for s in specs])
+    return lsq_linear(A, np.array([w * p, c, f]), bounds=(lo, hi)).x
+
+
+def test_closed_form_then_memo():
+    solver = ServingsSolver()
+    specs = [food_spec(CHICKEN, 8), food_spec(RICE, 8), food_spec(OIL, 5)]
+    x = solver.fit(specs, 120, 140, 50)
+    assert solver.stats.closed_form == 1
+    assert _residual(specs, x, 120, 140, 50) == pytest.approx(0, abs=1e-6)
+    assert solver.fit(specs, 120.1, 140, 50) == x      # within the target tolerance
+    assert solver.stats.memo_hits == 1
+
+
+def test_warm_start_and_fallback_are_optimal():
+    solver = ServingsSolver()
+    # tight upper bounds push the closed-form point (nearest the lower bounds) out of the box
+    specs = [ItemSpec(CHICKEN, 0, 3), ItemSpec(RICE, 0, 2), ItemSpec(OIL, 0, 2), ItemSpec(OATS, 0, 4)]
+    first = solver.fit(specs, 110, 150, 45)
+    assert solver.stats.cold_solves == 1
+    # refined targets: the correction from the previous plan stays inside the box
+    second = solver.fit(specs, 112, 150, 45)
+    assert solver.stats.warm_starts == 1 and solver.stats.cold_solves == 1
+    assert solver.stats.closed_form == 0
+    for x, targets in ((first, (110, 150, 45)), (second, (112, 150, 45))):
+        assert all(sp.lo - 1e-9 <= v <= sp.hi + 1e-9 for sp, v in zip(specs, x))
+        assert _residual(specs, x, *targets) <= _residual(specs, _cold(specs, *targets), *targets) + 1e-6
+
+
+def test_one_swapped_item_is_still_optimal():
+    solver = ServingsSolver()
+    specs = [ItemSpec(CHICKEN, 0, 3), ItemSpec(RICE, 0, 4), ItemSpec(OIL, 0, 2), ItemSpec(OATS, 1, 2)]
+    solver.fit(specs, 110, 150, 45)
+    swapped = specs[:3] + [ItemSpec(BEANS, 1, 2)]          # one item replaced
+    x = solver.fit(swapped, 110, 150, 45)
+    assert all(sp.lo - 1e-9 <= v <= sp.hi + 1e-9 for sp, v in zip(swapped, x))
+    assert _residual(swapped, x, 110, 150, 45) <= _residual(
+        swapped, _cold(swapped, 110, 150, 45), 110, 150, 45) + 1e-6
+
+
+def test_edited_food_is_not_served_from_memo():
+    solver = ServingsSolver()
+    food = F(9, protein=20, carbs=10, fat_unsaturated=5)
+    before = solver.fit([food_spec(food), food_spec(RICE), food_spec(OIL)], 100, 100, 40)
+    food.protein = 40
+    assert solver.fit([food_spec(food), food_spec(RICE), food_spec(OIL)], 100, 100, 40) != before
+    assert solver.stats.memo_hits == 0
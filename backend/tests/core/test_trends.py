@@ -0,0 +1,40 @@
+import datetime
+from app.core.targets import NutritionTargets
+from app.core.trends import streak, summarize
+
+TARGETS = NutritionTargets(calories=2000, protein_g=150, carb_g=200, fat_g=70, fiber_g=28,
+                           sodium_mg_max=2300, sat_fat_g_max=22, sugar_g_max=50, iron_mg=8,
+                           calcium_mg=1000, potassium_mg=3400, vitamin_c_mg=90, vitamin_d_ug=15)
+
+
+def test_streak_counts_today_or_the_run_ending_yesterday():
+    assert streak([True, True, False, True, True, True]).__dict__ == {"current": 3, "longest": 3}
+    assert streak([True, True, True, False, True, False]).__dict__ == {"current": 1, "longest": 3}
+    assert streak([True, False, False]).__dict__ == {"current": 0, "longest": 1}
+    assert streak([]).__dict__ == {"current": 0, "longest": 0}
+
+
+def _day(day, calories, protein=0.0):
+    return {"day": day, "entries": 1, "calories": calories, "protein": protein, "carbs": 0.0,
+            "fat_saturated": 5.0, "fat_unsaturated": 10.0, "fiber": 0.0, "sodium": 0.0,
+            "iron_mg": 0.0, "calcium_mg": 0.0, "potassium_mg": 0.0, "vitamin_c_mg": 0.0,
+            "vitamin_d_ug": None}
+
+
+def test_summarize_averages_logged_days_only():
+    end = datetime.date(2026, 3, 10)
+    start = end - datetime.timedelta(days=6)
+    rows = [_day(end - datetime.timedelta(days=2), 2100, 120), _day(end, 1500, 180)]
+    out = summarize(rows, TARGETS, start, end)
+    assert out["days_logged"] == 2
+    assert out["averages"]["calories"] == 1800 and out["averages"]["fat_total"] == 15
+    assert out["adherence"]["calories"] == 90 and out["adherence"]["protein"] == 100
+    assert out["days_on_target"] == 1  # 2100 within ±10%, 1500 is not
+    assert out["streaks"]["logging"] == {"current": 1, "longest": 1}
+    assert out["streaks"]["on_target"] == {"current": 0, "longest": 1}
+
+
+def test_summarize_empty_window():
+    day = datetime.date(2026, 3, 10)
+    out = summarize([], TARGETS, day, day)
+    assert out["days_logged"] == 0 and out["adherence"]["calories"] == 0.0
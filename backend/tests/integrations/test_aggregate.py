@@ -0,0 +1,75 @@
+import asyncio
+import httpx
+import pytest
+from app.integrations.aggregate import AggregateNutritionProvider, merge_results
+from app.integrations.http import ClientRegistry, clients
+from app.integrations.nutrition import NutritionResult
+from app.integrations.openfoodfacts import OpenFoodFactsProvider
+from app.integrations.usda import USDAProvider
+from tests.integrations.test_openfoodfacts import OFF_RESPONSE
+from tests.integrations.test_usda import FDC
+
+
+def _routes(**handlers) -> ClientRegistry:
+    """A registry with the real provider configs whose clients hit MockTransports."""
+    reg = ClientRegistry(transport=lambda name: httpx.MockTransport(handlers[name]))
+    for name in ("openfoodfacts", "usda"):
+        reg.register(name, clients.config(name))
+    return reg
+
+
+def _providers(reg: ClientRegistry):
+    return [OpenFoodFactsProvider(registry=reg), USDAProvider(api_key="k", registry=reg)]
+
+
+def _r(name: str, brand: str = "") -> NutritionResult:
+    return NutritionResult(name=name, brand=brand, calories=100)
+
+
+def test_merge_interleaves_and_dedups_on_name_and_brand():
+    off = [_r("Greek Yogurt", "Total"), _r("Oats")]
+    usda = [_r("greek  yogurt", "total"), _r("Chicken Breast"), _r("Rice")]
+    names = [r.name for r in merge_results([off, usda], limit=10)]
+    assert names == ["Greek Yogurt", "Oats", "Chicken Breast", "Rice"]
+    assert len(merge_results([off, usda], limit=2)) == 2
+
+
+def test_registry_reuses_one_client_per_provider():
+    reg = _routes(openfoodfacts=lambda req: httpx.Response(200, json=OFF_RESPONSE),
+                  usda=lambda req: httpx.Response(200, json=FDC))
+    assert reg.client("usda") is reg.client("usda")
+    assert reg.client("usda") is not reg.client("openfoodfacts")
+    assert str(reg.client("usda").base_url).startswith(USDAProvider.BASE)
+    reg.close()
+    with pytest.raises(KeyError):
+        reg.client("nope")
+
+
+def test_search_fans_out_to_both_providers():
+    reg = _routes(openfoodfacts=lambda req: httpx.Response(200, json=OFF_RESPONSE),
+                  usda=lambda req: httpx.Response(200, json=FDC))
+    results = AggregateNutritionProvider(_providers(reg)).search("x", limit=5)
+    assert [r.source for r in results] == ["openfoodfacts", "usda"]
+
+
+def test_a_failing_provider_contributes_nothing():
+    reg = _routes(openfoodfacts=lambda req: httpx.Response(500),
+                  usda=lambda req: httpx.Response(200, json=FDC))
+    results = AggregateNutritionProvider(_providers(reg)).search("chicken")
+    assert [r.source for r in results] == ["usda"]
+
+
+def test_asearch_drops_providers_past_the_deadline():
+    async def slow(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json=FDC)
+
+    reg = _routes(openfoodfacts=lambda req: httpx.Response(200, json=OFF_RESPONSE), usda=slow)
+
+    async def run():
+        try:
+            return await AggregateNutritionProvider(_providers(reg), deadline_s=0.1).asearch("x")
+        finally:
+            await reg.aclose()
+
+    assert [r.source for r in asyncio.run(run())] == ["openfoodfacts"]
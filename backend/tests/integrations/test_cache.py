@@ -0,0 +1,146 @@
+import asyncio
+import time
+import pytest
+from app.db import Base, new_engine
+from app.integrations.cache import CachedNutritionProvider
+from app.integrations.nutrition import NutritionResult
+
+
+class CountingProvider:
+    name = "fake"
+
+    def __init__(self, results=None):
+        self.calls = 0
+        self.results = [NutritionResult(name="Tofu", calories=76)] if results is None else results
+
+    def search(self, query: str, limit: int = 5):
+        self.calls += 1
+        return list(self.results)
+
+    async def asearch(self, query: str, limit: int = 5):
+        return self.search(query, limit)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = new_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _cached(engine, provider, clock, **kw):
+    kw = {"ttl_s": 100, "negative_ttl_s": 10, "stale_s": 50, **kw}
+    return CachedNutritionProvider(provider, engine, clock=clock, **kw)
+
+
+def _wait_for(cond):
+    deadline = time.monotonic() + 2
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cond()
+
+
+def test_repeat_queries_hit_memory_then_disk(engine):
+    provider, clock = CountingProvider(), Clock()
+    cache = _cached(engine, provider, clock)
+    assert cache.search("Tofu")[0].name == "Tofu"
+    assert cache.search("  tofu ")[0].name == "Tofu"  # normalized to the same key
+    # a new process (empty LRU) is served from the table
+    other = _cached(engine, provider, clock)
+    assert other.search("tofu")[0].name == "Tofu"
+    assert provider.calls == 1
+    assert cache.stats.memory_hits == 1 and other.stats.disk_hits == 1
+    assert cache.stats.as_dict()["hit_rate"] == 0.5
+
+
+def test_limit_is_part_of_the_key(engine):
+    provider = CountingProvider()
+    cache = _cached(engine, provider, Clock())
+    cache.search("tofu", limit=5)
+    cache.search("tofu", limit=10)
+    assert provider.calls == 2
+
+
+def test_empty_answers_expire_on_the_negative_ttl(engine):
+    provider, clock = CountingProvider(results=[]), Clock()
+    cache = _cached(engine, provider, clock, stale_s=0)
+    assert cache.search("nothing") == []
+    assert cache.search("nothing") == []
+    assert provider.calls == 1 and cache.stats.negative_hits == 1
+    clock.now += 11
+    cache.search("nothing")
+    assert provider.calls == 2
+
+
+def test_stale_answers_are_served_while_one_refresh_runs(engine):
+    provider, clock = CountingProvider(), Clock()
+    cache = _cached(engine, provider, clock)
+    cache.search("tofu")
+    provider.results = [NutritionResult(name="Silken Tofu", calories=55)]
+    clock.now += 120  # past ttl, inside the stale window
+    assert cache.search("tofu")[0].name == "Tofu"
+    _wait_for(lambda: provider.calls == 2 and not cache._refreshing)
+    assert cache.search("tofu")[0].name == "Silken Tofu"
+    assert cache.stats.stale_hits == 1 and cache.stats.refreshes == 1
+    clock.now += 1000  # past the stale window: a plain miss
+    cache.search("tofu")
+    assert provider.calls == 3
+
+
+def test_async_stale_refresh(engine):
+    provider, clock = CountingProvider(), Clock()
+    cache = _cached(engine, provider, clock)
+
+    async def run():
+        await cache.asearch("tofu")
+        clock.now += 120
+        stale = await cache.asearch("tofu")
+        await asyncio.gather(*cache._tasks)
+        return stale
+
+    assert asyncio.run(run())[0].name == "Tofu"
+    assert provider.calls == 2
+
+
+def test_both_tiers_are_size_bounded(engine):
+    provider, clock = CountingProvider(), Clock()
+    cache = _cached(engine, provider, clock, memory_size=2, max_rows=3)
+    for i in range(5):
+        clock.now += 1
+        cache.search(f"q{i}")
+    m = cache.metrics()
+    assert m["memory_entries"] == 2 and m["stored_entries"] == 3
+
+
+def test_async_lookups_do_not_block_the_loop(engine):
+    from sqlalchemy import event
+    cache = _cached(engine, CountingProvider(), Clock())
+    cache.search("tofu")
+    cache._memory.clear()  # the next lookup goes to the table
+    event.listen(engine, "before_cursor_execute", lambda *a: time.sleep(0.2))  # a slow disk
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        results = await cache.asearch("tofu")
+        t.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+    assert results[0].name == "Tofu" and cache.stats.disk_hits == 1
+    assert ticks >= 5  # the loop kept running while the lookup waited on the table
@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 from app.integrations.openfoodfacts import OpenFoodFactsProvider
 
@@ -43,3 +44,12 @@ def test_search_skips_products_without_calories():
     resp = {"products": [{"product_name": "No Macros", "nutriments": {}}]}
     p = _provider_with(resp)
     assert p.search("x") == []
+
+
+def test_asearch_uses_the_async_client():
+    async_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=OFF_RESPONSE)),
+        base_url=OpenFoodFactsProvider.BASE)
+    p = OpenFoodFactsProvider(async_client=async_client)
+    results = asyncio.run(p.asearch("yogurt", limit=3))
+    assert [r.name for r in results] == ["Greek Yogurt"]
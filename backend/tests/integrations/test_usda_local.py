@@ -0,0 +1,90 @@
+import asyncio
+import io
+import json
+import zipfile
+import pytest
+from app.db import Base, new_engine
+from app.integrations.usda import USDAProvider
+from app.integrations.usda_local import LocalUSDAIndex, import_dump, iter_json_array
+
+
+def _food(fdc_id, description, data_type="SR Legacy", kcal=100, protein=10):
+    return {"fdcId": fdc_id, "description": description, "dataType": data_type, "foodNutrients": [
+        {"nutrient": {"number": "208", "name": "Energy"}, "amount": kcal},
+        {"nutrient": {"number": "203", "name": "Protein"}, "amount": protein},
+        {"nutrient": {"number": "204"}, "amount": 3.6}, {"nutrient": {"number": "606"}, "amount": 1.0},
+        {"type": "FoodNutrient"},  # entries without a nutrient are skipped
+    ]}
+
+
+DUMP = {"SRLegacyFoods": [
+    _food(1, "Chicken, broiler or fryers, breast, skinless, boneless, meat only, raw", kcal=120, protein=22.5),
+    _food(2, "Chicken breast, roll, oven-roasted"),
+    _food(3, "Rice, brown, long-grain, cooked"),
+    _food(4, "Rice, white, long-grain, cooked"),
+    _food(5, "Soup, chicken noodle", data_type="Survey (FNDDS)"),
+]}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = new_engine(f"sqlite:///{tmp_path / 'usda.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_iter_json_array_decodes_across_chunk_boundaries():
+    fp = io.StringIO(json.dumps(DUMP, indent=1))
+    assert [f["fdcId"] for f in iter_json_array(fp, chunk_size=7)] == [1, 2, 3, 4, 5]
+    assert list(iter_json_array(io.StringIO('{"FoundationFoods": []}'))) == []
+
+
+def test_import_filters_data_types_and_is_idempotent(tmp_path, engine):
+    path = tmp_path / "sr_legacy.json"
+    path.write_text(json.dumps(DUMP))
+    assert import_dump(engine, path, batch_size=2) == 4
+    assert import_dump(engine, path) == 4
+    assert LocalUSDAIndex(engine).count() == 4
+
+
+def test_import_reads_zipped_dumps(tmp_path, engine):
+    path = tmp_path / "FoodData_Central_sr_legacy_food_json.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("FoodData_Central_sr_legacy_food_json.json", json.dumps(DUMP))
+    assert import_dump(engine, path) == 4
+
+
+def test_local_search_matches_every_word_noun_first(tmp_path, engine):
+    path = tmp_path / "sr_legacy.json"
+    path.write_text(json.dumps(DUMP))
+    import_dump(engine, path)
+    index = LocalUSDAIndex(engine)
+    hits = index.search("chicken breast")
+    assert [h.source_id for h in hits] == ["2", "1"]
+    assert hits[1].calories == 120 and hits[1].protein == 22.5 and hits[1].source == "usda"
+    assert [h.name for h in index.search("rice brown")] == ["Rice, Brown, Long-Grain, Cooked"]
+    assert index.search("chicken", data_types=("Foundation",)) == []
+
+
+def test_provider_local_mode_never_touches_the_network(tmp_path, engine):
+    path = tmp_path / "sr_legacy.json"
+    path.write_text(json.dumps(DUMP))
+    import_dump(engine, path)
+    p = USDAProvider(mode="local", local=LocalUSDAIndex(engine))
+    assert p.search("rice", limit=1)[0].source_id in ("3", "4")
+    assert len(asyncio.run(p.asearch("rice"))) == 2
+    with pytest.raises(ValueError):
+        USDAProvider(mode="offline")
+
+
+def test_provider_local_asearch_runs_off_the_event_loop():
+    import threading
+
+    class Index:
+        def search(self, query, limit, data_types):
+            self.thread = threading.get_ident()
+            return []
+
+    index = Index()
+    assert asyncio.run(USDAProvider(mode="local", local=index).asearch("rice")) == []
+    assert index.thread != threading.get_ident()
@@ -27,3 +27,64 @@ def test_migrate_loads_foods_and_is_idempotent(session):
     migrate(session, str(FOODS_XLSX), str(MEALS_XLSX))
     session.commit()
     assert len(FoodRepository(session).list_all()) == count
+
+
+def _sheet(path, header, rows):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(header)
+    for r in rows:
+        ws.append(r)
+    wb.save(path)
+    return str(path)
+
+
+FOOD_HEADER = ["Name", "Label", "Measurement", "Calories", "Protein", "Carbs",
+               "Fat_Saturated", "Fat_Regular", "Sodium"]
+
+
+def test_bulk_migrate_dedups_and_links_meal_items(session, tmp_path):
+    from app.models import Food, Meal, MealItem
+    session.add(Food(name="Oats", brand="Brown", calories=375))
+    session.flush()
+    foods = _sheet(tmp_path / "foods.xlsx", FOOD_HEADER, [
+        ["oats ", "brown", "100g", 375, 11, 69, 1, 8, 0],      # already in the DB
+        ["Egg", None, "1 large", 70, 6, 0, 1.5, 3.5, 70],
+        ["EGG", "", "1 large", 70, 6, 0, 1.5, 3.5, 70],        # repeated in the file
+        [None, None, None, None, None, None, None, None, None],
+        ["Milk", "2%", "250ml", 120, 8, 12, 3, 2, 100],
+    ])
+    meals = _sheet(tmp_path / "meals.xlsx", ["Meal_Name", "Food_Name", "Label"], [
+        ["Breakfast", "1.5x Oats", "Brown"],
+        ["Breakfast", "2x Egg", None],
+        ["Breakfast", "1x Unknown", ""],
+        ["Breakfast", "Total", ""],
+        ["Snack", "1x Milk", "2%"],
+    ])
+    report = migrate(session, foods, meals)
+    session.commit()
+    assert report == {"foods_added": 2, "meals_added": 2, "meal_items_added": 3,
+                      "skipped": 1, "rows_read": 9}
+    breakfast = session.query(Meal).filter_by(name="Breakfast").one()
+    assert sorted((i.food.name, i.servings) for i in breakfast.items) == [("Egg", 2.0), ("Oats", 1.5)]
+    assert migrate(session, foods, meals)["foods_added"] == 0
+    session.commit()
+    assert session.query(Meal).count() == 2 and session.query(MealItem).count() == 3
+
+
+def test_migrate_is_idempotent_for_non_ascii_names(session, tmp_path):
+    from app.models import Food, Meal
+    foods = _sheet(tmp_path / "foods.xlsx", FOOD_HEADER, [
+        ["Φέτα", "Δωδώνη", "30g", 80, 5, 0, 4, 2, 300],
+    ])
+    meals = _sheet(tmp_path / "meals.xlsx", ["Meal_Name", "Food_Name", "Label"], [
+        ["Πρωινό", "1x Φέτα", "Δωδώνη"],
+    ])
+    assert migrate(session, foods, meals)["meals_added"] == 1
+    session.commit()
+    # SQLite's lower() leaves Greek capitals alone; a rerun must still see both rows
+    assert migrate(session, foods, meals) | {"rows_read": 0} == {
+        "foods_added": 0, "meals_added": 0, "meal_items_added": 0, "skipped": 0, "rows_read": 0}
+    session.commit()
+    assert session.query(Food).count() == 1 and session.query(Meal).count() == 1
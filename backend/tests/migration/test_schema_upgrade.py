@@ -25,3 +25,37 @@ def test_ensure_columns_idempotent_on_old_table():
     with engine.begin() as c:
         cols = {r[1] for r in c.execute(text("PRAGMA table_info(foods)"))}
     assert {"iron_mg", "calcium_mg", "potassium_mg", "vitamin_c_mg", "vitamin_d_ug", "sugar_g"} <= cols
+
+
+def test_ensure_search_index_backfills_existing_foods():
+    from app.migration.schema_upgrade import ensure_food_search_index
+    from app.repositories import FoodRepository
+    engine = new_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as c:  # simulate a DB from before the index existed
+        c.execute(text("DROP TABLE foods_fts"))
+        for trig in ("foods_fts_ai", "foods_fts_ad", "foods_fts_au"):
+            c.execute(text(f"DROP TRIGGER {trig}"))
+        c.execute(text("INSERT INTO foods (name, brand, serving_description, source, calories,"
+                       " protein, carbs, fat_saturated, fat_unsaturated, sodium)"
+                       " VALUES ('Greek Yogurt', '', '100g', 'manual', 59, 10, 4, 0, 0, 0)"))
+    ensure_food_search_index(engine)
+    ensure_food_search_index(engine)  # idempotent
+    with new_session_factory(engine)() as s:
+        assert [f.name for f in FoodRepository(s).search("yogurt")] == ["Greek Yogurt"]
+
+
+def test_ensure_indexes_on_old_db():
+    from app.migration.schema_upgrade import ensure_indexes
+    engine = new_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as c:  # simulate a DB from before the indexes existed
+        for ix in ("ix_foods_lower_name_brand", "ix_meals_lower_name", "ix_users_lower_name",
+                   "ix_meal_items_meal_id", "ix_meal_items_food_id"):
+            c.execute(text(f"DROP INDEX {ix}"))
+    ensure_indexes(engine)
+    ensure_indexes(engine)  # idempotent
+    with engine.begin() as c:
+        names = {r[0] for r in c.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    assert {"ix_foods_lower_name_brand", "ix_meals_lower_name", "ix_users_lower_name",
+            "ix_meal_items_meal_id", "ix_meal_items_food_id"} <= names
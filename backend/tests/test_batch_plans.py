@@ -0,0 +1,56 @@
+import pytest
+from app.db import Base, new_engine, new_session_factory
+from app.models import User, Food
+from app.repositories import PlanRepository
+from app.batch.plans import generate_batch, load_catalog
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = new_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    Base.metadata.create_all(engine)
+    with new_session_factory(engine)() as s:
+        for name in ("A", "B", "C"):
+            s.add(User(name=name, age=30, sex="male", height_cm=180, weight_kg=80,
+                       activity_level="moderate"))
+        s.add(Food(name="Rice", calories=130))
+        s.add(Food(name="Chicken", calories=165))
+        s.add(Food(name="Water", calories=0))
+        s.commit()
+        yield s
+
+
+def test_load_catalog_is_compact_and_ordered(session):
+    catalog = load_catalog(session)
+    assert catalog.dtype.names == ("id", "calories")
+    assert catalog["calories"].tolist() == [165, 130, 0]  # by name: Chicken, Rice, Water
+
+
+def test_generate_batch_saves_a_plan_per_user(session):
+    report = generate_batch(session, meals=2, foods_per_meal=2)
+    session.commit()
+    assert report["failed"] == []
+    assert [r["user_id"] for r in report["plans"]] == [1, 2, 3]
+    assert all(r["solve_s"] >= 0 for r in report["plans"])
+    plan = PlanRepository(session).get(report["plans"][0]["plan_id"])
+    assert plan.user_id == 1 and len(plan.entries) == 2
+    total = sum(it.food.calories * it.servings for e in plan.entries for it in e.items)
+    assert total == pytest.approx(2759, abs=1)  # user's target calories
+
+
+def test_generate_batch_reports_unplannable_users(session):
+    session.query(Food).filter(Food.calories > 0).delete()
+    session.commit()
+    report = generate_batch(session, user_ids=[2])
+    assert report["plans"] == []
+    assert report["failed"][0]["user_id"] == 2
+
+
+@pytest.mark.parametrize("meals,foods_per_meal", [(1, 1), (2, 2), (3, 2)])
+def test_candidates_plan_like_the_whole_catalog(session, meals, foods_per_meal):
+    from app.batch.plans import CatalogFood, _candidates
+    from app.core.planner import build_day_plan
+    catalog = load_catalog(session)
+    full = [CatalogFood(int(i), float(c)) for i, c in catalog.tolist()]
+    assert (build_day_plan(2000, _candidates(catalog, meals, foods_per_meal), meals, foods_per_meal)
+            == build_day_plan(2000, full, meals, foods_per_meal))
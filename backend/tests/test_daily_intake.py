@@ -0,0 +1,66 @@
+import datetime
+import pytest
+from sqlalchemy import insert, update
+from app.db import Base, new_engine, new_session_factory
+from app.models import DailyIntake, Food, LogEntry, User
+from app.repositories import LogRepository
+from app.rollups import refresh_daily_intake
+
+DAY = datetime.date(2026, 3, 1)
+
+
+@pytest.fixture
+def session():
+    engine = new_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with new_session_factory(engine)() as s:
+        s.add(User(name="K", age=30, sex="male", height_cm=180, weight_kg=80, activity_level="moderate"))
+        s.add_all([Food(name="Egg", calories=78, protein=6), Food(name="Rice", calories=200, carbs=45)])
+        s.commit()
+        yield s
+
+
+def _days(session) -> dict:
+    return {r["day"]: (r["entries"], r["calories"])
+            for r in LogRepository(session).daily_intake(1, datetime.date(2000, 1, 1), datetime.date(2100, 1, 1))}
+
+
+def _scan(session) -> dict:
+    """The rollup recomputed by scanning the log — what it must always equal."""
+    return {r["period"]: (r["entries"], r["calories"]) for r in LogRepository(session).totals_for_range(
+        1, datetime.date(2000, 1, 1), datetime.date(2100, 1, 1))}
+
+
+def test_add_increments_the_day(session):
+    logs = LogRepository(session)
+    logs.add(user_id=1, food_id=1, servings=2)
+    logs.add(user_id=1, food_id=2, servings=1)
+    session.commit()
+    logs.add(user_id=1, food_id=1, servings=1)
+    session.commit()
+    assert _days(session) == {datetime.date.today(): (3, 78 * 3 + 200)}
+
+
+def test_edits_deletes_and_food_changes_recompute(session):
+    entries = [LogEntry(user_id=1, food_id=1, servings=1, eaten_on=DAY) for _ in range(3)]
+    session.add_all(entries)
+    session.commit()
+    entries[0].eaten_on = DAY + datetime.timedelta(days=1)   # moved to another day
+    entries[1].servings = 2
+    session.commit()
+    session.delete(entries[2])
+    session.get(Food, 1).calories = 100                       # food edit
+    session.commit()
+    assert _days(session) == {DAY: (1, 200), DAY + datetime.timedelta(days=1): (1, 100)}
+    assert {datetime.date.fromisoformat(k): v for k, v in _scan(session).items()} == _days(session)
+
+
+def test_bulk_statements_and_backfill(session):
+    session.execute(insert(LogEntry), [{"user_id": 1, "food_id": 2, "servings": 1.0, "eaten_on": DAY},
+                                       {"user_id": 1, "food_id": 2, "servings": 0.5, "eaten_on": DAY}])
+    assert _days(session) == {DAY: (2, 300)}
+    session.execute(update(Food), [{"id": 2, "calories": 100.0}])
+    assert _days(session) == {DAY: (2, 150)}
+    session.execute(DailyIntake.__table__.delete())  # e.g. a DB from before daily_intake
+    refresh_daily_intake(session.connection())
+    assert _days(session) == {DAY: (2, 150)}
@@ -1,5 +1,10 @@
+import asyncio
 from sqlalchemy import text
-from app.db import Base, new_engine, new_session_factory
+from app.db import (
+    Base, async_url, new_engine, new_session_factory, new_async_engine, new_async_session_factory,
+)
+from app.models import User
+from app.repositories import AsyncUserRepository
 
 
 def test_create_all_and_session_roundtrip():
@@ -8,3 +13,27 @@ def test_create_all_and_session_roundtrip():
     Session = new_session_factory(engine)
     with Session() as s:
         assert s.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_async_url_maps_to_async_drivers():
+    assert async_url("sqlite:///./fitness.db") == "sqlite+aiosqlite:///./fitness.db"
+    assert async_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+
+def test_async_session_sees_sync_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = new_engine(url)
+    Base.metadata.create_all(engine)
+    with new_session_factory(engine)() as s:
+        s.add(User(name="K", age=30, sex="male", height_cm=180, weight_kg=80,
+                   activity_level="moderate"))
+        s.commit()
+
+    async def fetch():
+        async_engine = new_async_engine(url)
+        async with new_async_session_factory(async_engine)() as s:
+            user = await AsyncUserRepository(s).find_by_name("k")
+        await async_engine.dispose()
+        return user
+
+    assert asyncio.run(fetch()).name == "K"
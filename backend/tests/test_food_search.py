@@ -30,3 +30,42 @@ def test_search_matches_reordered_usda_names(session):
     # natural multi-word queries must match the reordered "Noun, modifier" names
     assert [f.name for f in repo.search("brown rice")] == ["Rice, Brown, Parboiled, Cooked"]
     assert [f.name for f in repo.search("greek yogurt")] == ["Yogurt, Greek, Plain, Nonfat"]
+
+
+def test_search_ranks_exact_then_prefix_then_token(session):
+    repo = FoodRepository(session)
+    repo.add(Food(name="Rice, Brown, Cooked", calories=120))
+    repo.add(Food(name="Brown Rice Cakes", calories=390))
+    repo.add(Food(name="Brown Rice", brand="Zeta", calories=130))
+    repo.add(Food(name="Brown Rice", brand="Acme", calories=130))
+    session.commit()
+    hits = [(f.name, f.brand) for f in repo.search("brown rice")]
+    assert hits == [("Brown Rice", "Acme"), ("Brown Rice", "Zeta"),
+                    ("Brown Rice Cakes", ""), ("Rice, Brown, Cooked", "")]
+
+
+def test_search_index_follows_inserts_and_renames(session):
+    repo = FoodRepository(session)
+    f = repo.add(Food(name="Oats", calories=375))
+    session.commit()
+    assert [x.name for x in repo.search("oat")] == ["Oats"]
+    f.name = "Granola"
+    session.commit()
+    assert repo.search("oats") == []
+    assert [x.name for x in repo.search("gran")] == ["Granola"]
+    session.delete(f)
+    session.commit()
+    assert repo.search("gran") == []
+
+
+def test_search_index_probe_runs_once_per_engine(session):
+    from sqlalchemy import event
+    repo = FoodRepository(session)
+    repo.add(Food(name="Oats", calories=375))
+    session.commit()
+    repo.search("oat")  # first search probes sqlite_master
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, sql, *a: statements.append(sql))
+    assert [x.name for x in FoodRepository(session).search("oat")] == ["Oats"]
+    assert len(statements) == 1 and "sqlite_master" not in statements[0]
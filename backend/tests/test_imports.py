@@ -0,0 +1,35 @@
+"""Import budget of app.main: the agent and solver stacks must stay lazy."""
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+# loaded on first use of the coach / planner, never by `import app.main`
+LAZY = ("langchain", "langchain_core", "langgraph", "scipy")
+# app.main's own import cost (frameworks already loaded), as a multiple of FastAPI +
+# SQLAlchemy's in the same run so machine load cancels out: ~0.6 lazy, ~2.7 eager
+IMPORT_BUDGET = 1.2
+FRAMEWORKS = ("fastapi", "sqlalchemy.ext.asyncio", "sqlalchemy.orm")
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=BACKEND, capture_output=True,
+                          text=True, check=True)
+
+
+def test_app_main_does_not_import_heavy_stacks():
+    out = _run("-c", "import sys, json, app.main; print(json.dumps(sorted(sys.modules)))").stdout
+    loaded = {m.split(".")[0] for m in json.loads(out)}
+    assert not loaded & set(LAZY)
+
+
+def test_app_main_import_time_within_budget():
+    code = f"import {', '.join(FRAMEWORKS)}; import app.main"
+    err = _run("-X", "importtime", "-c", code).stderr
+    # top-level entries only: everything before app.main is the frameworks (plus startup)
+    top = [(m[2], int(m[1])) for m in re.finditer(r"\|\s*(\d+) \| (\S+)$", err, re.M)]
+    i = [name for name, _ in top].index("app.main")
+    ratio = top[i][1] / sum(us for _, us in top[:i])
+    assert ratio < IMPORT_BUDGET, f"import app.main costs {ratio:.2f}x the frameworks"
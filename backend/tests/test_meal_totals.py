@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import delete, insert, select, update
+from app.db import Base, new_engine, new_session_factory
+from app.models import Food, Meal, MealItem, MealTotals
+from app.rollups import refresh_meal_totals
+from app.repositories import MealRepository
+
+
+@pytest.fixture
+def session():
+    engine = new_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with new_session_factory(engine)() as s:
+        s.add_all([Food(name="Oats", calories=375, protein=11, iron_mg=4.0),
+                   Food(name="Milk", calories=60, protein=3)])
+        s.commit()
+        yield s
+
+
+def _totals(session, name: str):
+    return MealRepository(session).get_vectors([session.scalar(select(Meal.id).where(Meal.name == name))])
+
+
+def _walk(meal: Meal) -> tuple[float, float, float]:
+    return tuple(sum((getattr(it.food, n) or 0) * it.servings for it in meal.items)
+                 for n in ("calories", "protein", "iron_mg"))
+
+
+def test_totals_follow_items_and_food_edits(session):
+    oats, milk = session.scalars(select(Food).order_by(Food.id)).all()
+    meal = Meal(name="Porridge", items=[MealItem(food=oats, servings=0.5), MealItem(food=milk, servings=2)])
+    session.add(meal)
+    session.commit()
+    (v,) = _totals(session, "Porridge").values()
+    assert (v.calories, v.protein, v.iron_mg) == pytest.approx(_walk(meal)) == (307.5, 11.5, 2.0)
+
+    meal.items[1].servings = 3          # recipe change
+    oats.calories = 400                 # food edit
+    session.commit()
+    (v,) = _totals(session, "Porridge").values()
+    assert v.calories == pytest.approx(0.5 * 400 + 3 * 60)
+
+    session.delete(meal.items[0])       # ingredient removed
+    session.commit()
+    assert next(iter(_totals(session, "Porridge").values())).calories == pytest.approx(180)
+
+    session.delete(meal)
+    session.commit()
+    assert session.scalar(select(MealTotals)) is None
+
+
+def test_new_meal_without_items_has_zero_totals(session):
+    MealRepository(session).create("Empty")
+    session.commit()
+    (v,) = _totals(session, "Empty").values()
+    assert v.calories == 0 and v.name == "Empty"
+
+
+def test_bulk_statements_refresh_totals(session):
+    meal_id = session.scalar(insert(Meal).returning(Meal.id), [{"name": "Shake"}])
+    session.execute(insert(MealItem), [{"meal_id": meal_id, "food_id": 2, "servings": 2.0}])
+    assert _totals(session, "Shake")[meal_id].calories == 120
+    session.execute(update(Food), [{"id": 2, "calories": 50.0}])      # bulk by primary key
+    assert _totals(session, "Shake")[meal_id].calories == 100
+    session.execute(update(Food).where(Food.name == "Milk").values(protein=4.0))
+    assert _totals(session, "Shake")[meal_id].protein == 8
+    session.execute(delete(MealItem).where(MealItem.meal_id == meal_id))
+    assert _totals(session, "Shake")[meal_id].calories == 0
+
+
+def test_refresh_rebuilds_everything(session):
+    session.add(Meal(name="Cereal", items=[MealItem(food_id=1, servings=1)]))
+    session.commit()
+    session.execute(MealTotals.__table__.delete())  # e.g. a DB from before meal_totals
+    refresh_meal_totals(session.connection())
+    assert _totals(session, "Cereal").popitem()[1].calories == 375
@@ -1,6 +1,8 @@
 import pytest
+from sqlalchemy import text
 from app.db import Base, new_engine, new_session_factory
-from app.models import Food
+from app.models import Food, Meal, User
+from app.core.macros import FoodVector
 from app.repositories import FoodRepository, MealRepository, UserRepository
 
 
@@ -21,6 +23,15 @@ def test_food_upsert_is_idempotent(session):
     assert len(repo.list_all()) == 1
 
 
+def test_food_bulk_writes(session):
+    repo = FoodRepository(session)
+    ids = repo.insert_many([{"name": "Oats", "calories": 389}, {"name": "Egg", "brand": "Farm"}])
+    assert repo.name_brand_keys() == {("oats", ""): ids[0], ("egg", "farm"): ids[1]}
+    repo.update_many([{"id": ids[0], "calories": 400}, {"id": ids[1]}])  # the id-only row is dropped
+    session.commit()
+    assert repo.get(ids[0]).calories == 400 and repo.insert_many([]) == []
+
+
 def test_user_create_and_get(session):
     repo = UserRepository(session)
     u = repo.create(name="Kostas", age=30, sex="male", height_cm=180,
@@ -34,3 +45,70 @@ def test_meal_get_by_name(session):
     repo.create(name="Lunch")
     session.commit()
     assert repo.find_by_name("lunch").name == "Lunch"
+
+
+def test_log_totals_for_range_aggregates_in_sql(session):
+    import datetime
+    from app.models import LogEntry
+    from app.repositories import LogRepository
+    session.add(Food(name="Egg", calories=78, protein=6, iron_mg=0.9))
+    session.add(Food(name="Salt", calories=0))  # no micros -> counted as 0
+    session.flush()
+    jan, feb = datetime.date(2026, 1, 3), datetime.date(2026, 2, 3)
+    session.add_all([LogEntry(user_id=1, food_id=1, servings=2, eaten_on=jan),
+                     LogEntry(user_id=1, food_id=2, servings=1, eaten_on=jan),
+                     LogEntry(user_id=1, food_id=1, servings=1, eaten_on=feb),
+                     LogEntry(user_id=2, food_id=1, servings=9, eaten_on=jan)])
+    session.commit()
+    repo = LogRepository(session)
+    days = repo.totals_for_range(1, datetime.date(2026, 1, 1), datetime.date(2026, 12, 31))
+    assert [(d["period"], d["entries"], d["calories"]) for d in days] == [
+        ("2026-01-03", 2, 156), ("2026-02-03", 1, 78)]
+    assert days[0]["iron_mg"] == pytest.approx(1.8)
+    year = repo.totals_for_range(1, jan, feb, group_by="year")
+    assert [(y["period"], y["entries"], y["calories"]) for y in year] == [("2026", 3, 234)]
+    with pytest.raises(ValueError):
+        repo.totals_for_range(1, jan, feb, group_by="week")
+
+
+def test_food_vectors_are_read_from_columns(session):
+    repo = FoodRepository(session)
+    repo.add(Food(name="Rice", calories=130, carbs=28, fiber=None))
+    repo.add(Food(name="Egg", calories=78, protein=6, iron_mg=0.9))
+    session.commit()
+    vectors = repo.list_vectors()
+    assert [v.name for v in vectors] == [f.name for f in repo.list_all()]
+    rice = repo.find_by_name_brand("rice", "")
+    assert repo.get_vectors([rice.id])[rice.id] == FoodVector.of(rice)
+
+
+def _plan(session, stmt) -> str:
+    sql = stmt.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    return " | ".join(r[-1] for r in session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def test_case_insensitive_lookups_use_expression_indexes(session):
+    from app.repositories import _by_lower_name, _food_by_name_brand
+    assert "USING INDEX ix_foods_lower_name_brand" in _plan(session, _food_by_name_brand(" Apple ", "GREEN"))
+    assert "USING INDEX ix_meals_lower_name" in _plan(session, _by_lower_name(Meal, "lunch"))
+    assert "USING INDEX ix_users_lower_name" in _plan(session, _by_lower_name(User, "kostas"))
+
+
+def test_case_insensitive_lookups_match_non_ascii_names(session):
+    from app.repositories import _by_lower_name
+    meals, foods = MealRepository(session), FoodRepository(session)
+    meals.create(name="Äpfel")
+    foods.add(Food(name="Φέτα", brand="Δωδώνη", calories=80))
+    session.commit()
+    assert meals.find_by_name("Äpfel").name == "Äpfel"
+    assert meals.find_by_name("ÄPFEL").name == "Äpfel"  # both sides fold the same way
+    assert foods.find_by_name_brand(" Φέτα ", "Δωδώνη").name == "Φέτα"
+    assert "USING INDEX ix_meals_lower_name" in _plan(session, _by_lower_name(Meal, "Äpfel"))
+
+
+def test_find_by_name_is_exact_not_a_pattern(session):
+    meals = MealRepository(session)
+    meals.create(name="Post_workout")
+    session.commit()
+    assert meals.find_by_name("post_WORKOUT").name == "Post_workout"
+    assert meals.find_by_name("Post%") is None and meals.find_by_name("PostXworkout") is None
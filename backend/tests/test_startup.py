@@ -0,0 +1,37 @@
+from sqlalchemy import select
+from app.db import new_engine, new_session_factory
+from app.models import Food, SeedState
+from app.seed import startup
+from app.seed.startup import is_current, prepare_database
+
+
+def _db(tmp_path):
+    engine = new_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    return engine, new_session_factory(engine)
+
+
+def test_second_boot_is_a_no_op(tmp_path):
+    engine, Session = _db(tmp_path)
+    assert not is_current(engine)                 # no tables yet
+    first = prepare_database(engine, Session)
+    assert not first["skipped"] and first["foods_added"] >= 30
+    assert is_current(engine)
+    assert prepare_database(engine, Session) == {"skipped": True, "foods_added": 0, "foods_enriched": 0}
+
+
+def test_new_foods_and_changed_seed_rerun(tmp_path, monkeypatch):
+    engine, Session = _db(tmp_path)
+    prepare_database(engine, Session)
+    with Session() as s:
+        s.add(Food(name="Spinach", serving_description="100g", calories=23, source="legacy"))
+        s.commit()
+    assert not is_current(engine)                 # food added since the last run
+    again = prepare_database(engine, Session)
+    assert again["foods_added"] == 0 and again["foods_enriched"] == 1
+    with Session() as s:
+        assert s.scalar(select(Food.iron_mg).where(Food.name == "Spinach")) is not None
+
+    monkeypatch.setattr(startup, "SCHEMA_VERSION", startup.SCHEMA_VERSION + 1)
+    assert not prepare_database(engine, Session)["skipped"]
+    with Session() as s:
+        assert s.get(SeedState, "startup").schema_version == startup.SCHEMA_VERSION
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: editing a food referenced by N saved daily plans.
+
+Compares the old path (find plans by meals ILIKE, re-parse each plan and re-query every
+item) with the plan-item delta UPDATE. Runs against a throwaway SQLite file.
+
+    python bench_plan_updates.py [plans]        # default 10000
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # db.py requires one; we use our own engine
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from db import Base
+from models import Food as FoodModel, DailyPlan, DailyPlanItem
+from plan_items import MACROS, apply_food_delta, food_macros
+
+
+def populate(Session, n_plans: int, n_foods: int = 200, items_per_plan: int = 6):
+    with Session() as db:
+        db.execute(insert(FoodModel), [{
+            'name': f"Food {i}", 'label': '-', 'measurement': '100g', 'calories': 100 + i,
+            'protein': 10, 'carbs': 20, 'fat_saturated': 1, 'fat_regular': 3, 'sodium': 50,
+        } for i in range(n_foods)])
+        db.execute(insert(DailyPlan), [{
+            'date': date.today(), 'meals': "; ".join(
+                ["Food 0 x1.0"] + [f"Food {1 + (p + k) % (n_foods - 1)} x1.0" for k in range(items_per_plan - 1)]),
+            **dict.fromkeys(MACROS, 0.0),
+        } for p in range(n_plans)])
+        ids = db.scalars(select(DailyPlan.id)).all()
+        db.execute(insert(DailyPlanItem), [
+            {'plan_id': pid, 'food_id': 1 + (0 if k == 0 else 1 + (p + k - 1) % (n_foods - 1)), 'multiplier': 1.0}
+            for p, pid in enumerate(ids) for k in range(items_per_plan)
+        ])
+        db.commit()
+
+
+def old_path(db, food_name: str):
+    # the pre-index update_daily_plans_for_food: ILIKE scan, then one query per item
+    plans = db.query(DailyPlan).filter(DailyPlan.meals.ilike(f"%{food_name}%")).all()
+    for plan in plans:
+        totals = dict.fromkeys(MACROS, 0.0)
+        for item in (i.strip() for i in plan.meals.split(";")):
+            name_part, mult_part = item.rsplit(" x", 1)
+            f = db.query(FoodModel).filter(FoodModel.name == name_part).first()
+            if f:
+                for k in MACROS:
+                    totals[k] += getattr(f, k) * float(mult_part)
+        for k in MACROS:
+            setattr(plan, k, totals[k])
+    db.commit()
+    return len(plans)
+
+
+def main(n_plans: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        t0 = time.perf_counter()
+        populate(Session, n_plans)
+        print(f"{n_plans} plans populated in {time.perf_counter() - t0:.1f}s")
+
+        with Session() as db:
+            t0 = time.perf_counter()
+            touched = old_path(db, "Food 0")
+            print(f"old  ILIKE + re-parse : {touched:6d} plans in {(time.perf_counter() - t0) * 1e3:9.1f} ms")
+
+        with Session() as db:
+            food = db.get(FoodModel, 1)
+            old = food_macros(food)
+            food.calories += 25
+            t0 = time.perf_counter()
+            touched = apply_food_delta(db, food.id, old, food_macros(food))
+            db.commit()
+            print(f"new  delta UPDATE     : {touched:6d} plans in {(time.perf_counter() - t0) * 1e3:9.1f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,119 @@
+import threading
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy.orm import joinedload
+
+from db import get_db
+from models import Food as FoodModel, Meal as MealModel, MealFood as MealFoodModel, User
+
+MACROS = ('calories', 'protein', 'carbs', 'fat_regular', 'fat_saturated', 'sodium')
+
+# Bumped by every write to foods, meals or users. Module globals survive Streamlit reruns
+# (the module stays in sys.modules), so one counter serves every session in the process.
+_version = 0
+_version_lock = threading.Lock()
+
+
+def catalog_version() -> int:
+    return _version
+
+
+def bump_catalog_version() -> int:
+    """Call after committing a change to foods, meals or users."""
+    global _version
+    with _version_lock:
+        _version += 1
+        return _version
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    foods: pd.DataFrame                 # one row per food (load_logged_foods columns)
+    meals: pd.DataFrame                 # one row per meal with totals (load_logged_meals columns)
+    meal_items: pd.DataFrame            # one row per (meal, food)
+    users: list = field(default_factory=list)            # SimpleNamespace per user, id order
+    foods_by_name: dict = field(default_factory=dict)    # name -> first food row (SimpleNamespace)
+    foods_by_key: dict = field(default_factory=dict)     # (name, label) -> food row
+    meals_by_name: dict = field(default_factory=dict)    # name -> meal row, .items -> [item]
+    users_by_name: dict = field(default_factory=dict)
+
+
+def _row(obj, columns) -> SimpleNamespace:
+    return SimpleNamespace(**{c: getattr(obj, c) for c in columns})
+
+
+_FOOD_COLUMNS = ('id', 'name', 'label', 'measurement') + MACROS
+_USER_COLUMNS = tuple(c.name for c in User.__table__.columns)
+
+
+# cache_resource, not cache_data: every get_catalog() call gets the one snapshot object
+# instead of unpickling a fresh copy, so a rerun pays nothing per call. The snapshot is
+# shared by every session in the process and must be treated as read-only.
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_snapshot(version: int) -> CatalogSnapshot:
+    # three queries for the whole catalog, whatever its size
+    with get_db() as db:
+        foods = [_row(f, _FOOD_COLUMNS) for f in db.query(FoodModel).order_by(FoodModel.id).all()]
+        meals = (
+            db.query(MealModel)
+              .options(joinedload(MealModel.meal_food_items).joinedload(MealFoodModel.food))
+              .order_by(MealModel.id)
+              .all()
+        )
+        users = [_row(u, _USER_COLUMNS) for u in db.query(User).order_by(User.id).all()]
+
+        foods_by_id = {f.id: f for f in foods}
+        meal_rows, item_rows, meals_by_name = [], [], {}
+        for m in meals:
+            items = [SimpleNamespace(food=foods_by_id[mf.food_id], multiplier=mf.multiplier)
+                     for mf in m.meal_food_items]
+            totals = {k: sum((getattr(i.food, k) or 0) * i.multiplier for i in items) for k in MACROS}
+            meals_by_name.setdefault(m.name, SimpleNamespace(id=m.id, name=m.name, items=items, **totals))
+            meal_rows.append({
+                'Meal Name': m.name,
+                'Food Names': "\n".join(f"{i.multiplier}x {i.food.name}" for i in items),
+                'Calories': totals['calories'],
+                'Protein':  totals['protein'],
+                'Carbs':    totals['carbs'],
+                'Fat_Regular':   totals['fat_regular'],
+                'Fat_Saturated': totals['fat_saturated'],
+                'Sodium':   totals['sodium'],
+            })
+            item_rows.extend({'Meal Name': m.name, 'Food Name': i.food.name, 'Label': i.food.label,
+                              'Multiplier': i.multiplier} for i in items)
+
+    food_df = pd.DataFrame([{
+        'Name': f.name,
+        'Label': f.label,
+        'Measurement': f.measurement,
+        'Calories': f.calories,
+        'Protein': f.protein,
+        'Carbs': f.carbs,
+        'Fat_Regular': f.fat_regular,
+        'Fat_Saturated': f.fat_saturated,
+        'Sodium': f.sodium
+    } for f in foods])
+    foods_by_name = {}
+    for f in foods:
+        foods_by_name.setdefault(f.name, f)
+    return CatalogSnapshot(
+        version=version,
+        foods=food_df,
+        meals=pd.DataFrame(meal_rows),
+        meal_items=pd.DataFrame(item_rows),
+        users=users,
+        foods_by_name=foods_by_name,
+        foods_by_key={(f.name, f.label): f for f in foods},
+        meals_by_name=meals_by_name,
+        users_by_name={u.name: u for u in users},
+    )
+
+
+def get_catalog() -> CatalogSnapshot:
+    """The catalog as of the latest write; free on reruns that changed nothing. Shared and
+    read-only: copy a frame before changing it."""
+    return _load_snapshot(catalog_version())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Date, Index
 from sqlalchemy.orm import relationship
 from db import Base
 
@@ -75,4 +75,23 @@ class DailyPlan(Base):
     fat_saturated = Column(Float,  nullable=False)
     sodium        = Column(Float,  nullable=False)
 
-    user = relationship("User", back_populates="daily_plans")
\ No newline at end of file
+    user = relationship("User", back_populates="daily_plans")
+    items = relationship("DailyPlanItem", back_populates="plan", cascade="all, delete-orphan")
+
+
+class DailyPlanItem(Base):
+    """One food in a saved plan, with its effective multiplier. Meals are stored expanded
+    into their foods (meal_id records where they came from), so a plan's totals are always
+    sum(food macros * multiplier) over its items."""
+    __tablename__ = 'daily_plan_items'
+
+    id         = Column(Integer, primary_key=True)
+    plan_id    = Column(Integer, ForeignKey('daily_plans.id'), nullable=False, index=True)
+    food_id    = Column(Integer, ForeignKey('foods.id'), nullable=False)
+    meal_id    = Column(Integer, ForeignKey('meals.id', ondelete='SET NULL'), nullable=True)
+    multiplier = Column(Float, nullable=False)
+
+    plan = relationship("DailyPlan", back_populates="items")
+
+    # reverse index food -> plans, used when a food's macros change
+    __table_args__ = (Index('ix_daily_plan_items_food_plan', 'food_id', 'plan_id'),)
\ No newline at end of file
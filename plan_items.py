@@ -0,0 +1,228 @@
+import re
+
+from sqlalchemy import func, or_, select, update, delete
+from sqlalchemy.orm import Session, joinedload
+from models import Food as FoodModel, Meal as MealModel, DailyPlan, DailyPlanItem
+
+MACROS = ('calories', 'protein', 'carbs', 'fat_regular', 'fat_saturated', 'sodium')
+
+
+def food_macros(food: FoodModel) -> dict:
+    return {k: float(getattr(food, k) or 0) for k in MACROS}
+
+
+def build_plan_items(db: Session, plan_items: list) -> list[DailyPlanItem]:
+    """
+    Planner items -> DailyPlanItem rows (one per food, meals expanded):
+      ("food", name, mult), ("meal", name, mult),
+      ("customized_meal", name, [(food_name, food_label, mult), ...])
+    """
+    rows = []
+    for item_type, item_name, multiplier in plan_items:
+        if item_type == "food":
+            food = db.query(FoodModel).filter(FoodModel.name == item_name).first()
+            if food:
+                rows.append(DailyPlanItem(food_id=food.id, multiplier=float(multiplier)))
+        elif item_type == "meal":
+            meal = (
+                db.query(MealModel)
+                  .options(joinedload(MealModel.meal_food_items))
+                  .filter(MealModel.name == item_name)
+                  .first()
+            )
+            if meal:
+                for mf in meal.meal_food_items:
+                    rows.append(DailyPlanItem(food_id=mf.food_id, meal_id=meal.id,
+                                              multiplier=mf.multiplier * float(multiplier)))
+        elif item_type == "customized_meal":
+            meal = db.query(MealModel).filter(MealModel.name == item_name).first()
+            for food_name, food_label, mult in multiplier:
+                food = db.query(FoodModel).filter(
+                    FoodModel.name == food_name,
+                    FoodModel.label == food_label
+                ).first()
+                if food:
+                    rows.append(DailyPlanItem(food_id=food.id, meal_id=meal.id if meal else None,
+                                              multiplier=float(mult)))
+    return rows
+
+
+def replace_plan_items(db: Session, plan: DailyPlan, plan_items: list) -> None:
+    """Point `plan` at the given planner items (caller commits)."""
+    plan.items = build_plan_items(db, plan_items)
+
+
+def _plan_weight(food_id: int):
+    # how many servings of the food each plan holds, summed over its items
+    return (
+        select(func.sum(DailyPlanItem.multiplier))
+        .where(DailyPlanItem.plan_id == DailyPlan.id, DailyPlanItem.food_id == food_id)
+        .scalar_subquery()
+    )
+
+
+def apply_food_delta(db: Session, food_id: int, old: dict, new: dict) -> int:
+    """
+    Shift the totals of every plan that contains `food_id` by (new - old) * servings, in a
+    single UPDATE driven by the food -> plans index. Returns the number of plans touched.
+    """
+    deltas = {k: float(new.get(k, 0)) - float(old.get(k, 0)) for k in MACROS}
+    if not any(deltas.values()):
+        return 0
+    weight = _plan_weight(food_id)
+    affected = select(DailyPlanItem.plan_id).where(DailyPlanItem.food_id == food_id)
+    stmt = (
+        update(DailyPlan)
+        .where(DailyPlan.id.in_(affected))
+        .values({k: getattr(DailyPlan, k) + d * weight for k, d in deltas.items() if d})
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount
+
+
+def remove_food_from_plans(db: Session, food: FoodModel, meal_ids: list[int] = ()) -> int:
+    """
+    Take a food that is about to be deleted out of every plan, together with the meals
+    (`meal_ids`) being deleted with it: the whole contribution of those items comes off the
+    plan totals and their rows are dropped. Returns the number of plans touched.
+    """
+    gone = DailyPlanItem.food_id == food.id
+    if meal_ids:
+        gone = or_(gone, DailyPlanItem.meal_id.in_(meal_ids))
+
+    def removed(k):
+        # what the doomed items add to this plan's `k` total
+        return (
+            select(func.coalesce(func.sum(func.coalesce(getattr(FoodModel, k), 0)
+                                          * DailyPlanItem.multiplier), 0.0))
+            .join(FoodModel, FoodModel.id == DailyPlanItem.food_id)
+            .where(DailyPlanItem.plan_id == DailyPlan.id, gone)
+            .scalar_subquery()
+        )
+
+    stmt = (
+        update(DailyPlan)
+        .where(DailyPlan.id.in_(select(DailyPlanItem.plan_id).where(gone)))
+        .values({k: getattr(DailyPlan, k) - removed(k) for k in MACROS})
+        .execution_options(synchronize_session=False)
+    )
+    touched = db.execute(stmt).rowcount
+    db.execute(delete(DailyPlanItem).where(gone).execution_options(synchronize_session=False))
+    return touched
+
+
+# ─── Backfill for plans saved before daily_plan_items existed ────────────────
+
+_MACRO_SUFFIX = re.compile(r'[\s\-:]*\([^)]*cal[^)]*\)$')
+# "200g ...", "2medium ...", "2 ..." (format_detailed_plan_item), or the "1.5x ..." fallback
+_AMOUNT = re.compile(r'^(\d+(?:\.\d+)?)(x?)[a-zA-Z]*\s+(.+)$')
+_LABEL = re.compile(r'^(.+?)\s+\(([^)]+)\)$')
+_BASE = re.compile(r'^(\d+(?:\.\d+)?)')
+
+
+def _find_food(text: str, foods: dict):
+    """'Chicken Breast (Grilled)' -> the Food, trying the name with and without the label."""
+    m = _LABEL.match(text)
+    if m and m.group(1) in foods:
+        same = [f for f in foods[m.group(1)] if f.label == m.group(2)]
+        return (same or foods[m.group(1)])[0]
+    if text in foods:
+        same = [f for f in foods[text] if f.label == "-"]
+        return (same or foods[text])[0]
+    return None
+
+
+def _parse_food_line(text: str, foods: dict):
+    """'200g Chicken Breast (Grilled)' -> (food, multiplier), or None if it names no food."""
+    m = _AMOUNT.match(_MACRO_SUFFIX.sub('', text).strip())
+    if not m:
+        return None
+    amount, is_mult, rest = float(m.group(1)), m.group(2), m.group(3)
+    words = rest.split()
+    # the fallback form keeps the unparsed measurement before the name ("1.5x a pinch Salt")
+    for i in range(len(words)):
+        food = _find_food(" ".join(words[i:]), foods)
+        if food:
+            break
+    else:
+        return None
+    if is_mult:
+        return food, amount
+    base = _BASE.match((food.measurement or "").strip())
+    base = float(base.group(1)) if base else 0.0
+    return food, amount / base if base else amount
+
+
+def parse_plan_text(meals_text: str, foods: dict, meals: dict) -> list[DailyPlanItem]:
+    """
+    A saved DailyPlan.meals string -> DailyPlanItem rows. `foods` maps name -> [Food],
+    `meals` maps name -> Meal (meal_food_items loaded).
+
+    Handles the "• ..." lines format_detailed_plan_item writes, where meals and custom meals
+    list their ingredients with the amounts actually planned, and the older
+    "Chicken x2.0; Breakfast" format, whose meals are expanded at their current recipe.
+    Lines naming foods or meals that no longer exist are skipped.
+    """
+    rows = []
+    if '•' not in meals_text:
+        for item in (i.strip() for i in meals_text.split(';')):
+            name, sep, mult = item.rpartition(' x')
+            try:
+                food = sep and name in foods and foods[name][0]
+                mult = float(mult)
+            except ValueError:
+                food = None
+            if food:
+                rows.append(DailyPlanItem(food_id=food.id, multiplier=mult))
+            elif item in meals:
+                rows.extend(DailyPlanItem(food_id=mf.food_id, meal_id=meals[item].id,
+                                          multiplier=mf.multiplier)
+                            for mf in meals[item].meal_food_items)
+        return rows
+
+    meal_id = None
+    for line in meals_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if line[:1] in ('\t', ' ') and stripped.startswith('-'):
+            # ingredient of the meal above
+            hit = _parse_food_line(stripped[1:].strip(), foods)
+            if hit:
+                rows.append(DailyPlanItem(food_id=hit[0].id, meal_id=meal_id, multiplier=hit[1]))
+            continue
+        body = stripped.lstrip('•').strip()
+        if body.endswith(':'):
+            # "Breakfast:", "Breakfast: (500cal, ...):" or "Custom Breakfast:"
+            name = _MACRO_SUFFIX.sub('', body.rstrip(':').strip()).rstrip(':').strip()
+            meal = meals.get(name) or meals.get(name.removeprefix('Custom '))
+            meal_id = meal.id if meal else None
+            continue
+        meal_id = None
+        hit = _parse_food_line(body, foods)
+        if hit:
+            rows.append(DailyPlanItem(food_id=hit[0].id, multiplier=hit[1]))
+    return rows
+
+
+def backfill_plan_items(db: Session) -> int:
+    """
+    Give every plan saved before daily_plan_items existed its rows, parsed from the stored
+    DailyPlan.meals text, so food edits and deletes reach it too. Plans that already have
+    items are left alone, so running it again is a no-op. The caller commits; returns the
+    number of plans filled.
+    """
+    missing = db.query(DailyPlan).filter(~DailyPlan.items.any()).all()
+    if not missing:
+        return 0
+    foods = {}
+    for f in db.query(FoodModel).order_by(FoodModel.id):
+        foods.setdefault(f.name, []).append(f)
+    meals = {m.name: m for m in db.query(MealModel).options(joinedload(MealModel.meal_food_items))}
+    filled = 0
+    for plan in missing:
+        rows = parse_plan_text(plan.meals or '', foods, meals)
+        if rows:
+            plan.items = rows
+            filled += 1
+    return filled
@@ -0,0 +1,140 @@
+import os
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db import Base
+from models import Food, Meal, MealFood, DailyPlan
+from plan_items import MACROS, backfill_plan_items, remove_food_from_plans, replace_plan_items
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    chicken = Food(name="Chicken Breast", label="Grilled", measurement="100g", calories=165,
+                   protein=31, carbs=0, fat_saturated=1, fat_regular=4, sodium=74)
+    rice = Food(name="Rice", label="-", measurement="1 cup", calories=200,
+                protein=4, carbs=45, fat_saturated=0, fat_regular=0, sodium=0)
+    egg = Food(name="Egg", label="Boiled", measurement="1(50g)", calories=78,
+               protein=6, carbs=1, fat_saturated=2, fat_regular=5, sodium=62)
+    session.add_all([chicken, rice, egg])
+    session.flush()
+    session.add(Meal(name="Lunch", meal_food_items=[MealFood(food_id=chicken.id, multiplier=1.5),
+                                                    MealFood(food_id=rice.id, multiplier=1.0)]))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _food(db, name):
+    return db.query(Food).filter(Food.name == name).one()
+
+
+def _plan(db, meals_text, **totals):
+    plan = DailyPlan(date=date(2026, 1, 1), meals=meals_text,
+                     **{k: totals.get(k, 0.0) for k in MACROS})
+    db.add(plan)
+    db.flush()
+    return plan
+
+
+def _items(plan):
+    # (food_id, meal_id or 0, multiplier), sortable
+    return sorted((i.food_id, i.meal_id or 0, round(i.multiplier, 3)) for i in plan.items)
+
+
+def test_deleting_a_food_removes_its_meals_whole_contribution(db):
+    chicken, rice, egg = _food(db, "Chicken Breast"), _food(db, "Rice"), _food(db, "Egg")
+    lunch = db.query(Meal).filter(Meal.name == "Lunch").one()
+    # Lunch x1 (1.5 chicken + 1 rice) + 2 eggs
+    plan = _plan(db, "", calories=1.5 * 165 + 200 + 2 * 78, protein=1.5 * 31 + 4 + 2 * 6)
+    replace_plan_items(db, plan, [("meal", "Lunch", 1.0), ("food", "Egg", 2.0)])
+    untouched = _plan(db, "", calories=78)
+    replace_plan_items(db, untouched, [("food", "Egg", 1.0)])
+    db.commit()
+
+    assert remove_food_from_plans(db, rice, [lunch.id]) == 1
+    db.commit()
+    db.refresh(plan)
+    db.refresh(untouched)
+    # the chicken of the deleted Lunch goes too, not just the rice
+    assert plan.calories == pytest.approx(2 * 78)
+    assert plan.protein == pytest.approx(2 * 6)
+    assert [(i.food_id, i.meal_id) for i in plan.items] == [(egg.id, None)]
+    assert untouched.calories == pytest.approx(78)
+    assert len(untouched.items) == 1
+
+
+def test_deleting_a_food_outside_meals_only_removes_its_own_share(db):
+    chicken = _food(db, "Chicken Breast")
+    plan = _plan(db, "", calories=1.5 * 165 + 200 + 165)
+    replace_plan_items(db, plan, [("meal", "Lunch", 1.0), ("food", "Chicken Breast", 1.0)])
+    db.commit()
+
+    remove_food_from_plans(db, chicken)
+    db.commit()
+    db.refresh(plan)
+    assert plan.calories == pytest.approx(200)
+    assert len(plan.items) == 1
+
+
+def test_backfill_parses_detailed_plan_text(db):
+    chicken, rice, egg = _food(db, "Chicken Breast"), _food(db, "Rice"), _food(db, "Egg")
+    lunch = db.query(Meal).filter(Meal.name == "Lunch").one()
+    text = "\n".join([
+        "• Lunch: (447cal, 50.5g protein, 45g carbs, 6g fat, 111mg sodium):",
+        "\t- 150g Chicken Breast (Grilled)",
+        "\t- 1cup Rice",
+        "• 3 Egg (Boiled): (234cal, 18g protein, 3g carbs, 15g fat, 186mg sodium)",
+        "• Custom Lunch:",
+        "\t- 50g Chicken Breast (Grilled)",
+        "• 2.5x Rice",
+        "• 100g Deleted Food",
+    ])
+    plan = _plan(db, text)
+    db.commit()
+
+    assert backfill_plan_items(db) == 1
+    db.commit()
+    assert _items(plan) == sorted([
+        (chicken.id, lunch.id, 1.5), (rice.id, lunch.id, 1.0), (egg.id, 0, 3.0),
+        (chicken.id, lunch.id, 0.5), (rice.id, 0, 2.5),
+    ])
+
+
+def test_backfill_parses_legacy_plan_text_and_runs_once(db):
+    chicken, rice = _food(db, "Chicken Breast"), _food(db, "Rice")
+    lunch = db.query(Meal).filter(Meal.name == "Lunch").one()
+    legacy = _plan(db, "Chicken Breast x2.0; Lunch; Gone x1.0")
+    saved = _plan(db, "• 1 Egg (Boiled)")
+    replace_plan_items(db, saved, [("food", "Rice", 1.0)])
+    db.commit()
+
+    assert backfill_plan_items(db) == 1
+    db.commit()
+    assert _items(legacy) == sorted([(chicken.id, 0, 2.0), (chicken.id, lunch.id, 1.5),
+                                     (rice.id, lunch.id, 1.0)])
+    # plans that already had items keep them
+    assert [(i.food_id, i.multiplier) for i in saved.items] == [(rice.id, 1.0)]
+    assert backfill_plan_items(db) == 0
+
+
+def test_backfilled_plans_follow_food_deletes(db):
+    rice = _food(db, "Rice")
+    lunch = db.query(Meal).filter(Meal.name == "Lunch").one()
+    plan = _plan(db, "Lunch; Egg x1.0", calories=1.5 * 165 + 200 + 78)
+    db.commit()
+    backfill_plan_items(db)
+    db.commit()
+
+    assert remove_food_from_plans(db, rice, [lunch.id]) == 1
+    db.commit()
+    db.refresh(plan)
+    assert plan.calories == pytest.approx(78)